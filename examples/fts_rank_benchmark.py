@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Measure the cost of the FTS4 ranking functions (rank, bm25 and lucene) by
+running ranked searches against a table of generated documents.
+
+The Cython implementations are used if playhouse._sqlite_ext has been
+compiled, otherwise the pure-Python implementations are used.
+
+Usage: python fts_rank_benchmark.py [number of documents]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from peewee import *
+from playhouse.sqlite_ext import FTSModel
+from playhouse.sqlite_ext import SqliteExtDatabase
+
+
+WORDS = 2000
+WORDS_PER_DOC = 40
+SEARCHES = ['w1', 'w2 w3', 'w5 OR w8', 'w13 w21 w34']
+
+db = SqliteExtDatabase(None)
+
+
+class Document(FTSModel):
+    title = TextField()
+    content = TextField()
+
+    class Meta:
+        database = db
+
+
+def populate(ndocs):
+    # Log-uniform word distribution, so common terms match many documents.
+    rand = random.Random(0)
+
+    def text(nwords):
+        return ' '.join('w%d' % (WORDS ** rand.random())
+                        for _ in range(nwords))
+
+    Document.create_table()
+    with db.atomic():
+        batch = []
+        for i in range(ndocs):
+            batch.append({
+                'title': text(4),
+                'content': text(WORDS_PER_DOC)})
+            if len(batch) == 500:
+                Document.insert_many(batch).execute()
+                batch = []
+        if batch:
+            Document.insert_many(batch).execute()
+    Document.optimize()
+
+
+def benchmark(name, score):
+    nrows = sum(Document.select().where(Document.match(term)).count()
+                for term in SEARCHES)
+    start = time.time()
+    for term in SEARCHES:
+        query = (Document
+                 .select(Document.docid, score.alias('score'))
+                 .where(Document.match(term))
+                 .order_by(SQL('score'))
+                 .limit(10)
+                 .tuples())
+        list(query)
+    elapsed = time.time() - start
+    print('%s: ranked %s rows in %.3fs (%.0f rows/s)' % (
+        name, nrows, elapsed, nrows / elapsed))
+
+
+def main(ndocs):
+    filename = os.path.join(tempfile.mkdtemp(), 'fts-bench.db')
+    db.init(filename)
+    db.connect()
+    try:
+        start = time.time()
+        populate(ndocs)
+        print('Indexed %s documents in %.1fs (C extensions: %s).' % (
+            ndocs, time.time() - start, db.using_c_extensions))
+
+        benchmark('rank', Document.rank())
+        benchmark('bm25', Document.bm25())
+        benchmark('lucene', Document.lucene())
+    finally:
+        db.close()
+        os.unlink(filename)
+        os.rmdir(os.path.dirname(filename))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
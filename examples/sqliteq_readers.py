@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Compare read throughput of SqliteQueueDatabase using one reader thread versus
+four reader threads. Each reader has its own connection to the WAL-mode
+database, so reads are executed concurrently.
+
+Usage: python sqliteq_readers.py [number of queries]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from playhouse.sqliteq import SqliteQueueDatabase
+
+
+ROWS = 200000
+CLIENTS = 8
+QUERY = 'SELECT COUNT(*), SUM(value) FROM data WHERE (value %% %s) = 0'
+
+
+def populate(filename):
+    db = SqliteQueueDatabase(filename, autostart=True)
+    db.execute_sql('CREATE TABLE data (id INTEGER PRIMARY KEY, value INTEGER)')
+    db.execute_sql_many(
+        'INSERT INTO data (value) VALUES (?)',
+        ((i,) for i in range(ROWS)))
+    db.execute_sql('SELECT 1').fetchone()  # Wait for the writes to finish.
+    db.stop()
+
+
+def benchmark(filename, readers, nqueries):
+    db = SqliteQueueDatabase(filename, readers=readers, autostart=True)
+
+    def client(n):
+        for i in range(n):
+            sql = QUERY % (2 + (i % 7))
+            db.execute_sql(sql, require_commit=False).fetchone()
+
+    threads = [threading.Thread(target=client, args=(nqueries // CLIENTS,))
+               for _ in range(CLIENTS)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    db.stop()
+    return elapsed
+
+
+def main(nqueries):
+    filename = os.path.join(tempfile.mkdtemp(), 'sqliteq-bench.db')
+    populate(filename)
+    try:
+        for readers in (1, 4):
+            elapsed = benchmark(filename, readers, nqueries)
+            print('readers=%s: %s queries in %.3fs (%.1f queries/s)' % (
+                readers, nqueries, elapsed, nqueries / elapsed))
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(filename + suffix):
+                os.unlink(filename + suffix)
+        os.rmdir(os.path.dirname(filename))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
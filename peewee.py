@@ -29,6 +29,7 @@ import threading
 import time
 import uuid
 import weakref
+from array import array
 from bisect import bisect_left
 from bisect import bisect_right
 from collections import defaultdict
@@ -355,6 +356,7 @@ RESULTS_MODELS = 2
 RESULTS_TUPLES = 3
 RESULTS_DICTS = 4
 RESULTS_AGGREGATE_MODELS = 5
+RESULTS_NAMEDTUPLES = 6
 
 # To support "django-style" double-underscore filters, create a mapping between
 # operation name and operation code, e.g. "__eq" == OP.EQ.
@@ -1309,6 +1311,9 @@ class RelationDescriptor(FieldDescriptor):
     def get_object_or_id(self, instance):
         rel_id = instance._data.get(self.att_name)
         if rel_id is not None or self.att_name in instance._obj_cache:
+            if (self.att_name not in instance._obj_cache and
+                    instance._related_loader is not None):
+                instance._related_loader.load(self)
             if self.att_name not in instance._obj_cache:
                 obj = self.rel_model.get(self.field.to_field == rel_id)
                 instance._obj_cache[self.att_name] = obj
@@ -1590,6 +1595,178 @@ class AliasMap(object):
         return self
 
 
+class _UncacheableQuery(Exception):
+    """Raised while fingerprinting a node that cannot be cached."""
+
+
+SqlCacheInfo = namedtuple('SqlCacheInfo', ('hits', 'misses', 'max_size',
+                                           'size'))
+
+
+class SqlCache(object):
+    """
+    Bounded LRU cache mapping the structural fingerprint of a query to its
+    compiled SQL string. Queries that differ only in their parameter values
+    share a fingerprint, so the compiler only needs to extract the parameters
+    when the shape of the query has been seen before.
+    """
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                sql = self._cache.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._cache[key] = sql  # Mark as most-recently used.
+            self.hits += 1
+            return sql
+
+    def set(self, key, sql):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = sql
+            while len(self._cache) > self.max_size:
+                del self._cache[next(iter(self._cache))]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return SqlCacheInfo(self.hits, self.misses, self.max_size,
+                            len(self._cache))
+
+    def __len__(self):
+        return len(self._cache)
+
+IdentityMapInfo = namedtuple('IdentityMapInfo', ('hits', 'misses', 'hit_rate',
+                                                 'size'))
+
+
+class IdentityMap(object):
+    """
+    Maps ``(model class, primary key)`` to the one instance loaded for that
+    row while the map is active. Result wrappers hand back the mapped
+    instance instead of building a duplicate, and primary-key lookups made by
+    :py:meth:`Model.get` and foreign-key accessors are answered from the map
+    without querying the database.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._instances = {}
+
+    @staticmethod
+    def _key(instance):
+        meta = instance._meta
+        if meta.primary_key is False:
+            return None
+        if meta.composite_key:
+            pk_value = tuple([
+                instance._data.get(field_name)
+                for field_name in meta.primary_key.field_names])
+            if None in pk_value:
+                return None
+        else:
+            pk_value = instance._data.get(meta.primary_key.name)
+            if pk_value is None:
+                return None
+        return (type(instance), pk_value)
+
+    def get(self, model_class, pk_value, fields=None):
+        """
+        Return the mapped instance, or None. If ``fields`` is given, an
+        instance that has not loaded all of those fields is not returned.
+        """
+        instance = self._instances.get((model_class, pk_value))
+        if instance is not None and fields:
+            data = instance._data
+            if any(name not in data for name in fields):
+                instance = None
+        if instance is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return instance
+
+    def add(self, instance):
+        key = self._key(instance)
+        if key is not None:
+            self._instances[key] = instance
+
+    def remove(self, instance):
+        key = self._key(instance)
+        if key is not None and self._instances.get(key) is instance:
+            del self._instances[key]
+
+    def merge(self, instance):
+        """
+        Return the mapped instance for the row ``instance`` was built from,
+        adding ``instance`` to the map if the row has not been seen before.
+        Values already loaded (or modified) on the mapped instance are kept.
+        """
+        key = self._key(instance)
+        if key is None:
+            return instance
+        existing = self._instances.get(key)
+        if existing is None:
+            self._instances[key] = instance
+            return instance
+        elif existing is not instance:
+            for name, value in instance._data.items():
+                existing._data.setdefault(name, value)
+            for name, value in instance._obj_cache.items():
+                existing._obj_cache.setdefault(name, value)
+            if (existing._snapshot is not None and
+                    instance._snapshot is not None):
+                for name, value in instance._snapshot.items():
+                    existing._snapshot.setdefault(name, value)
+            for attr, value in instance.__dict__.items():
+                if attr not in ('_data', '_dirty', '_obj_cache', '_snapshot'):
+                    existing.__dict__[attr] = value
+        return existing
+
+    def merge_all(self, instances):
+        """
+        Merge a list of instances constructed from a single row, where the
+        instances may reference each other through their object caches.
+        """
+        merged = {}
+        for instance in instances:
+            merged[id(instance)] = self.merge(instance)
+        for instance in merged.values():
+            obj_cache = instance._obj_cache
+            for name, value in list(obj_cache.items()):
+                if id(value) in merged:
+                    obj_cache[name] = merged[id(value)]
+        return [merged[id(instance)] for instance in instances]
+
+    def clear(self):
+        self._instances.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        lookups = self.hits + self.misses
+        hit_rate = float(self.hits) / lookups if lookups else 0.
+        return IdentityMapInfo(self.hits, self.misses, hit_rate,
+                               len(self._instances))
+
+    def __len__(self):
+        return len(self._instances)
+
+# Placeholder stored in the SqlCache for fingerprints whose parameters could
+# not be reproduced without running the full compiler.
+_UNCACHEABLE = object()
+
+
 class QueryCompiler(object):
     # Mapping of `db_type` to actual column type used by database driver.
     # Database classes may provide additional column types or overrides.
@@ -1650,15 +1827,18 @@ class QueryCompiler(object):
         JOIN.FULL: 'FULL JOIN',
     }
     alias_map_class = AliasMap
+    _fingerprint_maps = {}
 
     def __init__(self, quote_char='"', interpolation='?', field_overrides=None,
-                 op_overrides=None):
+                 op_overrides=None, sql_cache=None):
         self.quote_char = quote_char
         self.interpolation = interpolation
         self._field_map = merge_dict(self.field_map, field_overrides or {})
         self._op_map = merge_dict(self.op_map, op_overrides or {})
         self._parse_map = self.get_parse_map()
         self._unknown_types = set(['param'])
+        self.sql_cache = sql_cache
+        self._fingerprint_map = None
 
     def get_parse_map(self):
         # To avoid O(n) lookups when parsing nodes, use a lookup table for
@@ -1867,6 +2047,167 @@ class QueryCompiler(object):
             params.extend(node_params)
         return glue.join(sql), params
 
+    def get_fingerprint_map(self):
+        # Fingerprinting mirrors the stock parsers. If a subclass overrides
+        # the parser for a node type, queries containing that node type are
+        # compiled normally and never cached. The map is computed once per
+        # compiler class and holds plain functions.
+        cls = type(self)
+        if cls not in QueryCompiler._fingerprint_maps:
+            unbound = lambda method: getattr(method, '__func__', method)
+            fingerprint_map = {}
+            for node_type, parser in self._parse_map.items():
+                stock = getattr(QueryCompiler, '_parse_' + node_type, None)
+                fingerprinter = getattr(
+                    QueryCompiler, '_fingerprint_' + node_type, None)
+                if fingerprinter is not None and \
+                        unbound(parser) is unbound(stock):
+                    fingerprint_map[node_type] = unbound(fingerprinter)
+            QueryCompiler._fingerprint_maps[cls] = fingerprint_map
+        return QueryCompiler._fingerprint_maps[cls]
+
+    def _fingerprint_expression(self, node, alias_map, conv, key, params):
+        if isinstance(node.lhs, Field):
+            conv = node.lhs
+        key.append(('expression', node.op, node.flat))
+        if node.op != OP.IN:
+            self._fingerprint_node(node.lhs, alias_map, conv, key, params)
+            self._fingerprint_node(node.rhs, alias_map, conv, key, params)
+            return
+
+        lparams, rparams = [], []
+        self._fingerprint_node(node.lhs, alias_map, conv, key, lparams)
+        self._fingerprint_node(node.rhs, alias_map, conv, key, rparams)
+        if not rparams:
+            # "x IN ()" is compiled to "0 = 1", dropping the lhs params.
+            rhs = node.rhs
+            if isinstance(rhs, (list, tuple, set)) and not rhs:
+                return
+            if isinstance(rhs, Clause) and rhs.parens and not rhs.nodes:
+                return
+        params.extend(lparams)
+        params.extend(rparams)
+
+    def _fingerprint_passthrough(self, node, alias_map, conv, key, params):
+        if node.adapt:
+            self._fingerprint_node(
+                node.adapt(node.value), alias_map, None, key, params)
+        else:
+            key.append('?')
+            params.append(node.value)
+
+    def _fingerprint_param(self, node, alias_map, conv, key, params):
+        if node.adapt:
+            if conv and conv.db_value is node.adapt:
+                conv = None
+            self._fingerprint_node(
+                node.adapt(node.value), alias_map, conv, key, params)
+        elif conv is not None:
+            self._fingerprint_node(
+                conv.db_value(node.value), alias_map, None, key, params)
+        else:
+            key.append('?')
+            params.append(node.value)
+
+    def _fingerprint_func(self, node, alias_map, conv, key, params):
+        conv = node._coerce and conv or None
+        key.append(('func', node.name, len(node.arguments)))
+        for argument in node.arguments:
+            self._fingerprint_node(argument, alias_map, conv, key, params)
+
+    def _fingerprint_clause(self, node, alias_map, conv, key, params):
+        key.append(('clause', node.glue, node.parens, len(node.nodes)))
+        for child in node.nodes:
+            self._fingerprint_node(child, alias_map, conv, key, params)
+
+    def _fingerprint_entity(self, node, alias_map, conv, key, params):
+        key.append(('entity', node.path, node._force_quote))
+
+    def _fingerprint_sql(self, node, alias_map, conv, key, params):
+        key.append(node.value)
+        if node.params:
+            params.extend(node.params)
+
+    def _fingerprint_field(self, node, alias_map, conv, key, params):
+        if alias_map:
+            alias = alias_map.lookup(node.model_class)
+        else:
+            alias = None
+        key.append(('field', alias, node.db_column))
+
+    def _fingerprint_select_query(self, node, alias_map, conv, key, params):
+        clone = node.clone()
+        if not node._explicit_selection:
+            if conv and isinstance(conv, ForeignKeyField):
+                select_field = conv.to_field
+            else:
+                select_field = clone.model_class._meta.primary_key
+            clone._select = (select_field,)
+        clauses, sub_alias_map = self._select_clauses(clone, alias_map)
+        key.append(('select_query', len(clauses)))
+        for clause in clauses:
+            self._fingerprint_node(clause, sub_alias_map, None, key, params)
+
+    def _fingerprint_strip_parens(self, node, alias_map, conv, key, params):
+        key.append('strip_parens')
+        self._fingerprint_node(node.node, alias_map, conv, key, params)
+
+    def _fingerprint_node(self, node, alias_map, conv, key, params):
+        # Mirrors `parse_node()`, recording the structure of the generated SQL
+        # in `key` and collecting the parameters in `params`.
+        if isinstance(node, Node):
+            if node._negated or node._alias or node._ordering:
+                key.append(('modifiers', node._negated, node._alias,
+                            node._ordering))
+            node_type = node._node_type
+            if node_type in self._parse_map:
+                try:
+                    fingerprinter = self._fingerprint_map[node_type]
+                except KeyError:
+                    raise _UncacheableQuery(node_type)
+                return fingerprinter(self, node, alias_map, conv, key, params)
+
+        if isinstance(node, (list, tuple, set)):
+            key.append(('list', len(node)))
+            for item in node:
+                self._fingerprint_node(item, alias_map, conv, key, params)
+        elif isinstance(node, Model):
+            key.append('?')
+            if conv and isinstance(conv, ForeignKeyField):
+                to_field = conv.to_field
+                if isinstance(to_field, ForeignKeyField):
+                    params.append(conv.db_value(node))
+                else:
+                    params.append(
+                        to_field.db_value(getattr(node, to_field.name)))
+            else:
+                params.append(node._get_pk_value())
+        elif (isclass(node) and issubclass(node, Model)) or \
+                isinstance(node, ModelAlias):
+            key.append(('model', node.as_entity().path, alias_map[node]))
+        elif conv is not None:
+            value = conv.db_value(node)
+            if isinstance(value, Node) and (
+                    value._negated or value._alias or value._ordering):
+                # The compiler ignores modifiers on converted values.
+                raise _UncacheableQuery(value)
+            self._fingerprint_node(value, alias_map, None, key, params)
+        else:
+            key.append('?')
+            params.append(node)
+
+    def fingerprint(self, node, alias_map=None, conv=None):
+        """
+        Return a hashable fingerprint describing the structure of the SQL
+        generated for `node`, along with the parameters `parse_node()` would
+        produce. Raises `_UncacheableQuery` if the node cannot be cached.
+        """
+        if self._fingerprint_map is None:
+            self._fingerprint_map = self.get_fingerprint_map()
+        key, params = [], []
+        self._fingerprint_node(node, alias_map, conv, key, params)
+        return tuple(key), params
+
     def calculate_alias_map(self, query, alias_map=None):
         new_map = self.alias_map_class()
         if alias_map is not None:
@@ -1886,6 +2227,39 @@ class QueryCompiler(object):
     def build_query(self, clauses, alias_map=None):
         return self.parse_node(Clause(*clauses), alias_map)
 
+    def build_cached_query(self, clauses, alias_map=None):
+        """
+        Like `build_query()`, but consults the compiled-SQL cache (if one was
+        given to the compiler). When a query with the same structure has been
+        compiled before, only the parameters are extracted from the clauses.
+
+        The fingerprint is computed by a separate walk of the clauses, so a
+        miss walks the tree twice. Node types without a `_fingerprint_*`
+        method are not cached, and are always compiled by `parse_node()`.
+        """
+        if self.sql_cache is None:
+            return self.build_query(clauses, alias_map)
+
+        node = Clause(*clauses)
+        try:
+            key, params = self.fingerprint(node, alias_map)
+        except _UncacheableQuery:
+            return self.parse_node(node, alias_map)
+
+        sql = self.sql_cache.get(key)
+        if sql is _UNCACHEABLE:
+            return self.parse_node(node, alias_map)
+        elif sql is not None:
+            return sql, params
+
+        sql, compiled_params = self.parse_node(node, alias_map)
+        try:
+            is_match = compiled_params == params
+        except Exception:
+            is_match = False
+        self.sql_cache.set(key, sql if is_match else _UNCACHEABLE)
+        return sql, compiled_params
+
     def generate_joins(self, joins, model_class, alias_map):
         # Joins are implemented as an adjancency-list graph. Perform a
         # depth-first search of the graph to generate all the necessary JOINs.
@@ -1940,6 +2314,11 @@ class QueryCompiler(object):
         return clauses
 
     def generate_select(self, query, alias_map=None):
+        if alias_map is None:
+            return self.build_cached_query(*self._select_clauses(query))
+        return self.build_query(*self._select_clauses(query, alias_map))
+
+    def _select_clauses(self, query, alias_map=None):
         model = query.model_class
         db = model._meta.database
 
@@ -2001,7 +2380,7 @@ class QueryCompiler(object):
             stmt = 'FOR UPDATE NOWAIT' if no_wait else 'FOR UPDATE'
             clauses.append(SQL(stmt))
 
-        return self.build_query(clauses, alias_map)
+        return clauses, alias_map
 
     def generate_update(self, query):
         model = query.model_class
@@ -2032,7 +2411,7 @@ class QueryCompiler(object):
             returning_clause.glue = ', '
             clauses.extend([SQL('RETURNING'), returning_clause])
 
-        return self.build_query(clauses, alias_map)
+        return self.build_cached_query(clauses, alias_map)
 
     def _get_field_clause(self, fields, clause_type=EnclosedClause):
         return clause_type(*[
@@ -2043,7 +2422,7 @@ class QueryCompiler(object):
         meta = model._meta
         alias_map = self.alias_map_class()
         alias_map.add(model, model._meta.db_table)
-        if query._upsert:
+        if query._upsert and not meta.database.upsert_update:
             statement = meta.database.upsert_sql
         elif query._on_conflict:
             statement = 'INSERT OR %s INTO' % query._on_conflict
@@ -2051,6 +2430,7 @@ class QueryCompiler(object):
             statement = 'INSERT INTO'
         clauses = [SQL(statement), model.as_entity()]
 
+        fields = query._fields or []
         if query._query is not None:
             # This INSERT query is of the form INSERT INTO ... SELECT FROM.
             if query._fields:
@@ -2086,6 +2466,9 @@ class QueryCompiler(object):
                 clauses.append(query.database.default_insert_clause(
                     query.model_class))
 
+        if query._upsert and meta.database.upsert_update:
+            clauses.append(meta.database.upsert_clause(model, fields))
+
         if query.is_insert_returning:
             clauses.extend([
                 SQL('RETURNING'),
@@ -2098,7 +2481,7 @@ class QueryCompiler(object):
             clauses.extend([SQL('RETURNING'), returning_clause])
 
 
-        return self.build_query(clauses, alias_map)
+        return self.build_cached_query(clauses, alias_map)
 
     def generate_delete(self, query):
         model = query.model_class
@@ -2109,7 +2492,7 @@ class QueryCompiler(object):
             returning_clause = Clause(*query._returning)
             returning_clause.glue = ', '
             clauses.extend([SQL('RETURNING'), returning_clause])
-        return self.build_query(clauses)
+        return self.build_cached_query(clauses)
 
     def field_definition(self, field):
         column_type = self.get_column_type(field.get_db_field())
@@ -2244,14 +2627,10 @@ class ResultIterator(object):
         self._idx = 0
 
     def next(self):
-        if self._idx < self.qrw._ct:
-            obj = self.qrw._result_cache[self._idx]
-        elif not self.qrw._populated:
-            obj = self.qrw.iterate()
-            self.qrw._result_cache.append(obj)
-            self.qrw._ct += 1
-        else:
-            raise StopIteration
+        if self._idx >= self.qrw._ct:
+            if self.qrw._populated or not self.qrw.cache_batch():
+                raise StopIteration
+        obj = self.qrw._result_cache[self._idx]
         self._idx += 1
         return obj
     __next__ = next
@@ -2263,7 +2642,11 @@ class QueryResultWrapper(object):
     two things:
     - converts rows from the database into python representations
     - ensures that multiple iterations do not result in multiple queries
+
+    Rows are read from the cursor `fetch_size` at a time using `fetchmany()`.
     """
+    fetch_size = 100
+
     def __init__(self, model, cursor, meta=None):
         self.model = model
         self.cursor = cursor
@@ -2274,6 +2657,10 @@ class QueryResultWrapper(object):
         self._result_cache = []
         self._populated = False
         self._initialized = False
+        self._related_loader = None
+        self._buffer = iter(())
+        # Some drivers, e.g. apsw, do not implement fetchmany().
+        self._fetchmany = getattr(cursor, 'fetchmany', None)
 
         if meta is not None:
             self.column_meta, self.join_meta = meta
@@ -2297,21 +2684,52 @@ class QueryResultWrapper(object):
     def process_row(self, row):
         return row
 
-    def iterate(self):
-        row = self.cursor.fetchone()
-        if not row:
+    def fetch_rows(self):
+        if self._fetchmany is not None:
+            rows = self._fetchmany(self.fetch_size)
+        else:
+            row = self.cursor.fetchone()
+            rows = [row] if row else []
+        if not rows:
             self._populated = True
             if not getattr(self.cursor, 'name', None):
                 self.cursor.close()
-            raise StopIteration
         elif not self._initialized:
             self.initialize(self.cursor.description)
             self._initialized = True
-        return self.process_row(row)
+        return rows
+
+    def iterate_batch(self):
+        process_row = self.process_row
+        return [process_row(row) for row in self.fetch_rows()]
+
+    def iterate(self):
+        try:
+            return next(self._buffer)
+        except StopIteration:
+            objs = self.iterate_batch()
+            if not objs:
+                raise
+            self._buffer = iter(objs)
+            return next(self._buffer)
+
+    def cache_batch(self):
+        # Add the next batch of results to the cache, returning the number of
+        # results added.
+        objs = list(self._buffer) or self.iterate_batch()
+        if self._related_loader is not None:
+            for obj in objs:
+                obj._related_loader = self._related_loader
+        self._result_cache.extend(objs)
+        self._ct += len(objs)
+        return len(objs)
 
     def iterator(self):
         while True:
-            yield self.iterate()
+            try:
+                yield self.iterate()
+            except StopIteration:
+                return
 
     def next(self):
         if self._idx < self._ct:
@@ -2325,6 +2743,8 @@ class QueryResultWrapper(object):
         self._result_cache.append(obj)
         self._ct += 1
         self._idx += 1
+        if self._related_loader is not None:
+            obj._related_loader = self._related_loader
         return obj
     __next__ = next
 
@@ -2332,6 +2752,11 @@ class QueryResultWrapper(object):
         n = n or float('Inf')
         if n < 0:
             raise ValueError('Negative values are not supported.')
+        if n == float('Inf'):
+            while not self._populated and self.cache_batch():
+                pass
+            self._idx = self._ct
+            return
         self._idx = self._ct
         while not self._populated and (n > self._ct):
             try:
@@ -2386,12 +2811,40 @@ class TuplesQueryResultWrapper(ExtQueryResultWrapper):
 if _TuplesQueryResultWrapper is None:
     _TuplesQueryResultWrapper = TuplesQueryResultWrapper
 
+class NamedTupleQueryResultWrapper(ExtQueryResultWrapper):
+    """
+    Return each row as a read-only namedtuple, with field values converted
+    using `python_value()`. The namedtuple class is generated once for each
+    combination of model and column names.
+    """
+    _row_classes = {}
+
+    def initialize(self, description):
+        super(NamedTupleQueryResultWrapper, self).initialize(description)
+        names = tuple(name for _, name, _ in self.conv)
+        key = (self.model, names)
+        if key not in self._row_classes:
+            self._row_classes[key] = namedtuple(
+                '%sRow' % self.model.__name__, names, rename=True)
+        self.row_class = self._row_classes[key]
+        self.converters = [(i, f) for i, _, f in self.conv if f is not None]
+
+    def process_row(self, row):
+        row = list(row)
+        for i, f in self.converters:
+            row[i] = f(row[i])
+        return self.row_class._make(row)
+
 class NaiveQueryResultWrapper(ExtQueryResultWrapper):
+    def initialize(self, description):
+        super(NaiveQueryResultWrapper, self).initialize(description)
+        self.identity_map = self.model._meta.database.get_identity_map()
+        self.constructor = _make_row_constructor(self.model, self.conv)
+
     def process_row(self, row):
-        instance = self.model()
-        for i, column, f in self.conv:
-            setattr(instance, column, f(row[i]) if f is not None else row[i])
-        instance._prepare_instance()
+        instance = self.constructor(row)
+        if self.identity_map is not None:
+            return self.identity_map.merge(instance)
         return instance
 
 if _ModelQueryResultWrapper is None:
@@ -2407,12 +2860,99 @@ class DictQueryResultWrapper(ExtQueryResultWrapper):
 if _DictQueryResultWrapper is None:
     _DictQueryResultWrapper = DictQueryResultWrapper
 
+try:
+    array('q')
+except ValueError:  # 64-bit typecode requires Python 3.3+.
+    _INT_TYPECODE = 'l'
+else:
+    _INT_TYPECODE = 'q'
+
+class ColumnarQueryResultWrapper(ExtQueryResultWrapper):
+    """
+    Reads the result set in chunks using `fetchmany()` (or `fetchone()` for
+    drivers without it), collecting the values of each column into a single
+    `array.array` (integer and float columns) or list (any other column).
+    """
+    chunk_size = 10000
+
+    def _get_typecode(self, values):
+        for value in values:
+            if value is not None:
+                if type(value) in (int, long):
+                    return _INT_TYPECODE
+                elif type(value) is float:
+                    return 'd'
+                return None
+
+    def _extend(self, column, values):
+        if column is None:
+            typecode = self._get_typecode(values)
+            column = array(typecode) if typecode else []
+        if isinstance(column, array):
+            try:
+                column.fromlist(values)  # Leaves array unchanged on error.
+            except (TypeError, OverflowError):
+                column = column.tolist()
+                column.extend(values)
+        else:
+            column.extend(values)
+        return column
+
+    def _fetch_chunk(self, chunk_size):
+        if self._fetchmany is not None:
+            return self._fetchmany(chunk_size)
+        rows = []
+        while len(rows) < chunk_size:
+            row = self.cursor.fetchone()
+            if not row:
+                break
+            rows.append(row)
+        return rows
+
+    def read_columns(self, chunk_size=None, use_numpy=False):
+        if use_numpy:
+            try:
+                import numpy
+            except ImportError:
+                raise ImproperlyConfigured('numpy must be installed.')
+
+        self.initialize(self.cursor.description)
+        self._initialized = True
+        columns = [None] * len(self.conv)
+        chunk_size = chunk_size or self.chunk_size
+        while True:
+            rows = self._fetch_chunk(chunk_size)
+            if not rows:
+                break
+            for i, values in enumerate(zip(*rows)):
+                func = self.conv[i][2]
+                if func is not None:
+                    values = list(map(func, values))
+                else:
+                    values = list(values)
+                columns[i] = self._extend(columns[i], values)
+        self._populated = True
+        self.cursor.close()
+
+        result = OrderedDict()
+        for (i, name, _), column in zip(self.conv, columns):
+            if column is None:
+                column = []
+            if use_numpy:
+                if isinstance(column, array):
+                    column = numpy.frombuffer(column, dtype=column.typecode)
+                else:
+                    column = numpy.array(column, dtype=object)
+            result[name] = column
+        return result
+
 class ModelQueryResultWrapper(QueryResultWrapper):
     def initialize(self, description):
         self.column_map, model_set = self.generate_column_map()
         self._col_set = set(col for col in self.column_meta
                             if isinstance(col, Field))
         self.join_list = self.generate_join_list(model_set)
+        self.identity_map = self.model._meta.database.get_identity_map()
 
     def generate_column_map(self):
         column_map = []
@@ -2476,6 +3016,8 @@ class ModelQueryResultWrapper(QueryResultWrapper):
         instances = self.follow_joins(collected)
         for i in instances:
             i._prepare_instance()
+        if self.identity_map is not None:
+            return self.identity_map.merge_all(instances)[0]
         return instances[0]
 
     def construct_instances(self, row, keys=None):
@@ -2542,133 +3084,208 @@ class ModelQueryResultWrapper(QueryResultWrapper):
         return prepared
 
 
+class RelatedBatchLoader(object):
+    """
+    Loads a foreign key for every instance in a result set using a single
+    query, the first time the foreign key is accessed on any one of them.
+    """
+    def __init__(self, qrw):
+        self.qrw = qrw
+        self.loaded = set()
+
+    def load(self, descriptor):
+        att_name = descriptor.att_name
+        if att_name in self.loaded:
+            return
+        self.loaded.add(att_name)
+        self.qrw.fill_cache()
+
+        to_field = descriptor.field.to_field
+        pending = {}
+        for instance in self.qrw._result_cache:
+            rel_id = instance._data.get(att_name)
+            if rel_id is not None and att_name not in instance._obj_cache:
+                pending.setdefault(rel_id, [])
+                pending[rel_id].append(instance)
+        if not pending:
+            return
+
+        rel_ids = list(pending)
+        rel_model = descriptor.rel_model
+        batch_size = rel_model._meta.database.max_params or len(rel_ids)
+        for idx in range(0, len(rel_ids), batch_size):
+            query = (rel_model
+                     .select()
+                     .where(to_field << rel_ids[idx:idx + batch_size])
+                     .batch_relations())
+            for obj in query:
+                for instance in pending.get(obj._data[to_field.name], ()):
+                    instance._obj_cache[att_name] = obj
+
+
 JoinCache = namedtuple('JoinCache', ('metadata', 'attr'))
 
 
 class AggregateQueryResultWrapper(ModelQueryResultWrapper):
+    """
+    Combine the rows of a query over one-to-many joins into one instance of
+    the queried model per primary key, with the related instances attached
+    as lists. Instances are identified by their primary key (or by all of
+    their columns, if the primary key was not selected), so each distinct
+    instance is constructed only once.
+
+    By default the rows of each instance of the queried model must be
+    adjacent, so that each instance can be returned as soon as its last row
+    has been read. When `ordered` is False, every row is read and grouped
+    before the first instance is returned.
+    """
+    ordered = True
+
     def __init__(self, *args, **kwargs):
-        self._row = []
+        self._rows = deque()
+        self._groups = None
         super(AggregateQueryResultWrapper, self).__init__(*args, **kwargs)
 
     def initialize(self, description):
         super(AggregateQueryResultWrapper, self).initialize(description)
 
-        # Collect the set of all models (and ModelAlias objects) queried.
-        self.all_models = set()
-        for key, _, _, _ in self.column_map:
-            self.all_models.add(key)
-
-        # Prepare data structures for analyzing unique rows. Also cache
-        # foreign key and attribute names for joined models.
-        self.models_with_aggregate = set()
-        self.back_references = {}
+        # Cache foreign key and attribute names for joined models.
         self.source_to_dest = {}
-        self.dest_to_source = {}
-
         for (metadata, _, _, _) in self.join_list:
             if metadata.is_backref:
                 att_name = metadata.foreign_key.related_name
             else:
                 att_name = metadata.attr
 
-            is_backref = metadata.is_backref or metadata.is_self_join
-            if is_backref:
-                self.models_with_aggregate.add(metadata.src)
-            else:
-                self.dest_to_source.setdefault(metadata.dest, set())
-                self.dest_to_source[metadata.dest].add(metadata.src)
-
             self.source_to_dest.setdefault(metadata.src, {})
             self.source_to_dest[metadata.src][metadata.dest] = JoinCache(
                 metadata=metadata,
                 attr=metadata.alias or att_name)
 
-        # Determine which columns could contain "duplicate" data, e.g. if
-        # getting Users and their Tweets, this would be the User columns.
-        self.columns_to_compare = {}
-        key_to_columns = {}
-        for idx, (key, model_class, col_name, _) in enumerate(self.column_map):
-            if key in self.models_with_aggregate:
-                self.columns_to_compare.setdefault(key, [])
-                self.columns_to_compare[key].append((idx, col_name))
-
-            key_to_columns.setdefault(key, [])
-            key_to_columns[key].append((idx, col_name))
-
-        # Also compare columns for joins -> many-related model.
-        for model_or_alias in self.models_with_aggregate:
-            if model_or_alias not in self.columns_to_compare:
-                continue
-            sources = self.dest_to_source.get(model_or_alias, ())
-            for joined_model in sources:
-                self.columns_to_compare[model_or_alias].extend(
-                    key_to_columns[joined_model])
-
-    def read_model_data(self, row):
-        models = {}
-        for model_class, column_data in self.columns_to_compare.items():
-            models[model_class] = []
-            for idx, col_name in column_data:
-                models[model_class].append(row[idx])
-        return models
+        # Group the columns by the model (or alias) they belong to, and find
+        # the indexes of the columns identifying each model.
+        key_columns = OrderedDict()
+        constructors = {}
+        for idx, (key, constructor, attr, conv) in enumerate(self.column_map):
+            if attr is None:
+                attr = description[idx][0]
+            key_columns.setdefault(key, [])
+            key_columns[key].append((idx, attr, conv))
+            constructors[key] = constructor
+
+        self.key_info = []
+        for key, columns in key_columns.items():
+            constructor = constructors[key]
+            if constructor._meta.primary_key is False:
+                pk_names = []
+            else:
+                pk_names = [field.name for field in
+                            constructor._meta.get_primary_key_fields()]
+            attr_to_idx = dict((attr, idx) for idx, attr, _ in columns)
+            if pk_names and all(name in attr_to_idx for name in pk_names):
+                ident = [attr_to_idx[name] for name in pk_names]
+            else:
+                ident = [idx for idx, _, _ in columns]
 
-    def iterate(self):
-        if self._row:
-            row = self._row.pop()
-        else:
-            row = self.cursor.fetchone()
+            # The getter returns a single value for a single index, or a
+            # tuple of values otherwise.
+            getter = operator.itemgetter(*ident)
+            null = None if len(ident) == 1 else (None,) * len(ident)
+            if key is self.model:
+                self.get_ident = getter
+            self.key_info.append((key, constructor, columns, getter, null))
 
-        if not row:
-            self._populated = True
-            if not getattr(self.cursor, 'name', None):
-                self.cursor.close()
-            raise StopIteration
-        elif not self._initialized:
-            self.initialize(self.cursor.description)
-            self._initialized = True
+    def iterate_batch(self):
+        try:
+            return [self.iterate()]
+        except StopIteration:
+            return []
+
+    def next_row(self):
+        # Rows are buffered unprocessed, since consecutive rows are merged.
+        if not self._rows:
+            if self._populated:
+                return None
+            self._rows.extend(self.fetch_rows())
+            if not self._rows:
+                return None
+        return self._rows.popleft()
+
+    def new_group(self):
+        # A group holds, for each model, the instances keyed by primary key
+        # and the identifying values that have already been seen.
+        return dict((key, (OrderedDict(), set()))
+                    for key, _, _, _, _ in self.key_info)
+
+    def add_row(self, group, row):
+        for key, constructor, columns, getter, null in self.key_info:
+            instances, seen = group[key]
+            value = getter(row)
+            if value in seen:
+                continue
+            seen.add(value)
+
+            # Do not include any joined instances which are comprised solely
+            # of NULL values.
+            if value == null and key is not self.model:
+                continue
 
-        def _get_pk(instance):
+            instance = constructor()
+            for idx, attr, conv in columns:
+                setattr(instance, attr,
+                        row[idx] if conv is None else conv(row[idx]))
             if instance._meta.composite_key:
-                return tuple([
+                pk = tuple([
                     instance._data[field_name]
                     for field_name in instance._meta.primary_key.field_names])
-            return instance._get_pk_value()
+            else:
+                pk = instance._get_pk_value()
+            instances[pk] = instance
 
-        identity_map = {}
-        _constructed = self.construct_instances(row)
-        primary_instance = _constructed[self.model]
-        for model_or_alias, instance in _constructed.items():
-            identity_map[model_or_alias] = OrderedDict()
-            identity_map[model_or_alias][_get_pk(instance)] = instance
+    def iterate(self):
+        if not self.ordered:
+            return self.iterate_grouped()
 
-        model_data = self.read_model_data(row)
+        row = self.next_row()
+        if row is None:
+            raise StopIteration
+
+        ident = self.get_ident(row)
+        group = self.new_group()
+        self.add_row(group, row)
         while True:
-            cur_row = self.cursor.fetchone()
-            if cur_row is None:
+            row = self.next_row()
+            if row is None:
                 break
-
-            duplicate_models = set()
-            cur_row_data = self.read_model_data(cur_row)
-            for model_class, data in cur_row_data.items():
-                if model_data[model_class] == data:
-                    duplicate_models.add(model_class)
-
-            if not duplicate_models:
-                self._row.append(cur_row)
+            elif self.get_ident(row) != ident:
+                self._rows.appendleft(row)
                 break
+            self.add_row(group, row)
+
+        return self.link_group(group)
+
+    def iterate_grouped(self):
+        if self._groups is None:
+            groups = OrderedDict()
+            row = self.next_row()
+            while row is not None:
+                ident = self.get_ident(row)
+                if ident not in groups:
+                    groups[ident] = self.new_group()
+                self.add_row(groups[ident], row)
+                row = self.next_row()
+            self._groups = deque(groups.values())
+            # The cursor is exhausted, but the groups remain to be returned.
+            self._populated = False
+
+        if not self._groups:
+            self._populated = True
+            raise StopIteration
+        return self.link_group(self._groups.popleft())
 
-            different_models = self.all_models - duplicate_models
-
-            new_instances = self.construct_instances(cur_row, different_models)
-            for model_or_alias, instance in new_instances.items():
-                # Do not include any instances which are comprised solely of
-                # NULL values.
-                all_none = True
-                for value in instance._data.values():
-                    if value is not None:
-                        all_none = False
-                if not all_none:
-                    identity_map[model_or_alias][_get_pk(instance)] = instance
+    def link_group(self, group):
+        identity_map = dict((key, group[key][0]) for key in group)
+        primary_instance = next(iter(identity_map[self.model].values()))
 
         stack = [self.model]
         instances = [primary_instance]
@@ -2708,8 +3325,10 @@ class AggregateQueryResultWrapper(ModelQueryResultWrapper):
 
                     for pk, instance in identity_map[current].items():
                         # XXX: if no FK exists, unable to join.
-                        joined_inst = identity_map[join.dest][
-                            instance._data[metadata.foreign_key.name]]
+                        joined_inst = identity_map[join.dest].get(
+                            instance._data.get(metadata.foreign_key.name))
+                        if joined_inst is None:
+                            continue
                         setattr(
                             instance,
                             metadata.foreign_key.name,
@@ -2912,12 +3531,14 @@ class RawQuery(Query):
         self._qr = None
         self._tuples = False
         self._dicts = False
+        self._namedtuples = False
         super(RawQuery, self).__init__(model)
 
     def clone(self):
         query = RawQuery(self.model_class, self._sql, *self._params)
         query._tuples = self._tuples
         query._dicts = self._dicts
+        query._namedtuples = self._namedtuples
         return query
 
     join = not_allowed('joining')
@@ -2932,6 +3553,10 @@ class RawQuery(Query):
     def dicts(self, dicts=True):
         self._dicts = dicts
 
+    @returns_clone
+    def namedtuples(self, namedtuples=True):
+        self._namedtuples = namedtuples
+
     def sql(self):
         return self._sql, self._params
 
@@ -2941,6 +3566,8 @@ class RawQuery(Query):
                 QRW = self.database.get_result_wrapper(RESULTS_TUPLES)
             elif self._dicts:
                 QRW = self.database.get_result_wrapper(RESULTS_DICTS)
+            elif self._namedtuples:
+                QRW = self.database.get_result_wrapper(RESULTS_NAMEDTUPLES)
             else:
                 QRW = self.database.get_result_wrapper(RESULTS_NAIVE)
             self._qr = QRW(self.model_class, self._execute(), None)
@@ -2977,7 +3604,11 @@ class SelectQuery(Query):
         self._naive = False
         self._tuples = False
         self._dicts = False
+        self._namedtuples = False
         self._aggregate_rows = False
+        self._aggregate_ordered = True
+        self._batch_relations = False
+        self._fetch_size = None
         self._alias = None
         self._qr = None
 
@@ -3007,7 +3638,11 @@ class SelectQuery(Query):
         query._naive = self._naive
         query._tuples = self._tuples
         query._dicts = self._dicts
+        query._namedtuples = self._namedtuples
         query._aggregate_rows = self._aggregate_rows
+        query._aggregate_ordered = self._aggregate_ordered
+        query._batch_relations = self._batch_relations
+        query._fetch_size = self._fetch_size
         query._alias = self._alias
         return query
 
@@ -3095,8 +3730,21 @@ class SelectQuery(Query):
         self._dicts = dicts
 
     @returns_clone
-    def aggregate_rows(self, aggregate_rows=True):
+    def namedtuples(self, namedtuples=True):
+        self._namedtuples = namedtuples
+
+    @returns_clone
+    def aggregate_rows(self, aggregate_rows=True, ordered=True):
         self._aggregate_rows = aggregate_rows
+        self._aggregate_ordered = ordered
+
+    @returns_clone
+    def batch_relations(self, batch_relations=True):
+        self._batch_relations = batch_relations
+
+    @returns_clone
+    def fetch_size(self, fetch_size=None):
+        self._fetch_size = fetch_size
 
     @returns_clone
     def alias(self, alias=None):
@@ -3147,6 +3795,17 @@ class SelectQuery(Query):
         clone._select = [SQL('1')]
         return bool(clone.scalar())
 
+    def columnar(self, chunk_size=None, use_numpy=False):
+        """
+        Execute the query, returning an ordered mapping of column name to an
+        array of the values in that column.
+        """
+        wrapper = ColumnarQueryResultWrapper(
+            self.model_class,
+            self._execute(),
+            self.get_query_meta())
+        return wrapper.read_columns(chunk_size, use_numpy)
+
     def get(self, *query, **kwargs):
         if query or kwargs:
             sq = self
@@ -3241,6 +3900,8 @@ class SelectQuery(Query):
             return self.database.get_result_wrapper(RESULTS_TUPLES)
         elif self._dicts:
             return self.database.get_result_wrapper(RESULTS_DICTS)
+        elif self._namedtuples:
+            return self.database.get_result_wrapper(RESULTS_NAMEDTUPLES)
         elif self._naive or not self._joins or self.verify_naive():
             return self.database.get_result_wrapper(RESULTS_NAIVE)
         elif self._aggregate_rows:
@@ -3260,7 +3921,24 @@ class SelectQuery(Query):
             ) and len(self._fetch_related)>0:
                 self._qr = PlusPrefetchResultWrapper(ResultWrapper, model_class, self, query_meta, self._fetch_related)
             else:
+                model_rows = not (
+                    self._tuples or self._dicts or self._namedtuples)
+                batch_relations = self._batch_relations and model_rows
+                use_python = batch_relations or (
+                    model_rows and
+                    self.database.get_identity_map() is not None)
+                if use_python and not issubclass(
+                        ResultWrapper, QueryResultWrapper):
+                    # Batched loading and the identity map are implemented
+                    # by the Python wrappers.
+                    ResultWrapper = NaiveQueryResultWrapper
                 self._qr = ResultWrapper(model_class, self._execute(), query_meta)
+                if self._fetch_size:
+                    self._qr.fetch_size = self._fetch_size
+                if isinstance(self._qr, AggregateQueryResultWrapper):
+                    self._qr.ordered = self._aggregate_ordered
+                if batch_relations:
+                    self._qr._related_loader = RelatedBatchLoader(self._qr)
             self._dirty = False
             return self._qr
         else:
@@ -3272,6 +3950,39 @@ class SelectQuery(Query):
     def iterator(self):
         return iter(self.execute().iterator())
 
+    def stream(self, itersize=2000):
+        """
+        Iterate over the results without caching them. On databases that
+        support server-side cursors (Postgresql) the query is executed using
+        a named cursor inside a transaction, and rows are fetched from the
+        server `itersize` at a time, so client memory use stays bounded. The
+        cursor is closed when iteration finishes or the generator is closed.
+        """
+        database = self.database
+        ResultWrapper = self._get_result_wrapper()
+        query_meta = self.get_query_meta()
+        if not database.named_cursors:
+            qr = ResultWrapper(self.model_class, self._execute(), query_meta)
+            qr.fetch_size = itersize
+            for obj in qr.iterator():
+                yield obj
+            return
+
+        sql, params = self.sql()
+        logger.debug((sql, params))
+        with database.atomic():
+            with database.exception_wrapper():
+                name = 'peewee_%s' % uuid.uuid4().hex
+                cursor = database.get_cursor(name=name)
+                try:
+                    cursor.execute(sql, params or ())
+                    qr = ResultWrapper(self.model_class, cursor, query_meta)
+                    qr.fetch_size = itersize
+                    for obj in qr.iterator():
+                        yield obj
+                finally:
+                    cursor.close()
+
     def __getitem__(self, value):
         res = self.execute()
         if isinstance(value, slice):
@@ -3359,6 +4070,8 @@ class CompoundSelect(SelectQuery):
             return self.database.get_result_wrapper(RESULTS_TUPLES)
         elif self._dicts:
             return self.database.get_result_wrapper(RESULTS_DICTS)
+        elif self._namedtuples:
+            return self.database.get_result_wrapper(RESULTS_NAMEDTUPLES)
         elif self._aggregate_rows:
             return self.database.get_result_wrapper(RESULTS_AGGREGATE_MODELS)
 
@@ -3470,7 +4183,8 @@ class UpdateQuery(_WriteQuery):
 
 class InsertQuery(_WriteQuery):
     def __init__(self, model_class, field_dict=None, rows=None,
-                 fields=None, query=None, validate_fields=False):
+                 fields=None, query=None, validate_fields=False,
+                 batch_size=None):
         super(InsertQuery, self).__init__(model_class)
 
         self._upsert = False
@@ -3485,6 +4199,7 @@ class InsertQuery(_WriteQuery):
         self._query = query
         self._validate_fields = validate_fields
         self._on_conflict = None
+        self._batch_size = batch_size
 
     def _iter_rows(self):
         model_meta = self.model_class._meta
@@ -3525,6 +4240,7 @@ class InsertQuery(_WriteQuery):
         query._return_id_list = self._return_id_list
         query._validate_fields = self._validate_fields
         query._on_conflict = self._on_conflict
+        query._batch_size = self._batch_size
         return query
 
     join = not_allowed('joining')
@@ -3552,6 +4268,136 @@ class InsertQuery(_WriteQuery):
     def sql(self):
         return self.compiler().generate_insert(self)
 
+    def _get_batch_size(self, row):
+        # Determine how many rows can be inserted per statement, based on the
+        # number of columns in the row and the maximum number of parameters
+        # the database accepts in a single query.
+        if self._batch_size:
+            return self._batch_size
+        max_params = self.database.max_params
+        if not max_params:
+            return None
+        meta = self.model_class._meta
+        columns = set(meta._default_dict)
+        columns.update(meta._default_callables)
+        columns.update(meta.fields.get(key, key) for key in row)
+        return max(1, max_params // max(1, len(columns)))
+
+    def _insert_batched(self):
+        # Consume the rows lazily, executing one multi-row INSERT per batch so
+        # that arbitrarily large iterables can be loaded in bounded memory.
+        rows = iter(self._rows)
+        id_list = []
+
+        def get_batch():
+            # The columns of each INSERT are taken from its first row, so the
+            # size of every batch is based on the row that starts it.
+            try:
+                first = next(rows)
+            except StopIteration:
+                return []
+            batch_size = self._get_batch_size(first)
+            if batch_size is not None:
+                batch_size -= 1
+            return [first] + list(itertools.islice(rows, batch_size))
+
+        def insert_batch(batch):
+            query = self.clone()
+            query._rows = batch
+            query._batch_size = None
+            cursor = query._execute()
+            if self._return_id_list:
+                id_list.extend(row[0] for row in cursor.fetchall())
+
+        batch = get_batch()
+        if not batch:
+            return None
+        next_batch = get_batch()
+
+        if not next_batch:
+            insert_batch(batch)
+        else:
+            with self.database.atomic():
+                while batch:
+                    insert_batch(batch)
+                    batch, next_batch = next_batch, get_batch()
+
+        if self._return_id_list:
+            return id_list
+        return True
+
+    def _insert_with_executemany(self):
+        # Compile the INSERT once, using the first row that holds only plain
+        # values, then feed the values of all the rows that have the same
+        # columns through executemany(). Rows with different columns or with
+        # SQL expressions as values are inserted individually. The last row
+        # is inserted separately so its id can be returned.
+        rows = self._iter_rows()
+        try:
+            row = next(rows)
+        except StopIteration:
+            return None
+
+        batch_size = self._batch_size or 1000
+        database = self.database
+        sql = converters = None
+        batch = []
+
+        def insert_one(row):
+            return (InsertQuery(self.model_class, row)
+                    .upsert(self._upsert)
+                    .on_conflict(self._on_conflict)
+                    .execute())
+
+        def flush(sql):
+            if batch:
+                database.execute_sql_many(sql, batch)
+                del batch[:]
+
+        def get_values(row):
+            if len(row) != len(converters):
+                return None
+            values = []
+            for field, db_value in converters:
+                try:
+                    value = row[field]
+                except KeyError:
+                    return None
+                if isinstance(value, Model):
+                    value = value._get_pk_value()
+                elif isinstance(value, Node):
+                    return None
+                else:
+                    value = db_value(value)
+                values.append(value)
+            return values
+
+        with database.atomic():
+            for next_row in rows:
+                if sql is None and not any(
+                        isinstance(value, Node) for value in row.values()):
+                    fields = sorted(row, key=operator.attrgetter('_sort_key'))
+                    converters = [(field, field.db_value) for field in fields]
+                    query = self.clone()
+                    query._rows = [row]
+                    sql, _ = query.sql()
+
+                values = None
+                if sql is not None:
+                    values = get_values(row)
+
+                if values is None:
+                    flush(sql)
+                    insert_one(row)
+                else:
+                    batch.append(values)
+                    if len(batch) >= batch_size:
+                        flush(sql)
+                row = next_row
+
+            flush(sql)
+            return insert_one(row)
+
     def _insert_with_loop(self):
         id_list = []
         last_id = None
@@ -3575,7 +4421,22 @@ class InsertQuery(_WriteQuery):
             self._returning is None and
             not self.database.insert_many)
         if insert_with_loop:
-            return self._insert_with_loop()
+            if self._return_id_list:
+                return self._insert_with_loop()
+            return self._insert_with_executemany()
+
+        insert_batched = (
+            self._is_multi_row_insert and
+            self._query is None and
+            self._returning is None and
+            self._qr is None and
+            (self._batch_size or self.database.max_params))
+        if insert_batched:
+            result = self._insert_batched()
+            if result is not None:
+                return result
+            # No rows were given, fall back to a bare insert.
+            self._rows = []
 
         if self._returning is not None and self._qr is None:
             return self._execute_with_result_wrapper()
@@ -3586,6 +4447,9 @@ class InsertQuery(_WriteQuery):
             if not self._is_multi_row_insert:
                 if self.database.insert_returning:
                     pk_row = cursor.fetchone()
+                    if pk_row is None:
+                        # An upsert that did nothing returns no rows.
+                        return None
                     meta = self.model_class._meta
                     clean_data = [
                         field.python_value(column)
@@ -3664,6 +4528,7 @@ class _BaseConnectionLocal(object):
         self.conn = None
         self.context_stack = []
         self.transactions = []
+        self.identity_maps = []
 
 class _ConnectionLocal(_BaseConnectionLocal, threading.local):
     pass
@@ -3683,6 +4548,8 @@ class Database(object):
     insert_returning = False
     interpolation = '?'
     limit_max = None
+    max_params = None
+    named_cursors = False
     op_overrides = {}
     quote_char = '"'
     reserved_tables = []
@@ -3690,7 +4557,9 @@ class Database(object):
     savepoints = True
     sequences = False
     subquery_delete_same_table = True
+    update_case_cast = False
     upsert_sql = None
+    upsert_update = False
     window_functions = False
 
     exceptions = {
@@ -3706,7 +4575,7 @@ class Database(object):
 
     def __init__(self, database, threadlocals=True, autocommit=True,
                  fields=None, ops=None, autorollback=False, use_speedups=True,
-                 **connect_kwargs):
+                 sql_cache_size=0, **connect_kwargs):
         self.connect_kwargs = {}
         if threadlocals:
             self._local = _ConnectionLocal()
@@ -3718,6 +4587,10 @@ class Database(object):
         self.autocommit = autocommit
         self.autorollback = autorollback
         self.use_speedups = use_speedups
+        if sql_cache_size:
+            self._sql_cache = SqlCache(sql_cache_size)
+        else:
+            self._sql_cache = None
 
         self.field_overrides = merge_dict(self.field_overrides, fields or {})
         self.op_overrides = merge_dict(self.op_overrides, ops or {})
@@ -3800,6 +4673,8 @@ class Database(object):
                     else DictQueryResultWrapper)
         elif wrapper_type == RESULTS_AGGREGATE_MODELS:
             return AggregateQueryResultWrapper
+        elif wrapper_type == RESULTS_NAMEDTUPLES:
+            return NamedTupleQueryResultWrapper
         else:
             return (_ModelQueryResultWrapper if self.use_speedups
                     else NaiveQueryResultWrapper)
@@ -3814,7 +4689,19 @@ class Database(object):
     def compiler(self):
         return self.compiler_class(
             self.quote_char, self.interpolation, self.field_overrides,
-            self.op_overrides)
+            self.op_overrides, sql_cache=self._sql_cache)
+
+    def sql_cache_info(self):
+        """
+        Return the hit/miss counters and size of the compiled-SQL cache, or
+        `None` if the cache is disabled.
+        """
+        if self._sql_cache is not None:
+            return self._sql_cache.info()
+
+    def clear_sql_cache(self):
+        if self._sql_cache is not None:
+            self._sql_cache.clear()
 
     def execute(self, clause):
         return self.execute_sql(*self.compiler().parse_node(clause))
@@ -3834,6 +4721,21 @@ class Database(object):
                     self.commit()
         return cursor
 
+    def execute_sql_many(self, sql, seq_of_params, require_commit=True):
+        logger.debug((sql, '<executemany>'))
+        with self.exception_wrapper():
+            cursor = self.get_cursor()
+            try:
+                cursor.executemany(sql, seq_of_params)
+            except Exception:
+                if self.get_autocommit() and self.autorollback:
+                    self.rollback()
+                raise
+            else:
+                if require_commit and self.get_autocommit():
+                    self.commit()
+        return cursor
+
     def begin(self):
         pass
 
@@ -3860,8 +4762,9 @@ class Database(object):
     def execution_context_depth(self):
         return len(self._local.context_stack)
 
-    def execution_context(self, with_transaction=True):
-        return ExecutionContext(self, with_transaction=with_transaction)
+    def execution_context(self, with_transaction=True, identity_map=False):
+        return ExecutionContext(self, with_transaction=with_transaction,
+                                identity_map=identity_map)
 
     def push_transaction(self, transaction):
         self._local.transactions.append(transaction)
@@ -3872,8 +4775,21 @@ class Database(object):
     def transaction_depth(self):
         return len(self._local.transactions)
 
-    def transaction(self):
-        return transaction(self)
+    def transaction(self, identity_map=False):
+        return transaction(self, identity_map=identity_map)
+
+    def push_identity_map(self, identity_map):
+        self._local.identity_maps.append(identity_map)
+
+    def pop_identity_map(self):
+        self._local.identity_maps.pop()
+
+    def get_identity_map(self):
+        if self._local.identity_maps:
+            return self._local.identity_maps[-1]
+
+    def identity_map(self):
+        return _identity_map(self)
 
     def commit_on_success(self, func):
         @wraps(func)
@@ -3977,6 +4893,16 @@ class Database(object):
     def default_insert_clause(self, model_class):
         return SQL('DEFAULT VALUES')
 
+    def upsert_clause(self, model_class, fields):
+        raise NotImplementedError
+
+    def _upsert_update_fields(self, model_class, fields):
+        pk_names = set(
+            field.name
+            for field in model_class._meta.get_primary_key_fields()
+            if field is not False)
+        return [field for field in fields if field.name not in pk_names]
+
     def get_noop_sql(self):
         return 'SELECT 0 WHERE 0'
 
@@ -3993,6 +4919,7 @@ class SqliteDatabase(Database):
     foreign_keys = False
     insert_many = sqlite3 and sqlite3.sqlite_version_info >= (3, 7, 11, 0)
     limit_max = -1
+    max_params = 999  # SQLITE_MAX_VARIABLE_NUMBER.
     op_overrides = {
         OP.LIKE: 'GLOB',
         OP.ILIKE: 'LIKE',
@@ -4118,20 +5045,25 @@ class PostgresqlDatabase(Database):
     for_update_nowait = True
     insert_returning = True
     interpolation = '%s'
+    max_params = 32767
+    named_cursors = True
     op_overrides = {
         OP.REGEXP: '~',
     }
     reserved_tables = ['user']
     returning_clause = True
     sequences = True
+    update_case_cast = True
     window_functions = True
 
     register_unicode = True
+    _server_version = None
 
     def _connect(self, database, encoding=None, **kwargs):
         if not psycopg2:
             raise ImproperlyConfigured('psycopg2 must be installed.')
         conn = psycopg2.connect(database=database, **kwargs)
+        self._server_version = conn.server_version
         if self.register_unicode:
             pg_extensions.register_type(pg_extensions.UNICODE, conn)
             pg_extensions.register_type(pg_extensions.UNICODEARRAY, conn)
@@ -4139,6 +5071,23 @@ class PostgresqlDatabase(Database):
             conn.set_client_encoding(encoding)
         return conn
 
+    @property
+    def server_version(self):
+        """Version of the server as an integer, e.g. 90504 for 9.5.4."""
+        if self._server_version is None:
+            self._server_version = self.get_conn().server_version
+        return self._server_version
+
+    @property
+    def upsert_update(self):
+        # ON CONFLICT ... DO UPDATE requires PostgreSQL 9.5 or newer.
+        return self.server_version >= 90500
+
+    def get_cursor(self, name=None):
+        if name:
+            return self.get_conn().cursor(name=name)
+        return self.get_conn().cursor()
+
     def _get_pk_sequence(self, model):
         meta = model._meta
         if meta.primary_key is not False and meta.primary_key.sequence:
@@ -4163,6 +5112,28 @@ class PostgresqlDatabase(Database):
             self.commit()
         return result
 
+    def upsert_clause(self, model_class, fields):
+        meta = model_class._meta
+        if meta.primary_key is False:
+            return SQL('ON CONFLICT DO NOTHING')
+        target = EnclosedClause(*[
+            field.as_entity(with_table=False)
+            for field in meta.get_primary_key_fields()])
+        update = [
+            Expression(
+                field.as_entity(with_table=False),
+                OP.EQ,
+                Entity('excluded', field.db_column),
+                flat=True)
+            for field in self._upsert_update_fields(model_class, fields)]
+        if not update:
+            return Clause(SQL('ON CONFLICT'), target, SQL('DO NOTHING'))
+        return Clause(
+            SQL('ON CONFLICT'),
+            target,
+            SQL('DO UPDATE SET'),
+            CommaClause(*update))
+
     def get_tables(self, schema='public'):
         query = ('SELECT tablename FROM pg_catalog.pg_tables '
                  'WHERE schemaname = %s ORDER BY tablename')
@@ -4266,6 +5237,7 @@ class MySQLDatabase(Database):
     for_update = True
     interpolation = '%s'
     limit_max = 2 ** 64 - 1  # MySQL quirk
+    max_params = 65535
     op_overrides = {
         OP.LIKE: 'LIKE BINARY',
         OP.ILIKE: 'LIKE',
@@ -4273,7 +5245,7 @@ class MySQLDatabase(Database):
     }
     quote_char = '`'
     subquery_delete_same_table = False
-    upsert_sql = 'REPLACE INTO'
+    upsert_update = True
 
     def _connect(self, database, **kwargs):
         if not mysql:
@@ -4340,6 +5312,20 @@ class MySQLDatabase(Database):
             EnclosedClause(model_class._meta.primary_key),
             SQL('VALUES (DEFAULT)'))
 
+    def upsert_clause(self, model_class, fields):
+        # When only key columns were given, "updating" them to the same
+        # values leaves an existing row unchanged.
+        update = self._upsert_update_fields(model_class, fields) or fields
+        return Clause(
+            SQL('ON DUPLICATE KEY UPDATE'),
+            CommaClause(*[
+                Expression(
+                    field.as_entity(with_table=False),
+                    OP.EQ,
+                    fn.VALUES(field.as_entity(with_table=False)),
+                    flat=True)
+                for field in update]))
+
     def get_noop_sql(self):
         return 'DO 0'
 
@@ -4355,11 +5341,26 @@ class _callable_context_manager(object):
                 return fn(*args, **kwargs)
         return inner
 
+class _identity_map(_callable_context_manager):
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.identity_map = IdentityMap()
+        self.db.push_identity_map(self.identity_map)
+        return self.identity_map
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.db.pop_identity_map()
+
 class ExecutionContext(_callable_context_manager):
-    def __init__(self, database, with_transaction=True):
+    def __init__(self, database, with_transaction=True, identity_map=False):
         self.database = database
         self.with_transaction = with_transaction
         self.connection = None
+        self.identity_map = self._imap = None
+        if identity_map:
+            self._imap = _identity_map(database)
 
     def __enter__(self):
         with self.database._conn_lock:
@@ -4370,9 +5371,13 @@ class ExecutionContext(_callable_context_manager):
             if self.with_transaction:
                 self.txn = self.database.transaction()
                 self.txn.__enter__()
+        if self._imap:
+            self.identity_map = self._imap.__enter__()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._imap:
+            self._imap.__exit__(exc_type, exc_val, exc_tb)
         with self.database._conn_lock:
             if self.connection is None:
                 self.database.pop_execution_context()
@@ -4387,8 +5392,9 @@ class ExecutionContext(_callable_context_manager):
                     self.database._close(self.connection)
 
 class Using(ExecutionContext):
-    def __init__(self, database, models, with_transaction=True):
-        super(Using, self).__init__(database, with_transaction)
+    def __init__(self, database, models, with_transaction=True,
+                 identity_map=False):
+        super(Using, self).__init__(database, with_transaction, identity_map)
         self.models = models
 
     def __enter__(self):
@@ -4418,8 +5424,12 @@ class _atomic(_callable_context_manager):
         return self._helper.__exit__(exc_type, exc_val, exc_tb)
 
 class transaction(_callable_context_manager):
-    def __init__(self, db):
+    identity_map = _imap = None
+
+    def __init__(self, db, identity_map=False):
         self.db = db
+        if identity_map:
+            self._imap = _identity_map(db)
 
     def _begin(self):
         self.db.begin()
@@ -4440,9 +5450,13 @@ class transaction(_callable_context_manager):
         if self.db.transaction_depth() == 0:
             self._begin()
         self.db.push_transaction(self)
+        if self._imap:
+            self.identity_map = self._imap.__enter__()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._imap:
+            self._imap.__exit__(exc_type, exc_val, exc_tb)
         try:
             if exc_type:
                 self.rollback(False)
@@ -4622,7 +5636,8 @@ class ModelOptions(object):
     def __init__(self, cls, database=None, db_table=None, db_table_func=None,
                  indexes=None, order_by=None, primary_key=None,
                  table_alias=None, constraints=None, schema=None,
-                 validate_backrefs=True, only_save_dirty=False, **kwargs):
+                 validate_backrefs=True, only_save_dirty=False,
+                 track_changes=False, **kwargs):
         self.model_class = cls
         self.name = cls.__name__.lower()
         self.fields = {}
@@ -4649,6 +5664,7 @@ class ModelOptions(object):
         self.schema = schema
         self.validate_backrefs = validate_backrefs
         self.only_save_dirty = only_save_dirty
+        self.track_changes = track_changes
 
         self.auto_increment = None
         self.composite_key = False
@@ -4786,7 +5802,8 @@ class ModelOptions(object):
 class BaseModel(type):
     inheritable = set([
         'constraints', 'database', 'db_table_func', 'indexes', 'order_by',
-        'primary_key', 'schema', 'validate_backrefs', 'only_save_dirty'])
+        'primary_key', 'schema', 'validate_backrefs', 'only_save_dirty',
+        'track_changes'])
 
     def __new__(cls, name, bases, attrs):
         if name == _METACLASS_ or bases[0].__name__ == _METACLASS_:
@@ -4902,6 +5919,9 @@ class MagicAll(object):
     
 
 class Model(with_metaclass(BaseModel)):
+    _related_loader = None
+    _snapshot = None
+
     def __init__(self, *args, **kwargs):
         self._data = self._meta.get_default_dict()
         self._dirty = set(self._data)
@@ -4940,13 +5960,89 @@ class Model(with_metaclass(BaseModel)):
         return InsertQuery(cls, fdict)
 
     @classmethod
-    def insert_many(cls, rows, validate_fields=True):
-        return InsertQuery(cls, rows=rows, validate_fields=validate_fields)
+    def insert_many(cls, rows, validate_fields=True, batch_size=None):
+        return InsertQuery(cls, rows=rows, validate_fields=validate_fields,
+                           batch_size=batch_size)
 
     @classmethod
     def insert_from(cls, fields, query):
         return InsertQuery(cls, fields=fields, query=query)
 
+    @classmethod
+    def bulk_update(cls, model_list, fields, batch_size=None):
+        """
+        Save the given fields of every instance in `model_list`, executing one
+        UPDATE per batch of instances. Each column is set using a CASE
+        expression on the primary key, e.g.:
+
+            UPDATE "user" SET "username" = CASE "id" WHEN 1 THEN 'u1' ... END
+            WHERE "id" IN (1, ...)
+
+        Returns the number of rows updated.
+        """
+        meta = cls._meta
+        if meta.primary_key is False or meta.composite_key:
+            raise ValueError('bulk_update() requires a model with a single '
+                             'column primary key.')
+        fields = [meta.fields[f] if isinstance(f, basestring) else f
+                  for f in fields]
+        if not fields:
+            raise ValueError('bulk_update() requires at least one field.')
+
+        pk = meta.primary_key
+        model_list = list(model_list)
+        for obj in model_list:
+            if obj._data.get(pk.name) is None:
+                raise ValueError('bulk_update() cannot update an instance '
+                                 'that has not been saved.')
+
+        database = meta.database
+        if batch_size is None:
+            if database.max_params:
+                # One parameter for each primary key in the WHERE clause,
+                # plus a primary key and value per field in the CASE.
+                batch_size = database.max_params // (2 * len(fields) + 1)
+            else:
+                batch_size = len(model_list)
+        batch_size = max(1, batch_size)
+
+        field_names = set(field.name for field in fields)
+        rows = 0
+        with database.atomic():
+            for idx in range(0, len(model_list), batch_size):
+                batch = model_list[idx:idx + batch_size]
+                pk_params = [Param(obj._data[pk.name], adapt=pk.db_value)
+                             for obj in batch]
+                update = {}
+                for field in fields:
+                    clauses = [SQL('CASE'), pk]
+                    for obj, pk_param in zip(batch, pk_params):
+                        clauses.extend((
+                            SQL('WHEN'),
+                            pk_param,
+                            SQL('THEN'),
+                            Param(obj._data.get(field.name),
+                                  adapt=field.db_value)))
+                    clauses.append(SQL('END'))
+                    value = Clause(*clauses)
+                    if database.update_case_cast:
+                        value = fn.CAST(Clause(
+                            value,
+                            SQL('AS %s' % field.get_column_type())))
+                    update[field] = value
+                rows += (cls
+                         .update(update)
+                         .where(pk << [obj._data[pk.name] for obj in batch])
+                         .execute())
+
+        track_changes = meta.track_changes
+        for obj in model_list:
+            obj._dirty -= field_names
+            if track_changes and obj._snapshot is not None:
+                for name in field_names:
+                    obj._snapshot[name] = _snapshot_value(obj._data.get(name))
+        return rows
+
     @classmethod
     def delete(cls):
         return DeleteQuery(cls)
@@ -4964,6 +6060,15 @@ class Model(with_metaclass(BaseModel)):
 
     @classmethod
     def get(cls, *query, **kwargs):
+        identity_map = cls._meta.database.get_identity_map()
+        if identity_map is not None:
+            pk_value = cls._pk_lookup_value(query, kwargs)
+            if pk_value is not None:
+                # An instance loaded by a partial select is only returned
+                # once a full row has been merged into it.
+                instance = identity_map.get(cls, pk_value, cls._meta.fields)
+                if instance is not None:
+                    return instance
         sq = cls.select().naive()
         if query:
             sq = sq.where(*query)
@@ -4971,6 +6076,24 @@ class Model(with_metaclass(BaseModel)):
             sq = sq.filter(**kwargs)
         return sq.get()
 
+    @classmethod
+    def _pk_lookup_value(cls, query, kwargs):
+        # Return the primary key value if the lookup is a single equality
+        # test on the (non-composite) primary key, e.g. `get(id=1)`.
+        pk_field = cls._meta.primary_key
+        if pk_field is False or cls._meta.composite_key:
+            return None
+        if len(query) == 1 and not kwargs:
+            expr = query[0]
+            if (isinstance(expr, Expression) and expr.op == OP.EQ and
+                    expr.lhs is pk_field and not isinstance(expr.rhs, Node)):
+                return expr.rhs
+        elif len(kwargs) == 1 and not query:
+            key, value = list(kwargs.items())[0]
+            if key in (pk_field.name, pk_field.name + '__eq'):
+                if not isinstance(value, Node):
+                    return value
+
     @classmethod
     def get_or_create(cls, **kwargs):
         defaults = kwargs.pop('defaults', {})
@@ -5112,8 +6235,14 @@ class Model(with_metaclass(BaseModel)):
 
     def _prepare_instance(self):
         self._dirty.clear()
+        if self._meta.track_changes:
+            self._take_snapshot()
         self.prepared()
 
+    def _take_snapshot(self):
+        self._snapshot = dict((name, _snapshot_value(value))
+                              for name, value in self._data.items())
+
     def prepared(self):
         pass
 
@@ -5142,8 +6271,18 @@ class Model(with_metaclass(BaseModel)):
             pk_value = self._get_pk_value()
         else:
             pk_field = pk_value = None
+        save_changes = (
+            self._meta.track_changes and
+            self._snapshot is not None and
+            pk_value is not None and
+            not force_insert)
         if only:
             field_dict = self._prune_fields(field_dict, only)
+        elif save_changes:
+            field_dict = self._prune_fields(field_dict, self.changed_fields)
+            if not field_dict:
+                self._dirty.clear()
+                return False
         elif self._meta.only_save_dirty and not force_insert:
             field_dict = self._prune_fields(
                 field_dict,
@@ -5153,7 +6292,8 @@ class Model(with_metaclass(BaseModel)):
                 return False
 
         self._populate_unsaved_relations(field_dict)
-        if pk_value is not None and not force_insert:
+        is_update = pk_value is not None and not force_insert
+        if is_update:
             if self._meta.composite_key:
                 for pk_part_name in pk_field.field_names:
                     field_dict.pop(pk_part_name, None)
@@ -5170,6 +6310,15 @@ class Model(with_metaclass(BaseModel)):
             self._set_pk_value(pk_value)
             rows = 1
         self._dirty.clear()
+        if self._meta.track_changes:
+            if self._snapshot is None or not is_update:
+                self._take_snapshot()
+            else:
+                for name in field_dict:
+                    self._snapshot[name] = _snapshot_value(self._data[name])
+        identity_map = self._meta.database.get_identity_map()
+        if identity_map is not None:
+            identity_map.add(self)
         return rows
 
     def is_dirty(self):
@@ -5179,6 +6328,32 @@ class Model(with_metaclass(BaseModel)):
     def dirty_fields(self):
         return [f for f in self._meta.sorted_fields if f.name in self._dirty]
 
+    @property
+    def changed_fields(self):
+        """
+        Fields whose value differs from the value loaded from (or last saved
+        to) the database. Without a snapshot of the loaded values, i.e. when
+        `track_changes` is not enabled, this is the list of dirty fields.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.dirty_fields
+        data = self._data
+        return [f for f in self._meta.sorted_fields
+                if f.name in data and (
+                    f.name not in snapshot or
+                    snapshot[f.name] != data[f.name])]
+
+    def get_changes(self):
+        """
+        Return a dict mapping the name of each changed field to a 2-tuple of
+        the original and current values.
+        """
+        snapshot = self._snapshot or {}
+        return dict(
+            (f.name, (snapshot.get(f.name), self._data.get(f.name)))
+            for f in self.changed_fields)
+
     def dependencies(self, search_nullable=False):
         model_class = type(self)
         query = self.select().where(self._pk_expr())
@@ -5211,6 +6386,9 @@ class Model(with_metaclass(BaseModel)):
                     model.update(**{fk.name: None}).where(query).execute()
                 else:
                     model.delete().where(query).execute()
+        identity_map = self._meta.database.get_identity_map()
+        if identity_map is not None:
+            identity_map.remove(self)
         return self.delete().where(self._pk_expr()).execute()
 
     def __hash__(self):
@@ -5225,7 +6403,83 @@ class Model(with_metaclass(BaseModel)):
     def __ne__(self, other):
         return not self == other
 
-def prefetch_add_subquery(sq, subqueries):
+    def __getstate__(self):
+        # The batch loader references the cursor of the originating query.
+        state = self.__dict__.copy()
+        state.pop('_related_loader', None)
+        return state
+
+def _snapshot_value(value):
+    # Mutable values are copied so that changes made in-place are detected.
+    if isinstance(value, (bytearray, dict, list, set)):
+        return deepcopy(value)
+    return value
+
+# Used by NaiveQueryResultWrapper to decide when it is safe to bypass
+# Model.__init__ and the field descriptors.
+_model_init = getattr(Model.__init__, '__func__', Model.__init__)
+_data_descriptors = (FieldDescriptor, RelationDescriptor)
+
+def _make_row_constructor(model, conv):
+    """
+    Build a function that creates a model instance from a row, given a list
+    of `(index, column name, converter)` for the row's columns. Values for
+    the model's fields are stored in `_data` directly rather than going
+    through the field descriptors, and only the defaults of fields missing
+    from the row are evaluated. Models that override `__init__` are
+    instantiated normally.
+
+    Used by both the pure-Python and the C model result wrappers.
+    """
+    model_init = getattr(model.__init__, '__func__', model.__init__)
+    if model_init is not _model_init:
+        def constructor(row):
+            instance = model()
+            for i, column, f in conv:
+                setattr(instance, column,
+                        f(row[i]) if f is not None else row[i])
+            instance._prepare_instance()
+            return instance
+        return constructor
+
+    raw, converted, attrs = [], [], []
+    for i, column, f in conv:
+        if type(model.__dict__.get(column)) not in _data_descriptors:
+            attrs.append((i, column, f))
+        elif f is None:
+            raw.append((i, column))
+        else:
+            converted.append((i, column, f))
+
+    meta = model._meta
+    selected = set(column for _, column in raw)
+    selected.update(column for _, column, _ in converted)
+    defaults = dict((k, v) for k, v in meta._default_by_name.items()
+                    if k not in selected)
+    default_callables = [(k, d) for k, d in meta._default_callable_list
+                         if k not in selected]
+    new = model.__new__
+
+    def constructor(row):
+        data = defaults.copy()
+        for column, default in default_callables:
+            data[column] = default()
+        for i, column in raw:
+            data[column] = row[i]
+        for i, column, f in converted:
+            data[column] = f(row[i])
+        instance = new(model)
+        instance._data = data
+        instance._dirty = set()
+        instance._obj_cache = {}
+        for i, column, f in attrs:
+            setattr(instance, column,
+                    f(row[i]) if f is not None else row[i])
+        instance._prepare_instance()
+        return instance
+    return constructor
+
+def prefetch_add_subquery(sq, subqueries, batched=False):
     fixed_queries = [PrefetchResult(sq)]
     for i, subquery in enumerate(subqueries):
         if isinstance(subquery, tuple):
@@ -5258,17 +6512,21 @@ def prefetch_add_subquery(sq, subqueries):
             raise AttributeError('Error: unable to find foreign key for '
                                  'query: %s%s' % (subquery, tgt_err))
 
+        # When batched, the subquery is left unfiltered and restricted later
+        # using the values fetched for the preceding query.
         if fks:
-            expr = reduce(operator.or_, [
-                (fk << last_query.select(pk))
-                for (fk, pk) in zip(fks, pks)])
-            subquery = subquery.where(expr)
+            if not batched:
+                expr = reduce(operator.or_, [
+                    (fk << last_query.select(pk))
+                    for (fk, pk) in zip(fks, pks)])
+                subquery = subquery.where(expr)
             fixed_queries.append(PrefetchResult(subquery, fks, False))
         elif backrefs:
-            expr = reduce(operator.or_, [
-                (backref.to_field << last_query.select(backref))
-                for backref in backrefs])
-            subquery = subquery.where(expr)
+            if not batched:
+                expr = reduce(operator.or_, [
+                    (backref.to_field << last_query.select(backref))
+                    for backref in backrefs])
+                subquery = subquery.where(expr)
             fixed_queries.append(PrefetchResult(subquery, backrefs, True))
 
     return fixed_queries
@@ -5318,15 +6576,124 @@ class PrefetchResult(__prefetched):
                 id_map.setdefault(key, [])
                 id_map[key].append(instance)
 
+    def batched_query(self, instances, batch_size=None):
+        """
+        Fetch the rows related to the given instances of the preceding model,
+        using literal IN lists of their keys rather than a subquery.
+        """
+        if self.backref:
+            # The preceding model holds the foreign key.
+            filter_fields = [field.to_field for field in self.fields]
+            source_attrs = [field.name for field in self.fields]
+        else:
+            filter_fields = self.fields
+            source_attrs = [field.to_field.name for field in self.fields]
 
-def prefetch(sq, *subqueries):
+        values = []
+        seen = set()
+        for instance in instances:
+            for attname in source_attrs:
+                value = instance._data.get(attname)
+                if value is not None and value not in seen:
+                    seen.add(value)
+                    values.append(value)
+        if not values:
+            return []
+
+        if batch_size is None:
+            max_params = self.query.database.max_params
+            if max_params:
+                _, params = self.query.sql()
+                batch_size = (max_params - len(params)) // len(filter_fields)
+            else:
+                batch_size = len(values)
+        batch_size = max(1, batch_size)
+
+        ordering = None
+        if len(values) > batch_size:
+            if (self.query._limit is not None or
+                    self.query._offset is not None):
+                # A LIMIT applies to the whole result, not to each chunk.
+                batch_size = len(values)
+            elif self.query._order_by:
+                ordering = self._chunk_ordering()
+                if ordering is None:
+                    # The ordering cannot be reproduced when merging chunks.
+                    batch_size = len(values)
+
+        results = []
+        dedupe = len(filter_fields) > 1 and len(values) > batch_size
+        seen_pks = set()
+        for idx in range(0, len(values), batch_size):
+            chunk = values[idx:idx + batch_size]
+            expr = reduce(operator.or_, [
+                (field << chunk) for field in filter_fields])
+            for instance in self.query.where(expr):
+                if dedupe:
+                    # A row may match different fields in different chunks.
+                    pk_value = instance._get_pk_value()
+                    if pk_value is not None:
+                        if pk_value in seen_pks:
+                            continue
+                        seen_pks.add(pk_value)
+                results.append(instance)
+
+        if ordering:
+            # Merge the chunks with one stable sort per ordering term, applied
+            # from the last term to the first. NULLs sort first.
+            for attname, reverse in reversed(ordering):
+                results.sort(
+                    key=lambda obj: (obj._data.get(attname) is not None,
+                                     obj._data.get(attname)),
+                    reverse=reverse)
+        return results
+
+    def _chunk_ordering(self):
+        """
+        Return a list of (attribute name, descending) pairs for the subquery's
+        ORDER BY, or None if it orders by anything other than the model's own
+        columns.
+        """
+        ordering = []
+        for term in self.query._order_by:
+            if (not isinstance(term, Field) or
+                    isinstance(term, FieldProxy) or
+                    term.model_class is not self.query.model_class or
+                    term._alias or term._negated):
+                return None
+            ordering.append((term.name, term._ordering == 'DESC'))
+        return ordering
+
+
+def prefetch(sq, *subqueries, **kwargs):
+    batched = kwargs.pop('batched', False)
+    batch_size = kwargs.pop('batch_size', None)
+    if kwargs:
+        raise ValueError('Unrecognized arguments: %s' % ', '.join(kwargs))
     if not subqueries:
         return sq
-    fixed_queries = prefetch_add_subquery(sq, subqueries)
+    fixed_queries = prefetch_add_subquery(sq, subqueries, batched)
+
+    results = {}
+    if batched:
+        # Execute the queries top-down, restricting each one using the keys
+        # of the instances already fetched for the model it relates to.
+        instances_for = {}
+        for i, prefetch_result in enumerate(fixed_queries):
+            if i == 0:
+                instances = list(prefetch_result.query)
+            else:
+                instances = prefetch_result.batched_query(
+                    instances_for.get(prefetch_result.rel_models[0], ()),
+                    batch_size)
+            instances_for.setdefault(prefetch_result.model, [])
+            instances_for[prefetch_result.model].extend(instances)
+            results[i] = instances
 
     deps = {}
     rel_map = {}
-    for prefetch_result in reversed(fixed_queries):
+    for i in reversed(range(len(fixed_queries))):
+        prefetch_result = fixed_queries[i]
         query_model = prefetch_result.model
         if prefetch_result.fields:
             for rel_model in prefetch_result.rel_models:
@@ -5337,7 +6704,7 @@ def prefetch(sq, *subqueries):
         id_map = deps[query_model]
         has_relations = bool(rel_map.get(query_model))
 
-        for instance in prefetch_result.query:
+        for instance in results.get(i, prefetch_result.query):
             if prefetch_result.fields:
                 prefetch_result.store_instance(instance, id_map)
 
@@ -112,7 +112,8 @@ cdef class _QueryResultWrapper(object):
         readonly bint _populated
         readonly int _ct
         readonly list _result_cache
-        object column_meta, cursor, model
+        public int fetch_size
+        object _buffer, _fetchmany, column_meta, cursor, model
 
     def __init__(self, model, cursor, meta=None):
         self.model = model
@@ -121,6 +122,9 @@ cdef class _QueryResultWrapper(object):
         self._ct = self._idx = 0
         self._populated = self._initialized = False
         self._result_cache = []
+        self._buffer = deque()
+        self._fetchmany = getattr(cursor, 'fetchmany', None)
+        self.fetch_size = 100
         if meta is not None:
             self.column_meta, self.join_meta = meta[0], dict(meta[1])
         else:
@@ -198,22 +202,41 @@ cdef class _QueryResultWrapper(object):
     cdef process_row(self, tuple row):
         return row
 
-    cdef iterate(self):
+    cdef list fetch_rows(self):
         cdef:
-            tuple row = self.cursor.fetchone()
-        if not row:
+            list rows
+        if self._fetchmany is not None:
+            rows = self._fetchmany(self.fetch_size)
+        else:
+            row = self.cursor.fetchone()
+            rows = [row] if row else []
+        if not rows:
             self._populated = True
             if not getattr(self.cursor, 'name', None):
                 self.cursor.close()
-            raise StopIteration
         elif not self._initialized:
             self.initialize(self.cursor.description)
             self._initialized = True
-        return self.process_row(row)
+        return rows
+
+    cdef iterate(self):
+        cdef:
+            list rows
+            tuple row
+        if not self._buffer:
+            rows = self.fetch_rows()
+            if not rows:
+                raise StopIteration
+            for row in rows:
+                self._buffer.append(self.process_row(row))
+        return self._buffer.popleft()
 
     def iterator(self):
         while True:
-            yield self.iterate()
+            try:
+                yield self.iterate()
+            except StopIteration:
+                return
 
     def __next__(self):
         cdef object inst
@@ -283,9 +306,23 @@ cdef class _DictQueryResultWrapper(_QueryResultWrapper):
 
 
 cdef class _ModelQueryResultWrapper(_DictQueryResultWrapper):
+    cdef object constructor, identity_map
+
+    cdef initialize(self, cursor_description):
+        _DictQueryResultWrapper.initialize(self, cursor_description)
+        # Share the row constructor used by the pure-Python wrapper, so both
+        # create instances the same way. Imported here because peewee imports
+        # this module while it is being loaded.
+        from peewee import _make_row_constructor
+        conv = [(i, self.column_names[i], self.converters[i])
+                for i in range(self.row_size)]
+        self.constructor = _make_row_constructor(self.model, conv)
+        self.identity_map = self.model._meta.database.get_identity_map()
+
     cdef process_row(self, tuple row):
-        inst = self.model(**self._make_dict(row))
-        inst._prepare_instance()
+        inst = self.constructor(row)
+        if self.identity_map is not None:
+            return self.identity_map.merge(inst)
         return inst
 
 
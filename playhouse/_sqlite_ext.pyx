@@ -136,7 +136,9 @@ def peewee_lucene(py_match_info, *raw_weights):
 
     weights = <double *>malloc(sizeof(double) * col_count)
     for i in range(col_count):
-        if i < (argc - 1):
+        if argc == 1:
+            weights[i] = 1.0
+        elif i < (argc - 1):
             weights[i] = <double>raw_weights[i]
         else:
             weights[i] = 0
@@ -147,13 +149,15 @@ def peewee_lucene(py_match_info, *raw_weights):
             if weight == 0:
                 continue
             doc_length = match_info[L_O + j]
-            x = X_O + (3 * j * (i + 1))
+            x = X_O + (3 * (i * col_count + j))
             term_frequency = match_info[x]
+            if term_frequency == 0:
+                continue
             docs_with_term = match_info[x + 2]
             idf = log(total_docs / (docs_with_term + 1.))
             tf = sqrt(term_frequency)
             fieldNorms = 1.0 / sqrt(doc_length)
-            score += (idf * tf * fieldNorms)
+            score += (idf * tf * fieldNorms) * weight
 
     free(weights)
     return -1 * score
@@ -190,7 +194,9 @@ def peewee_bm25(py_match_info, *raw_weights):
 
     weights = <double *>malloc(sizeof(double) * col_count)
     for i in range(col_count):
-        if i < (argc - 1):
+        if argc == 1:
+            weights[i] = 1.0
+        elif i < (argc - 1):
             weights[i] = <double>raw_weights[i]
         else:
             weights[i] = 0
@@ -207,7 +213,7 @@ def peewee_bm25(py_match_info, *raw_weights):
             else:
                 D = 1 - B + (B * (doc_length / avg_length))
 
-            x = X_O + (3 * j * (i + 1))
+            x = X_O + (3 * (i * col_count + j))
             term_frequency = match_info[x]
             docs_with_term = match_info[x + 2]
             idf = max(
@@ -116,6 +116,13 @@ class APSWDatabase(SqliteExtDatabase):
             self._execute_sql(cursor, sql, params)
         return cursor
 
+    def execute_sql_many(self, sql, seq_of_params, require_commit=True):
+        logger.debug((sql, '<executemany>'))
+        with self.exception_wrapper():
+            cursor = self.get_cursor()
+            cursor.executemany(sql, seq_of_params)
+        return cursor
+
     def last_insert_id(self, cursor, model):
         if model._meta.auto_increment:
             return cursor.getconnection().last_insert_rowid()
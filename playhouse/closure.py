@@ -0,0 +1,281 @@
+"""
+Closure table stored as a regular table and maintained by peewee, for use on
+any database. It provides the same query API as the SQLite
+`transitive_closure` extension (see `playhouse.sqlite_ext.ClosureTable`).
+
+Every (ancestor, descendant) pair in the tree is stored as a row, along with
+the distance between the two nodes. Each node is also its own ancestor, at a
+depth of 0. This makes it possible to fetch all the descendants or ancestors
+of a node with a single indexed query, without recursion.
+
+Example:
+
+    class Category(Model):
+        name = CharField()
+        parent = ForeignKeyField('self', null=True, related_name='children')
+
+    CategoryClosure = ClosureTable(Category)
+    CategoryClosure.create_table(True)
+    CategoryClosure.rebuild()
+
+    books = Category.create(name='books', parent=root)
+    CategoryClosure.insert_node(books)
+    CategoryClosure.move_node(books, media)
+
+    for category in CategoryClosure.descendants(media):
+        print category.name, category.depth
+
+If the model is a `playhouse.signals.Model`, calling
+`CategoryClosure.connect_signals()` keeps the closure table up-to-date as
+instances are saved and deleted.
+"""
+from peewee import *
+from playhouse import signals
+
+
+def ClosureTable(model_class, foreign_key=None, db_table=None):
+    """
+    Model factory for a closure table over `model_class`, a table whose rows
+    reference their parent using the self-referential `foreign_key`.
+
+    The closure table must be kept in sync when nodes are added, moved or
+    removed, using the `insert_node()`, `move_node()` and `delete_node()`
+    methods or automatically with `connect_signals()`, or regenerated from
+    the parent links using `rebuild()`.
+    """
+    if foreign_key is None:
+        for field_obj in model_class._meta.rel.values():
+            if field_obj.rel_model is model_class:
+                foreign_key = field_obj
+                break
+        else:
+            raise ValueError('Unable to find self-referential foreign key.')
+
+    primary_key = model_class._meta.primary_key
+    database = model_class._meta.database
+    name = '%sClosure' % model_class.__name__
+
+    def _node_id(node):
+        if isinstance(node, Model):
+            return node._get_pk_value()
+        return node
+
+    class BaseClosureTable(Model):
+        depth = IntegerField()
+
+        @classmethod
+        def descendants(cls, node, depth=None, include_node=False):
+            query = (model_class
+                     .select(model_class, cls.depth.alias('depth'))
+                     .join(cls, on=(primary_key == cls.node))
+                     .where(cls.root == _node_id(node))
+                     .naive())
+            if depth is not None:
+                query = query.where(cls.depth == depth)
+            elif not include_node:
+                query = query.where(cls.depth > 0)
+            return query
+
+        @classmethod
+        def ancestors(cls, node, depth=None, include_node=False):
+            query = (model_class
+                     .select(model_class, cls.depth.alias('depth'))
+                     .join(cls, on=(primary_key == cls.root))
+                     .where(cls.node == _node_id(node))
+                     .naive())
+            if depth is not None:
+                query = query.where(cls.depth == depth)
+            elif not include_node:
+                query = query.where(cls.depth > 0)
+            return query
+
+        @classmethod
+        def siblings(cls, node, include_node=False):
+            fk_value = node._data.get(foreign_key.name)
+            query = model_class.select().where(foreign_key == fk_value)
+            if not include_node:
+                query = query.where(primary_key != node)
+            return query
+
+        @classmethod
+        def rebuild(cls):
+            """
+            Regenerate the closure table from the parent links, executing one
+            INSERT ... SELECT per level of the tree.
+            """
+            fields = [cls.root, cls.node, cls.depth]
+            with database.atomic():
+                cls.delete().execute()
+                cls.insert_from(fields, model_class.select(
+                    primary_key, primary_key, SQL('0'))).execute()
+
+                # Each node at depth n + 1 below a root is a child of a node
+                # at depth n, so extend the previous level by one step.
+                depth = 0
+                while cls.select().where(cls.depth == depth).exists():
+                    query = (cls
+                             .select(cls.root, primary_key, cls.depth + 1)
+                             .join(model_class, on=(foreign_key == cls.node))
+                             .where(cls.depth == depth))
+                    # With a cycle in the parent links, a node on the cycle
+                    # becomes its own descendant before any (root, node)
+                    # pair can repeat.
+                    if query.where(cls.root == primary_key).exists():
+                        raise ValueError('%s contains a cycle.' %
+                                         model_class.__name__)
+                    cls.insert_from(fields, query).execute()
+                    depth += 1
+
+        @classmethod
+        def insert_node(cls, node):
+            """Add the closure rows for a newly-saved node."""
+            node_id = _node_id(node)
+            rows = [{'root': node_id, 'node': node_id, 'depth': 0}]
+            parent_id = node._data.get(foreign_key.name)
+            if parent_id is not None:
+                query = (cls
+                         .select(cls.root, cls.depth)
+                         .where(cls.node == parent_id)
+                         .tuples())
+                rows.extend(
+                    {'root': root, 'node': node_id, 'depth': depth + 1}
+                    for root, depth in query)
+            cls.insert_many(rows).execute()
+
+        @classmethod
+        def move_node(cls, node, parent):
+            """
+            Re-parent `node`, along with its subtree, beneath `parent`. The
+            foreign key is updated on `node` and in the database. Passing
+            `None` as the parent makes `node` a root.
+            """
+            node_id = _node_id(node)
+            parent_id = _node_id(parent)
+            with database.atomic():
+                cls._relink(node_id, parent_id)
+                (model_class
+                 .update(**{foreign_key.name: parent_id})
+                 .where(primary_key == node_id)
+                 .execute())
+            if isinstance(node, Model):
+                node._data[foreign_key.name] = parent_id
+                node._obj_cache.pop(foreign_key.name, None)
+
+        @classmethod
+        def _relink(cls, node_id, parent_id):
+            # Replace the rows linking the subtree of `node_id` to its
+            # ancestors with rows linking it to `parent_id` and its ancestors.
+            subtree = (cls
+                       .select(cls.node)
+                       .where(cls.root == node_id))
+            with database.atomic():
+                if parent_id is not None and subtree.where(
+                        cls.node == parent_id).exists():
+                    raise ValueError('Cannot move a node beneath itself.')
+
+                # Detach the subtree from its current ancestors.
+                old_ancestors = (cls
+                                 .select(cls.root)
+                                 .where((cls.node == node_id) &
+                                        (cls.depth > 0)))
+                if not database.subquery_delete_same_table:
+                    subtree = [row for row, in subtree.tuples()]
+                    old_ancestors = [row for row, in old_ancestors.tuples()]
+                (cls
+                 .delete()
+                 .where((cls.node << subtree) &
+                        (cls.root << old_ancestors))
+                 .execute())
+
+                # Link every node in the subtree to the new parent and each of
+                # its ancestors.
+                if parent_id is not None:
+                    Parent = cls.alias()
+                    Child = cls.alias()
+                    query = (cls
+                             .select(
+                                 Parent.root,
+                                 Child.node,
+                                 Parent.depth + Child.depth + 1)
+                             .from_(Parent, Child)
+                             .where((Parent.node == parent_id) &
+                                    (Child.root == node_id)))
+                    cls.insert_from([cls.root, cls.node, cls.depth],
+                                    query).execute()
+
+        @classmethod
+        def delete_node(cls, node):
+            """
+            Remove the closure rows for `node` and its descendants. Call this
+            before deleting the rows themselves.
+            """
+            subtree = cls.select(cls.node).where(cls.root == _node_id(node))
+            if not database.subquery_delete_same_table:
+                subtree = [row for row, in subtree.tuples()]
+            cls.delete().where(cls.node << subtree).execute()
+
+        @classmethod
+        def _on_save(cls, sender, instance, created):
+            node_id = instance._get_pk_value()
+            if not created:
+                # Find the node's own row and the row for its parent, to see
+                # whether the parent has changed.
+                query = (cls
+                         .select(cls.depth, cls.root)
+                         .where((cls.node == node_id) & (cls.depth <= 1))
+                         .tuples())
+                roots = dict(query)
+                if 0 in roots:
+                    parent_id = instance._data.get(foreign_key.name)
+                    if roots.get(1) != parent_id:
+                        cls._relink(node_id, parent_id)
+                    return
+            cls.insert_node(instance)
+
+        @classmethod
+        def _on_delete(cls, sender, instance):
+            cls.delete_node(instance)
+
+        @classmethod
+        def connect_signals(cls):
+            """
+            Maintain the closure table automatically when instances of the
+            model are saved or deleted. The model must be a subclass of
+            `playhouse.signals.Model`. Changes made using queries, rather than
+            instance methods, are not tracked.
+            """
+            if not issubclass(model_class, signals.Model):
+                raise ValueError('%s must be a subclass of signals.Model to '
+                                 'connect signals.' % model_class.__name__)
+            signals.post_save.connect(
+                cls._on_save,
+                name='%s_save' % cls.__name__,
+                sender=model_class)
+            signals.pre_delete.connect(
+                cls._on_delete,
+                name='%s_delete' % cls.__name__,
+                sender=model_class)
+
+        @classmethod
+        def disconnect_signals(cls):
+            signals.post_save.disconnect(name='%s_save' % cls.__name__)
+            signals.pre_delete.disconnect(name='%s_delete' % cls.__name__)
+
+    class Meta:
+        database = model_class._meta.database
+        indexes = ((('node', 'depth'), False),)
+        primary_key = CompositeKey('root', 'node')
+
+    if db_table is not None:
+        Meta.db_table = db_table
+
+    return type(name, (BaseClosureTable,), {
+        'Meta': Meta,
+        'root': ForeignKeyField(
+            model_class,
+            related_name='%s_descendants' % name.lower(),
+            on_delete='CASCADE'),
+        'node': ForeignKeyField(
+            model_class,
+            related_name='%s_ancestors' % name.lower(),
+            on_delete='CASCADE')})
@@ -1,5 +1,10 @@
+import atexit
 import operator
 import pickle
+import threading
+import time
+import weakref
+from collections import OrderedDict
 try:
     import simplejson as json
 except ImportError:
@@ -19,6 +24,9 @@ except ImportError:
 
 Sentinel = type('Sentinel', (object,), {})
 
+# Marks a key that is known not to exist (cached miss or buffered delete).
+Missing = type('Missing', (object,), {})
+
 key_value_db = KeyValueDatabase(':memory:', threadlocals=False)
 
 class JSONField(TextField):
@@ -29,6 +37,48 @@ class JSONField(TextField):
         if value is not None:
             return json.loads(value)
 
+class KeyCache(object):
+    """
+    Thread-safe LRU cache of key/value pairs whose entries optionally expire
+    after `ttl` seconds.
+    """
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._cache.pop(key)
+            except KeyError:
+                return Sentinel
+            if expires is not None and expires < time.time():
+                return Sentinel
+            self._cache[key] = (value, expires)
+            return value
+
+    def set(self, key, value):
+        expires = (time.time() + self.ttl) if self.ttl else None
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = (value, expires)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+def _close_at_exit(ref):
+    kv = ref()
+    if kv is not None:
+        kv.close()
+
 class KeyStore(object):
     """
     Rich dictionary with support for storing a wide variety of data types.
@@ -36,8 +86,18 @@ class KeyStore(object):
     :param peewee.Field value_type: Field type to use for values.
     :param boolean ordered: Whether keys should be returned in sorted order.
     :param peewee.Model model: Model class to use for Keys/Values.
+    :param int cache_size: Number of values to keep in an in-process LRU
+        read cache. By default no cache is used.
+    :param cache_ttl: Seconds a cached value remains valid.
+    :param int flush_size: Buffer writes and flush them once this many keys
+        have been modified.
+    :param flush_interval: Buffer writes and flush them once the oldest
+        buffered change is this many seconds old. The interval is only
+        checked when the store is accessed.
     """
-    def __init__(self, value_field, ordered=False, database=None):
+    def __init__(self, value_field, ordered=False, database=None,
+                 cache_size=None, cache_ttl=None, flush_size=None,
+                 flush_interval=None):
         self._value_field = value_field
         self._ordered = ordered
 
@@ -49,7 +109,19 @@ class KeyStore(object):
         self.value = self.model.value
 
         self._database.create_table(self.model, True)
-        self._native_upsert = isinstance(self._database, SqliteDatabase)
+        self._native_upsert = bool(
+            self._database.upsert_sql or self._database.upsert_update)
+
+        self._cache = KeyCache(cache_size, cache_ttl) if cache_size else None
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._write_behind = bool(flush_size or flush_interval)
+        self._pending = OrderedDict()
+        self._pending_since = None
+        self._lock = threading.Lock()
+        if self._write_behind:
+            # Do not lose buffered changes when the interpreter exits.
+            atexit.register(_close_at_exit, weakref.ref(self))
 
     def create_model(self):
         class KVModel(Model):
@@ -62,6 +134,7 @@ class KeyStore(object):
         return KVModel
 
     def query(self, *select):
+        self.flush()
         query = self.model.select(*select).tuples()
         if self._ordered:
             query = query.order_by(self.key)
@@ -72,23 +145,179 @@ class KeyStore(object):
             return (self.key == node), True
         return node, False
 
+    def _chunks(self, items):
+        size = self._database.max_params or len(items) or 1
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+
+    def _lookup(self, key):
+        # Return the buffered or cached value for a key, `Missing` if the key
+        # is known not to exist, or `Sentinel` if the database must be asked.
+        if key in self._pending:
+            return self._pending[key]
+        if self._cache is not None:
+            return self._cache.get(key)
+        return Sentinel
+
+    def get_many(self, keys):
+        """
+        Return a dictionary of the given keys that exist, mapped to their
+        values. Keys not found in the buffer or cache are fetched with a
+        single query (per `max_params` keys).
+        """
+        result = {}
+        unknown = {}
+        for key in keys:
+            value = self._lookup(key)
+            if value is Sentinel:
+                unknown[self.key.db_value(key)] = key
+            elif value is not Missing:
+                result[key] = value
+
+        if unknown:
+            db_keys = list(unknown)
+            for chunk in self._chunks(db_keys):
+                query = (self.model
+                         .select(self.key, self.value)
+                         .where(self.key << chunk)
+                         .tuples())
+                for db_key, value in query:
+                    result[unknown.get(db_key, db_key)] = value
+            if self._cache is not None:
+                for key in unknown.values():
+                    self._cache.set(key, result.get(key, Missing))
+
+        self._maybe_flush()
+        return result
+
+    def set_many(self, data):
+        """
+        Store every key/value pair from a dictionary or iterable of 2-tuples.
+        All rows are written in a single transaction.
+        """
+        items = OrderedDict(data.items() if isinstance(data, dict) else data)
+        if self._cache is not None or self._write_behind:
+            for key, value in items.items():
+                items[key] = self._coerce(value)
+        if self._write_behind:
+            self._buffer(items)
+        else:
+            self._write(items, [])
+            self._update_cache(items)
+
+    def delete_many(self, keys):
+        """Remove the given keys with a single DELETE (per `max_params`)."""
+        changes = OrderedDict((key, Missing) for key in keys)
+        if self._write_behind:
+            self._buffer(changes)
+        else:
+            self._write({}, list(changes))
+            self._update_cache(changes)
+
+    def flush(self):
+        """
+        Write any buffered changes to the database in a single transaction.
+        """
+        if not self._pending:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+            self._pending_since = None
+
+        items = OrderedDict(
+            (key, value) for key, value in pending.items()
+            if value is not Missing)
+        deleted = [key for key, value in pending.items() if value is Missing]
+        try:
+            self._write(items, deleted)
+        except:
+            # Re-queue the changes, unless they were superseded meanwhile.
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)
+                if self._pending_since is None:
+                    self._pending_since = time.time()
+            raise
+
+    def close(self):
+        """
+        Flush any buffered changes. This is called automatically when the
+        interpreter exits, or when the store is used as a context manager.
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _buffer(self, changes):
+        with self._lock:
+            for key, value in changes.items():
+                self._pending.pop(key, None)
+                self._pending[key] = value
+            if self._pending_since is None:
+                self._pending_since = time.time()
+        self._update_cache(changes)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if not self._pending:
+            return
+        if self._flush_size and len(self._pending) >= self._flush_size:
+            self.flush()
+        elif self._flush_interval and (
+                time.time() - self._pending_since >= self._flush_interval):
+            self.flush()
+
+    def _coerce(self, value):
+        # Values served from the buffer or cache should look the same as
+        # values read back from the database.
+        return self.value.python_value(self.value.db_value(value))
+
+    def _update_cache(self, changes):
+        if self._cache is not None:
+            for key, value in changes.items():
+                self._cache.set(key, value)
+
+    def _write(self, items, deleted):
+        with self._database.atomic():
+            if items and not self._native_upsert:
+                deleted = list(deleted) + list(items)
+            for chunk in self._chunks(list(deleted)):
+                self.model.delete().where(self.key << chunk).execute()
+            if items:
+                rows = [{self.key.name: key, self.value.name: value}
+                        for key, value in items.items()]
+                query = self.model.insert_many(rows)
+                if self._native_upsert:
+                    query = query.upsert()
+                query.execute()
+
+    def _invalidate(self):
+        if self._cache is not None:
+            self._cache.clear()
+
     def __contains__(self, key):
-        node, _ = self.convert_node(key)
-        return self.model.select().where(node).exists()
+        if not isinstance(key, Node):
+            return key in self.get_many([key])
+        self.flush()
+        return self.model.select().where(key).exists()
 
     def __len__(self):
+        self.flush()
         return self.model.select().count()
 
     def __getitem__(self, node):
-        converted, is_single = self.convert_node(node)
-        result = self.query(self.value).where(converted)
+        if not isinstance(node, Node):
+            result = self.get_many([node])
+            if node not in result:
+                raise KeyError(node)
+            return result[node]
+        result = self.query(self.value).where(node)
         item_getter = operator.itemgetter(0)
-        result = [item_getter(val) for val in result]
-        if len(result) == 0 and is_single:
-            raise KeyError(node)
-        elif is_single:
-            return result[0]
-        return result
+        return [item_getter(val) for val in result]
 
     def _upsert(self, key, value):
         self.model.insert(**{
@@ -97,23 +326,33 @@ class KeyStore(object):
 
     def __setitem__(self, node, value):
         if isinstance(node, Node):
+            self.flush()
             update = {self.value.name: value}
             self.model.update(**update).where(node).execute()
-        elif self._native_upsert:
-            self._upsert(node, value)
+            self._invalidate()
+        elif self._write_behind:
+            self._buffer({node: self._coerce(value)})
         else:
-            try:
-                self.model.create(key=node, value=value)
-            except:
-                self._database.rollback()
-                (self.model
-                 .update(**{self.value.name: value})
-                 .where(self.key == node)
-                 .execute())
+            if self._native_upsert:
+                self._upsert(node, value)
+            else:
+                with self._database.atomic():
+                    updated = (self.model
+                               .update(**{self.value.name: value})
+                               .where(self.key == node)
+                               .execute())
+                    if not updated:
+                        self.model.create(key=node, value=value)
+            if self._cache is not None:
+                self._update_cache({node: self._coerce(value)})
 
     def __delitem__(self, node):
-        converted, _ = self.convert_node(node)
-        self.model.delete().where(converted).execute()
+        if isinstance(node, Node):
+            self.flush()
+            self.model.delete().where(node).execute()
+            self._invalidate()
+        else:
+            self.delete_many([node])
 
     def __iter__(self):
         return self.query().execute()
@@ -135,27 +374,30 @@ class KeyStore(object):
 
     def pop(self, k, default=Sentinel):
         with self._database.transaction():
-            node, is_single = self.convert_node(k)
             try:
                 res = self[k]
             except KeyError:
                 if default is Sentinel:
                     raise
                 return default
-            del(self[node])
+            del(self[k])
         return res
 
     def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._pending_since = None
         self.model.delete().execute()
+        self._invalidate()
 
 
 class PickledKeyStore(KeyStore):
-    def __init__(self, ordered=False, database=None):
+    def __init__(self, ordered=False, database=None, **kwargs):
         super(PickledKeyStore, self).__init__(
-            PickledField(), ordered, database)
+            PickledField(), ordered, database, **kwargs)
 
 
 class JSONKeyStore(KeyStore):
-    def __init__(self, ordered=False, database=None):
+    def __init__(self, ordered=False, database=None, **kwargs):
         field = JSONField(null=True)
-        super(JSONKeyStore, self).__init__(field, ordered, database)
+        super(JSONKeyStore, self).__init__(field, ordered, database, **kwargs)
@@ -58,9 +58,12 @@ Execution context examples (using above `db` instance):
         # When this function is called, a separate connection is made and will
         # be closed when the function returns.
 """
+import bisect
 import heapq
 import logging
+import threading
 import time
+from collections import deque
 
 from peewee import MySQLDatabase
 from peewee import PostgresqlDatabase
@@ -74,6 +77,9 @@ except ImportError:
 logger = logging.getLogger('peewee.pool')
 
 
+class MaxConnectionsExceeded(ValueError): pass
+
+
 def make_int(val):
     if val is not None and not isinstance(val, (int, float)):
         return int(val)
@@ -81,26 +87,183 @@ def make_int(val):
 
 
 class PooledDatabase(object):
+    # Upper bounds, in seconds, of the buckets of the checkout latency
+    # histogram reported by `stats()`.
+    checkout_buckets = (.001, .005, .01, .05, .1, .5, 1., 5.)
+    events = ('created', 'checkout', 'recycled', 'closed', 'stale',
+              'rejected')
+
     def __init__(self, database, max_connections=20, stale_timeout=None,
+                 timeout=None, min_connections=0, reap_interval=None,
                  **kwargs):
         self.max_connections = make_int(max_connections)
         self.stale_timeout = make_int(stale_timeout)
+        self.timeout = make_int(timeout)
+        self.min_connections = make_int(min_connections)
+        self.reap_interval = make_int(reap_interval)
         self._connections = []
         self._in_use = {}
         self._closed = set()
+        self._waiters = deque()
+        self._reaper = None
+        self._reaper_stop = None
+        self._prewarmed = False
+        self._hooks = dict((event, []) for event in self.events)
         self.conn_key = id
+        self.reset_stats()
+
+        # Created below, once the base class has created the connection lock.
+        self._available = None
 
         super(PooledDatabase, self).__init__(database, **kwargs)
 
+        # The pool is only modified while the connection lock is held, so the
+        # lock is shared with the condition used to wait for a connection to
+        # become available. Waiting releases the lock.
+        self._available = threading.Condition(self._conn_lock)
+
+        if self.reap_interval and not self.deferred:
+            self.start_reaper()
+
     def init(self, database, max_connections=None, stale_timeout=None,
+             timeout=None, min_connections=None, reap_interval=None,
              **connect_kwargs):
         super(PooledDatabase, self).init(database, **connect_kwargs)
+        self._prewarmed = False
         if max_connections is not None:
             self.max_connections = make_int(max_connections)
         if stale_timeout is not None:
             self.stale_timeout = make_int(stale_timeout)
+        if timeout is not None:
+            self.timeout = make_int(timeout)
+        if min_connections is not None:
+            self.min_connections = make_int(min_connections)
+        if reap_interval is not None:
+            self.reap_interval = make_int(reap_interval)
+
+        # The reaper of a deferred pool is started once it is initialized.
+        # During `__init__` the pool is not set up yet, so the constructor
+        # starts the reaper itself.
+        if (self.reap_interval and self._reaper is None and
+                not self.deferred and self._available is not None):
+            self.start_reaper()
+
+    def reset_stats(self):
+        self._created = 0
+        self._closed_count = 0
+        self._recycled = 0
+        self._stale = 0
+        self._rejected = 0
+        self._checkouts = 0
+        self._saturated = 0
+        self._timeouts = 0
+        self._wait_time = 0.
+        self._max_wait_time = 0.
+        self._max_in_use = 0
+        self._checkout_histogram = [0] * (len(self.checkout_buckets) + 1)
+
+    def stats(self):
+        """
+        Return a dictionary of counters describing the usage of the pool.
+        """
+        checkouts = self._checkouts
+        buckets = list(self.checkout_buckets) + [None]
+        return {
+            'created': self._created,
+            'closed': self._closed_count,
+            'recycled': self._recycled,
+            'stale': self._stale,
+            'rejected': self._rejected,
+            'checkouts': checkouts,
+            'saturated': self._saturated,
+            'timeouts': self._timeouts,
+            'waiting': len(self._waiters),
+            'wait_time': self._wait_time,
+            'avg_wait_time': self._wait_time / checkouts if checkouts else 0.,
+            'max_wait_time': self._max_wait_time,
+            'in_use': len(self._in_use),
+            'idle': len(self._connections),
+            'max_in_use': self._max_in_use,
+            'checkout_latency': list(zip(buckets, self._checkout_histogram)),
+        }
+
+    def add_hook(self, event, fn):
+        """
+        Register a callback, called as `fn(database, event, conn)` whenever
+        the given pool event occurs. Callbacks are run while the pool is
+        locked, so they should be quick and must not use the database.
+        """
+        if event not in self._hooks:
+            raise ValueError('Unrecognized pool event "%s".' % event)
+        self._hooks[event].append(fn)
+
+    def remove_hook(self, event, fn):
+        self._hooks[event].remove(fn)
+
+    def _fire(self, event, conn=None):
+        for fn in self._hooks[event]:
+            fn(self, event, conn)
+
+    def _close_connection(self, conn):
+        # Close the underlying connection.
+        super(PooledDatabase, self)._close(conn)
+        self._closed_count += 1
+        self._fire('closed', conn)
+
+    def _reject(self, message):
+        self._rejected += 1
+        self._fire('rejected')
+        raise MaxConnectionsExceeded(message)
+
+    def _can_checkout(self):
+        return bool(self._connections) or not self.max_connections or (
+            len(self._in_use) < self.max_connections)
+
+    def _wait_for_connection(self):
+        # Wait until a connection can be checked out. Requests are served in
+        # the order they arrived, and a new request may not jump ahead of
+        # one that is already waiting.
+        if not self._waiters and self._can_checkout():
+            return
+
+        self._saturated += 1
+        if self.timeout is None:
+            self._reject('Exceeded maximum connections.')
+
+        waiter = object()
+        self._waiters.append(waiter)
+        start = time.time()
+        try:
+            while self._waiters[0] is not waiter or not self._can_checkout():
+                if self.timeout:
+                    remaining = start + self.timeout - time.time()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        self._reject(
+                            'Exceeded maximum connections, timed out after '
+                            'waiting %s seconds.' % self.timeout)
+                    self._available.wait(remaining)
+                else:
+                    self._available.wait()
+        finally:
+            self._waiters.remove(waiter)
+            elapsed = time.time() - start
+            self._wait_time += elapsed
+            if elapsed > self._max_wait_time:
+                self._max_wait_time = elapsed
+            # Let the next request in line check whether it may proceed.
+            self._available.notify_all()
+
+    def connect(self):
+        # Pre-warm the pool the first time a connection is requested, so that
+        # `min_connections` takes effect without a reaper thread.
+        if self.min_connections and not self._prewarmed:
+            self.prewarm()
+        super(PooledDatabase, self).connect()
 
     def _connect(self, *args, **kwargs):
+        start = time.time()
+        self._wait_for_connection()
         while True:
             try:
                 # Remove the oldest connection from the heap.
@@ -126,8 +289,9 @@ class PooledDatabase(object):
                     # set, because it is not in the list of available conns
                     # anymore.
                     logger.debug('Connection %s was stale, closing.', key)
-                    self._close(conn, True)
-                    self._closed.discard(key)
+                    self._stale += 1
+                    self._fire('stale', conn)
+                    self._close_connection(conn)
                     ts = conn = None
                 else:
                     break
@@ -135,13 +299,21 @@ class PooledDatabase(object):
         if conn is None:
             if self.max_connections and (
                     len(self._in_use) >= self.max_connections):
-                raise ValueError('Exceeded maximum connections.')
+                self._reject('Exceeded maximum connections.')
             conn = super(PooledDatabase, self)._connect(*args, **kwargs)
             ts = time.time()
             key = self.conn_key(conn)
             logger.debug('Created new connection %s.', key)
+            self._created += 1
+            self._fire('created', conn)
 
         self._in_use[key] = ts
+        self._checkouts += 1
+        if len(self._in_use) > self._max_in_use:
+            self._max_in_use = len(self._in_use)
+        self._checkout_histogram[bisect.bisect_left(
+            self.checkout_buckets, time.time() - start)] += 1
+        self._fire('checkout', conn)
         return conn
 
     def _is_stale(self, timestamp):
@@ -160,17 +332,136 @@ class PooledDatabase(object):
         key = self.conn_key(conn)
         if close_conn:
             self._closed.add(key)
-            super(PooledDatabase, self)._close(conn)
+            self._close_connection(conn)
         elif key in self._in_use:
             ts = self._in_use[key]
             del self._in_use[key]
             if self.stale_timeout and self._is_stale(ts):
                 logger.debug('Closing stale connection %s.', key)
-                super(PooledDatabase, self)._close(conn)
+                self._stale += 1
+                self._fire('stale', conn)
+                self._close_connection(conn)
             else:
                 logger.debug('Returning %s to pool.', key)
                 if self._is_ok(conn):
                     heapq.heappush(self._connections, (ts, conn))
+                    self._recycled += 1
+                    self._fire('recycled', conn)
+            if self._waiters:
+                self._available.notify_all()
+
+    def _should_discard(self, ts, conn):
+        key = self.conn_key(conn)
+        if self._is_closed(key, conn):
+            logger.debug('Connection %s was closed, discarding.', key)
+            self._closed.discard(key)
+            return True
+        elif self.stale_timeout and self._is_stale(ts):
+            logger.debug('Connection %s was stale, closing.', key)
+            self._stale += 1
+            self._fire('stale', conn)
+            self._close_connection(conn)
+            return True
+        elif not self._is_ok(conn):
+            logger.debug('Connection %s failed health check, closing.', key)
+            self._close_connection(conn)
+            return True
+        return False
+
+    def reap(self):
+        """
+        Close any idle connections that are stale, closed or unhealthy.
+        Returns the number of connections removed from the pool.
+        """
+        with self._conn_lock:
+            connections = [
+                (ts, conn) for ts, conn in self._connections
+                if not self._should_discard(ts, conn)]
+            reaped = len(self._connections) - len(connections)
+            heapq.heapify(connections)
+            self._connections = connections
+            if reaped and self._waiters:
+                self._available.notify_all()
+        return reaped
+
+    def prewarm(self):
+        """
+        Open new connections until there are at least `min_connections`
+        idle connections in the pool (without exceeding `max_connections`).
+        Returns the number of connections opened.
+        """
+        with self._conn_lock:
+            self._prewarmed = True
+            needed = self.min_connections - len(self._connections)
+            if self.max_connections:
+                needed = min(needed, self.max_connections - (
+                    len(self._connections) + len(self._in_use)))
+        if self.deferred or needed <= 0:
+            return 0
+
+        # Connect without holding the lock, so checkouts are not delayed.
+        new_connections = []
+        for _ in range(needed):
+            conn = super(PooledDatabase, self)._connect(
+                self.database,
+                **self.connect_kwargs)
+            logger.debug('Created new connection %s.', self.conn_key(conn))
+            new_connections.append((time.time(), conn))
+
+        with self._conn_lock:
+            for ts, conn in new_connections:
+                self._created += 1
+                self._fire('created', conn)
+                total = len(self._connections) + len(self._in_use)
+                if self.max_connections and total >= self.max_connections:
+                    self._close_connection(conn)
+                else:
+                    heapq.heappush(self._connections, (ts, conn))
+            if self._waiters:
+                self._available.notify_all()
+        return len(new_connections)
+
+    def maintain(self):
+        """
+        Reap stale and unhealthy idle connections, then top up the pool to
+        `min_connections`.
+        """
+        self.reap()
+        self.prewarm()
+
+    def _reaper_loop(self, stop, interval):
+        while not stop.wait(interval):
+            try:
+                self.maintain()
+            except Exception:
+                logger.exception('Error maintaining connection pool.')
+
+    def start_reaper(self, interval=None):
+        """
+        Start a daemon thread that calls `maintain()` every `interval`
+        seconds (by default, every `reap_interval` seconds).
+        """
+        if self._reaper is not None:
+            return False
+        interval = interval or self.reap_interval
+        if not interval:
+            raise ValueError('A reap interval is required.')
+        self.maintain()
+        self._reaper_stop = threading.Event()
+        self._reaper = threading.Thread(
+            target=self._reaper_loop,
+            args=(self._reaper_stop, interval))
+        self._reaper.daemon = True
+        self._reaper.start()
+        return True
+
+    def stop_reaper(self):
+        if self._reaper is None:
+            return False
+        self._reaper_stop.set()
+        self._reaper.join()
+        self._reaper = self._reaper_stop = None
+        return True
 
     def manual_close(self):
         """
@@ -178,15 +469,17 @@ class PooledDatabase(object):
         """
         conn = self.get_conn()
         self.close()
-        if not self._is_closed(self.conn_key(conn), conn):
-            self._close(conn, close_conn=True)
+        with self._conn_lock:
+            if not self._is_closed(self.conn_key(conn), conn):
+                self._close(conn, close_conn=True)
 
     def close_all(self):
         """
         Close all connections managed by the pool.
         """
-        for _, conn in self._connections:
-            self._close(conn, close_conn=True)
+        with self._conn_lock:
+            for _, conn in self._connections:
+                self._close(conn, close_conn=True)
 
 
 class PooledMySQLDatabase(PooledDatabase, MySQLDatabase):
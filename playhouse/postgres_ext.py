@@ -353,11 +353,6 @@ class PostgresqlExtDatabase(PostgresqlDatabase):
         self.register_hstore = kwargs.pop('register_hstore', True)
         super(PostgresqlExtDatabase, self).__init__(*args, **kwargs)
 
-    def get_cursor(self, name=None):
-        if name:
-            return self.get_conn().cursor(name=name)
-        return self.get_conn().cursor()
-
     def execute_sql(self, sql, params=None, require_commit=True,
                     named_cursor=False):
         logger.debug((sql, params))
@@ -31,12 +31,12 @@ best_docs = (Document
 # or use the shortcut method.
 best_docs = Document.match('some phrase')
 """
+import array
 import glob
 import inspect
 import math
 import os
 import re
-import struct
 import sys
 try:
     import simplejson as json
@@ -332,18 +332,59 @@ class FTSModel(BaseFTSModel):
         return fn.fts_lucene(match_info, *weights)
 
     @classmethod
-    def _search(cls, term, weights, with_score, score_alias, score_fn,
-                explicit_ordering):
+    def _column_index(cls, field):
+        if field is None:
+            return -1
+        elif isinstance(field, int):
+            return field
+        names = [f.name for f in cls._meta.declared_fields]
+        return names.index(field.name)
+
+    @classmethod
+    def snippet(cls, field=None, start='<b>', end='</b>', ellipsis='...',
+                tokens=15):
+        """
+        Generate an expression that returns a fragment of the matching text
+        with the matched terms wrapped in `start` and `end`. If no field is
+        given, the fragment is taken from the best matching column.
+        """
+        return fn.snippet(
+            cls.as_entity(),
+            start,
+            end,
+            ellipsis,
+            cls._column_index(field),
+            tokens)
+
+    @classmethod
+    def highlight(cls, field, start='<b>', end='</b>'):
+        """
+        Generate an expression that returns the full text of `field` with the
+        matched terms wrapped in `start` and `end`.
+        """
+        return fn.fts_highlight(
+            fn.offsets(cls.as_entity()),
+            field,
+            cls._column_index(field),
+            start,
+            end)
+
+    @classmethod
+    def _weighted_score(cls, score_fn, weights):
         if not weights:
-            rank = score_fn()
+            return score_fn()
         elif isinstance(weights, dict):
             weight_args = []
             for field in cls._meta.declared_fields:
                 weight_args.append(
                     weights.get(field, weights.get(field.name, 1.0)))
-            rank = score_fn(*weight_args)
-        else:
-            rank = score_fn(*weights)
+            return score_fn(*weight_args)
+        return score_fn(*weights)
+
+    @classmethod
+    def _search(cls, term, weights, with_score, score_alias, score_fn,
+                explicit_ordering):
+        rank = cls._weighted_score(score_fn, weights)
 
         selection = ()
         order_by = rank
@@ -393,6 +434,32 @@ class FTSModel(BaseFTSModel):
             cls.lucene,
             explicit_ordering)
 
+    @classmethod
+    def search_top(cls, term, k=10, offset=0, weights=None,
+                   score_alias='score', ranking='rank'):
+        """
+        Return the `k` best matches for `term`, ordered by score.
+
+        Only the document ids and scores of the matches are ranked, and
+        SQLite keeps just the best `k` while scanning them. The stored
+        content is then read for those `k` documents alone.
+
+        :param ranking: name of the scoring method to use, e.g. "bm25".
+        """
+        score = cls._weighted_score(getattr(cls, ranking), weights)
+        ranked = (cls
+                  .select(cls.docid, score.alias(score_alias))
+                  .where(cls.match(term))
+                  .order_by(SQL(score_alias))
+                  .limit(k)
+                  .offset(offset)
+                  .alias('ranked'))
+        ranked_score = getattr(ranked.c, score_alias)
+        return (cls
+                .select(cls.docid, cls, ranked_score.alias(score_alias))
+                .join(ranked, on=(cls.docid == ranked.c.docid))
+                .order_by(ranked_score))
+
 
 _alphabet = 'abcdefghijklmnopqrstuvwxyz'
 _alphanum = set([
@@ -844,13 +911,16 @@ class SqliteExtDatabase(SqliteDatabase):
             self.register_function(_c_ext.peewee_lucene, 'fts_lucene', -1)
             self.register_function(_c_ext.peewee_bm25, 'fts_bm25', -1)
             self.register_function(_c_ext.peewee_murmurhash, 'murmurhash', 1)
+            self.register_function(highlight, 'fts_highlight', 5)
         else:
             self._using_c_extensions = False
             self.register_function(_sqlite_date_part, 'date_part', 2)
             self.register_function(_sqlite_date_trunc, 'date_trunc', 2)
             self.register_function(_sqlite_regexp, 'regexp', 2)
             self.register_function(rank, 'fts_rank', -1)
+            self.register_function(lucene, 'fts_lucene', -1)
             self.register_function(bm25, 'fts_bm25', -1)
+            self.register_function(highlight, 'fts_highlight', 5)
 
     @property
     def using_c_extensions(self):
@@ -977,38 +1047,139 @@ def match(lhs, rhs):
     return Expression(lhs, OP.MATCH, rhs)
 
 def _parse_match_info(buf):
-    # See http://sqlite.org/fts3.html#matchinfo
-    bufsize = len(buf)  # Length in bytes.
-    return [struct.unpack('@I', buf[i:i+4])[0] for i in range(0, bufsize, 4)]
+    # See http://sqlite.org/fts3.html#matchinfo. The buffer is an array of
+    # native 32-bit unsigned integers, decoded with a single copy.
+    return array.array('I', bytes(buf))
+
+# The ranking functions are called once per matching row. Values that only
+# depend on the query (the matchinfo header and the column weights) are
+# computed once and cached, keyed by the raw header bytes and weights.
+_rank_constants = {}
+_RANK_CACHE_SIZE = 256
+
+def _cache_constants(key, constants):
+    if len(_rank_constants) >= _RANK_CACHE_SIZE:
+        _rank_constants.clear()
+    _rank_constants[key] = constants
+    return constants
+
+def _column_weights(weights, col_count):
+    # Columns without an explicit weight get 1 when no weights are given at
+    # all, otherwise 0. Columns with a weight of 0 are skipped entirely.
+    if not weights:
+        return [(col, 1.0) for col in range(col_count)]
+    return [(col, float(weight))
+            for col, weight in enumerate(weights[:col_count]) if weight]
+
+def highlight(offsets, text, column, start, end):
+    """
+    Wrap the terms matched in `text` with `start` and `end`, using the
+    result of the FTS offsets() function.
+    """
+    if not offsets or text is None:
+        return text
+    # Offsets are four integers per match: column, term, byte offset, size.
+    values = [int(value) for value in offsets.split()]
+    matches = sorted(set(
+        (values[i + 2], values[i + 3])
+        for i in range(0, len(values), 4)
+        if values[i] == column))
+    if not matches:
+        return text
+
+    data = text.encode('utf-8')
+    start, end = start.encode('utf-8'), end.encode('utf-8')
+    accum = []
+    last = 0
+    for offset, size in matches:
+        if offset < last:
+            continue  # Overlaps the previous match.
+        accum.extend((data[last:offset], start, data[offset:offset + size],
+                      end))
+        last = offset + size
+    accum.append(data[last:])
+    return b''.join(accum).decode('utf-8')
 
 # Ranking implementation, which parse matchinfo.
 def rank(raw_match_info, *weights):
     # Handle match_info called w/default args 'pcx' - based on the example rank
     # function http://sqlite.org/fts3.html#appendix_a
     match_info = _parse_match_info(raw_match_info)
+    phrase_count, col_count = match_info[0], match_info[1]
+    key = (phrase_count, col_count, weights)
+    cols = _rank_constants.get(key)
+    if cols is None:
+        cols = _cache_constants(key, [
+            (col * 3, weight)
+            for col, weight in _column_weights(weights, col_count)])
+
     score = 0.0
+    for phrase_num in range(phrase_count):
+        phrase_info_idx = 2 + (phrase_num * col_count * 3)
+        for col_idx, weight in cols:
+            hits = match_info[phrase_info_idx + col_idx]
+            if hits > 0:
+                global_hits = match_info[phrase_info_idx + col_idx + 1]
+                score += weight * (float(hits) / global_hits)
 
-    p, c = match_info[:2]
-    if not weights:
-        weights = [1] * c
-    else:
-        weights = [0] * c
-        for i, weight in enumerate(weights):
-            weights[i] = weight
-
-    for phrase_num in range(p):
-        phrase_info_idx = 2 + (phrase_num * c * 3)
-        for col_num in range(c):
-            weight = weights[col_num]
-            if not weight:
-                continue
+    return -score
 
-            col_idx = phrase_info_idx + (col_num * 3)
-            x1, x2 = match_info[col_idx:col_idx + 2]
-            if x1 > 0:
-                score += weight * (float(x1) / x2)
+class _TermStatistics(object):
+    """
+    Per-query values for the BM25 and Lucene ranking functions, derived from
+    the header of a matchinfo buffer using the 'pcnalx' format.
+    """
+    K = 1.2
+    B = 0.75
 
-    return -score
+    def __init__(self, match_info, weights):
+        self.term_count = match_info[0]
+        self.col_count = col_count = match_info[1]
+        self.total_docs = match_info[2]
+        self.L_O = 3 + col_count
+        self.X_O = self.L_O + col_count
+        self._idf = {}
+        self._lucene_idf = {}
+
+        # The length normalization K * (1 - B + B * (l / a)) is linear in
+        # the document length l, so store its constant part and slope.
+        self.columns = []
+        for col, weight in _column_weights(weights, col_count):
+            avg_length = float(match_info[3 + col])
+            if avg_length == 0:
+                norm, slope = 0., 0.
+            else:
+                norm = self.K * (1 - self.B)
+                slope = self.K * self.B / avg_length
+            self.columns.append((col, weight, norm, slope))
+
+    @classmethod
+    def get(cls, raw_match_info, match_info, weights):
+        # p, c, n and the average column lengths are constant for a query.
+        key = (bytes(raw_match_info[:4 * (3 + match_info[1])]), weights)
+        stats = _rank_constants.get(key)
+        if stats is None:
+            stats = _cache_constants(key, cls(match_info, weights))
+        return stats
+
+    def idf(self, docs_with_term):
+        try:
+            return self._idf[docs_with_term]
+        except KeyError:
+            idf = self._idf[docs_with_term] = max(
+                math.log(
+                    (self.total_docs - docs_with_term + 0.5) /
+                    (docs_with_term + 0.5)),
+                0)
+            return idf
+
+    def lucene_idf(self, docs_with_term):
+        try:
+            return self._lucene_idf[docs_with_term]
+        except KeyError:
+            idf = self._lucene_idf[docs_with_term] = math.log(
+                self.total_docs / (docs_with_term + 1.))
+            return idf
 
 # Okapi BM25 ranking implementation (FTS4 only).
 def bm25(raw_match_info, *args):
@@ -1021,52 +1192,45 @@ def bm25(raw_match_info, *args):
         bm25(matchinfo(document_tbl, 'pcnalx'), 1) AS rank
     """
     match_info = _parse_match_info(raw_match_info)
-    K = 1.2
-    B = 0.75
+    stats = _TermStatistics.get(raw_match_info, match_info, args)
+    K1 = stats.K + 1
+    L_O = stats.L_O
     score = 0.0
 
-    P_O, C_O, N_O, A_O = range(4)
-    term_count = match_info[P_O]
-    col_count = match_info[C_O]
-    total_docs = match_info[N_O]
-    L_O = A_O + col_count
-    X_O = L_O + col_count
-
-    if not args:
-        weights = [1] * col_count
-    else:
-        weights = [0] * col_count
-        for i, weight in enumerate(args):
-            weights[i] = args[i]
-
-    for i in range(term_count):
-        for j in range(col_count):
-            weight = weights[j]
-            if weight == 0:
+    for i in range(stats.term_count):
+        term_idx = stats.X_O + (3 * i * stats.col_count)
+        for j, weight, norm, slope in stats.columns:
+            x = term_idx + (3 * j)
+            term_frequency = match_info[x]
+            if term_frequency == 0:
                 continue
+            denom = term_frequency + norm + (slope * match_info[L_O + j])
+            rhs = (term_frequency * K1) / denom
+            score += (stats.idf(match_info[x + 2]) * rhs) * weight
 
-            avg_length = float(match_info[A_O + j])
-            doc_length = float(match_info[L_O + j])
-            if avg_length == 0:
-                D = 0
-            else:
-                D = 1 - B + (B * (doc_length / avg_length))
+    return -score
 
-            x = X_O + (3 * j * (i + 1))
-            term_frequency = float(match_info[x])
-            docs_with_term = float(match_info[x + 2])
+def lucene(raw_match_info, *args):
+    """
+    Usage:
 
-            idf = max(
-                math.log(
-                    (total_docs - docs_with_term + 0.5) /
-                    (docs_with_term + 0.5)),
-                0)
-            denom = term_frequency + (K * D)
-            if denom == 0:
-                rhs = 0
-            else:
-                rhs = (term_frequency * (K + 1)) / denom
+        # Format string *must* be pcnalx
+        lucene(matchinfo(document_tbl, 'pcnalx'), 1) AS rank
+    """
+    match_info = _parse_match_info(raw_match_info)
+    stats = _TermStatistics.get(raw_match_info, match_info, args)
+    L_O = stats.L_O
+    score = 0.0
 
-            score += (idf * rhs) * weight
+    for i in range(stats.term_count):
+        term_idx = stats.X_O + (3 * i * stats.col_count)
+        for j, weight, _, _ in stats.columns:
+            x = term_idx + (3 * j)
+            term_frequency = match_info[x]
+            if term_frequency == 0:
+                continue
+            field_norm = 1.0 / math.sqrt(match_info[L_O + j])
+            idf = stats.lucene_idf(match_info[x + 2])
+            score += idf * math.sqrt(term_frequency) * field_norm * weight
 
     return -score
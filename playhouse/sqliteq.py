@@ -1,10 +1,13 @@
 import logging
+import time
 import weakref
 from threading import Event
 from threading import Thread
 try:
+    from Queue import Empty
     from Queue import Queue
 except ImportError:
+    from queue import Empty
     from queue import Queue
 
 try:
@@ -15,6 +18,18 @@ try:
 except ImportError:
     GThread = GQueue = GEvent = None
 
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+try:
+    StopAsyncIteration
+except NameError:
+    class StopAsyncIteration(Exception):
+        pass
+
+from peewee import ImproperlyConfigured
 from playhouse.sqlite_ext import SqliteExtDatabase
 
 
@@ -38,12 +53,16 @@ class AsyncCursor(object):
         self._cursor = self._exc = self._idx = self._rows = None
 
     def set_result(self, cursor, exc=None):
+        self._store_result(cursor, exc)
+        self._event.set()
+        return self
+
+    def _store_result(self, cursor, exc=None):
+        # Populate the result without waking up the caller.
         self._cursor = cursor
         self._exc = exc
         self._idx = 0
         self._rows = cursor.fetchall() if exc is None else []
-        self._event.set()
-        return self
 
     def _wait(self, timeout=None):
         timeout = timeout if timeout is not None else self.timeout
@@ -95,6 +114,93 @@ class AsyncCursor(object):
         except StopIteration:
             return None
 
+    def fetchmany(self, size=1):
+        self._wait()
+        rows = self._rows[self._idx:self._idx + size]
+        self._idx += len(rows)
+        return rows
+
+
+class AsyncioEvent(object):
+    """
+    Event that, in addition to waking up blocked threads, resolves a future
+    on an asyncio event loop when it is set.
+    """
+    __slots__ = ('_event', '_loop', 'future')
+
+    def __init__(self, loop):
+        self._event = Event()
+        self._loop = loop
+        self.future = asyncio.Future(loop=loop)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+    def set(self):
+        # Called from a worker thread. The event loop may have been closed
+        # since the query was queued, in which case there is nobody left to
+        # notify, and the worker must carry on regardless.
+        self._event.set()
+        try:
+            self._loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            pass
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+
+class AsyncioCursor(AsyncCursor):
+    """
+    Cursor that can be awaited from a coroutine, or iterated over using
+    `async for`, without blocking the event loop.
+    """
+    __slots__ = ('_loop',)
+
+    def __init__(self, loop, *args, **kwargs):
+        super(AsyncioCursor, self).__init__(*args, **kwargs)
+        self._loop = loop
+
+    def _when_ready(self, callback):
+        # Return a future that resolves to the return value of callback(),
+        # once the query has been executed.
+        result = asyncio.Future(loop=self._loop)
+
+        def on_ready(_):
+            if result.cancelled():
+                return
+            try:
+                if self._exc is not None:
+                    raise self._exc
+                value = callback()
+            except Exception as exc:
+                result.set_exception(exc)
+            else:
+                result.set_result(value)
+
+        ready = self._event.future
+        if ready.done():
+            on_ready(ready)
+        else:
+            ready.add_done_callback(on_ready)
+        return result
+
+    def __await__(self):
+        return self._when_ready(lambda: self).__await__()
+
+    def __aiter__(self):
+        return self
+
+    def _next_or_stop(self):
+        try:
+            return next(self)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    def __anext__(self):
+        return self._when_ready(self._next_or_stop)
+
 
 THREADLOCAL_ERROR_MESSAGE = ('threadlocals cannot be set to True when using '
                              'the Sqlite thread / queue database. All queries '
@@ -109,7 +215,8 @@ WAL_MODE_ERROR_MESSAGE = ('SQLite must be configured to use the WAL journal '
 
 class SqliteQueueDatabase(SqliteExtDatabase):
     def __init__(self, database, use_gevent=False, autostart=False, readers=1,
-                 queue_max_size=None, results_timeout=None, *args, **kwargs):
+                 queue_max_size=None, results_timeout=None, group_commit=None,
+                 group_commit_wait=0, *args, **kwargs):
         if kwargs.get('threadlocals'):
             raise ValueError(THREADLOCAL_ERROR_MESSAGE)
 
@@ -134,6 +241,8 @@ class SqliteQueueDatabase(SqliteExtDatabase):
         self._autostart = autostart
         self._results_timeout = results_timeout
         self._num_readers = readers
+        self._group_commit = group_commit
+        self._group_commit_wait = group_commit_wait
 
         self._is_stopped = True
         self._thread_helper = self.get_thread_impl(use_gevent)(queue_max_size)
@@ -163,9 +272,16 @@ class SqliteQueueDatabase(SqliteExtDatabase):
         self._read_queue = self._thread_helper.queue()
 
         target = self._run_worker_loop
-        self._writer = self._thread_helper.thread(target, self._write_queue)
-        self._readers = [self._thread_helper.thread(target, self._read_queue)
-                         for _ in range(self._num_readers)]
+        if self._group_commit and self._group_commit > 1:
+            writer_target = self._run_group_commit_loop
+        else:
+            writer_target = target
+        self._writer = self._thread_helper.thread(
+            writer_target,
+            self._write_queue)
+        self._readers = [
+            self._thread_helper.thread(self._run_reader_loop, self._read_queue)
+            for _ in range(self._num_readers)]
 
     def _run_worker_loop(self, queue):
         while True:
@@ -177,15 +293,118 @@ class SqliteQueueDatabase(SqliteExtDatabase):
             logger.debug('received query %s', async_cursor.sql)
             self._process_execution(async_cursor)
 
+    def _run_reader_loop(self, queue):
+        # Each reader uses its own read-only connection, so reads can happen
+        # concurrently with each other and with the writer. In-memory
+        # databases cannot be shared between connections, so in that case
+        # the readers use the same connection as the writer.
+        if self.database in ('', ':memory:'):
+            return self._run_worker_loop(queue)
+
+        conn = None
+        try:
+            while True:
+                async_cursor = queue.get()
+                if async_cursor is StopIteration:
+                    logger.info('worker shutting down.')
+                    return
+
+                logger.debug('received query %s', async_cursor.sql)
+                try:
+                    with self.exception_wrapper():
+                        if conn is None:
+                            conn = self._connect_reader()
+                        cursor = conn.cursor()
+                        cursor.execute(async_cursor.sql,
+                                       async_cursor.params or ())
+                except Exception as exc:
+                    async_cursor.set_result(None, exc)
+                else:
+                    async_cursor.set_result(cursor)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _connect_reader(self):
+        conn = self._connect(self.database, **self.connect_kwargs)
+        conn.execute('PRAGMA query_only = 1')
+        return conn
+
+    def _run_group_commit_loop(self, queue):
+        # Collect up to `group_commit` writes, waiting at most
+        # `group_commit_wait` seconds for more to arrive, and execute them
+        # in a single transaction.
+        while True:
+            async_cursor = queue.get()
+            if async_cursor is StopIteration:
+                logger.info('worker shutting down.')
+                return
+
+            batch = [async_cursor]
+            shutdown = False
+            deadline = time.time() + self._group_commit_wait
+            while len(batch) < self._group_commit:
+                remaining = deadline - time.time()
+                try:
+                    if remaining > 0:
+                        async_cursor = queue.get(timeout=remaining)
+                    else:
+                        async_cursor = queue.get(block=False)
+                except Empty:
+                    break
+                if async_cursor is StopIteration:
+                    shutdown = True
+                    break
+                batch.append(async_cursor)
+
+            logger.debug('received %s queries for group commit', len(batch))
+            self._process_group_commit(batch)
+            if shutdown:
+                logger.info('worker shutting down.')
+                return
+
+    def _process_group_commit(self, batch):
+        # Each statement runs in its own savepoint so that a failing write
+        # does not affect the rest of the batch. Callers are only notified
+        # once the transaction has been committed.
+        savepoint = 'peewee_group_commit'
+        try:
+            with self.exception_wrapper():
+                conn = self.get_conn()
+                conn.execute('BEGIN')
+                for async_cursor in batch:
+                    conn.execute('SAVEPOINT %s' % savepoint)
+                    try:
+                        with self.exception_wrapper():
+                            cursor = conn.cursor()
+                            cursor.execute(async_cursor.sql,
+                                           async_cursor.params or ())
+                            async_cursor._store_result(cursor)
+                    except Exception as exc:
+                        conn.execute('ROLLBACK TO SAVEPOINT %s' % savepoint)
+                        async_cursor._store_result(None, exc)
+                    conn.execute('RELEASE SAVEPOINT %s' % savepoint)
+                conn.execute('COMMIT')
+        except Exception as exc:
+            logger.exception('group commit failed.')
+            try:
+                self.get_conn().execute('ROLLBACK')
+            except Exception:
+                pass
+            for async_cursor in batch:
+                async_cursor._store_result(None, exc)
+
+        for async_cursor in batch:
+            async_cursor._event.set()
+
     def _process_execution(self, async_cursor):
         try:
             cursor = self.__execute_sql(async_cursor.sql, async_cursor.params,
                                         async_cursor.commit)
         except Exception as exc:
-            cursor = None
+            return async_cursor.set_result(None, exc)
         else:
-            exc = None
-        return async_cursor.set_result(cursor, exc)
+            return async_cursor.set_result(cursor)
 
     def queue_size(self):
         return (self._write_queue.qsize(), self._read_queue.qsize())
@@ -201,6 +420,44 @@ class SqliteQueueDatabase(SqliteExtDatabase):
         queue.put(cursor)
         return cursor
 
+    def execute_sql_async(self, sql, params=None, require_commit=True,
+                          loop=None):
+        """
+        Queue a query and return a cursor that can be awaited by a coroutine
+        running on the given (or current) asyncio event loop.
+        """
+        if asyncio is None:
+            raise ImproperlyConfigured('asyncio is required to use '
+                                       'execute_sql_async().')
+        loop = loop or asyncio.get_event_loop()
+        cursor = AsyncioCursor(
+            loop,
+            event=AsyncioEvent(loop),
+            sql=sql,
+            params=params,
+            commit=require_commit,
+            timeout=self._results_timeout)
+        queue = self._write_queue if require_commit else self._read_queue
+        queue.put(cursor)
+        return cursor
+
+    def execute_async(self, query, loop=None):
+        """
+        Queue the given query and return an awaitable cursor. The cursor
+        returns raw rows, not model instances.
+        """
+        sql, params = query.sql()
+        return self.execute_sql_async(sql, params, query.require_commit, loop)
+
+    def execute_sql_many(self, sql, seq_of_params, require_commit=True,
+                         timeout=None):
+        # Each statement must pass through the queue, so executemany() cannot
+        # be used directly.
+        cursor = None
+        for params in seq_of_params:
+            cursor = self.execute_sql(sql, params, require_commit, timeout)
+        return cursor
+
     def start(self):
         with self._conn_lock:
             if not self._is_stopped:
@@ -220,10 +477,13 @@ class SqliteQueueDatabase(SqliteExtDatabase):
             self._write_queue.put(StopIteration)
             for _ in self._readers:
                 self._read_queue.put(StopIteration)
-            self._writer.join()
-            for reader in self._readers:
-                reader.join()
-            return True
+
+        # Join the workers without holding the connection lock, as they may
+        # still need to open a connection to finish any pending work.
+        self._writer.join()
+        for reader in self._readers:
+            reader.join()
+        return True
 
     def is_stopped(self):
         with self._conn_lock:
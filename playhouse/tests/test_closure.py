@@ -0,0 +1,218 @@
+from peewee import *
+from playhouse import signals
+from playhouse.closure import ClosureTable
+from playhouse.tests.base import ModelTestCase
+from playhouse.tests.base import test_db
+
+
+class Category(Model):
+    name = CharField()
+    parent = ForeignKeyField('self', index=True, null=True,
+                             related_name='children')
+
+    class Meta:
+        database = test_db
+
+CategoryClosure = ClosureTable(Category)
+
+
+class Tag(signals.Model):
+    name = CharField()
+    parent = ForeignKeyField('self', null=True, related_name='children')
+
+    class Meta:
+        database = test_db
+
+TagClosure = ClosureTable(Tag)
+
+
+class TestClosureTable(ModelTestCase):
+    requires = [Category, CategoryClosure]
+
+    def setUp(self):
+        super(TestClosureTable, self).setUp()
+        # books
+        #   fiction
+        #     scifi
+        #   history
+        #     ancient
+        # music
+        self.nodes = {}
+        for name, parent in (('books', None),
+                             ('fiction', 'books'),
+                             ('scifi', 'fiction'),
+                             ('history', 'books'),
+                             ('ancient', 'history'),
+                             ('music', None)):
+            node = Category.create(name=name, parent=self.nodes.get(parent))
+            CategoryClosure.insert_node(node)
+            self.nodes[name] = node
+
+    def closure_rows(self):
+        query = (CategoryClosure
+                 .select(CategoryClosure.root,
+                         CategoryClosure.node,
+                         CategoryClosure.depth)
+                 .tuples())
+        return sorted(query)
+
+    def assertNodes(self, query, expected):
+        self.assertEqual(
+            sorted((node.name, node.depth) for node in query),
+            sorted(expected))
+
+    def test_queries(self):
+        books, history = self.nodes['books'], self.nodes['history']
+        self.assertNodes(CategoryClosure.descendants(books), [
+            ('ancient', 2),
+            ('fiction', 1),
+            ('history', 1),
+            ('scifi', 2)])
+        self.assertNodes(CategoryClosure.descendants(books, depth=1), [
+            ('fiction', 1),
+            ('history', 1)])
+        self.assertNodes(
+            CategoryClosure.descendants(history, include_node=True),
+            [('ancient', 1), ('history', 0)])
+
+        self.assertNodes(CategoryClosure.ancestors(self.nodes['scifi']), [
+            ('books', 2),
+            ('fiction', 1)])
+        self.assertNodes(CategoryClosure.ancestors(books), [])
+
+        self.assertEqual(
+            [node.name for node in CategoryClosure.siblings(history)],
+            ['fiction'])
+
+    def test_rebuild(self):
+        expected = self.closure_rows()
+        self.assertEqual(len(expected), 12)
+
+        CategoryClosure.delete().execute()
+        with self.assertQueryCount(12, ignore_txn=True):
+            CategoryClosure.rebuild()
+        self.assertEqual(self.closure_rows(), expected)
+
+    def test_rebuild_cycle(self):
+        expected = self.closure_rows()
+        books, scifi = self.nodes['books'], self.nodes['scifi']
+        Category.update(parent=scifi).where(Category.id == books.id).execute()
+        self.assertRaises(ValueError, CategoryClosure.rebuild)
+        self.assertEqual(self.closure_rows(), expected)
+
+        # A node that is its own parent is a cycle too.
+        Category.update(parent=books).where(Category.id == books.id).execute()
+        self.assertRaises(ValueError, CategoryClosure.rebuild)
+
+    def test_move_node(self):
+        fiction, history = self.nodes['fiction'], self.nodes['history']
+        CategoryClosure.move_node(history, fiction)
+        self.assertEqual(history.parent, fiction)
+        self.assertEqual(
+            Category.get(Category.name == 'history').parent, fiction)
+        self.assertNodes(CategoryClosure.descendants(self.nodes['books']), [
+            ('ancient', 3),
+            ('fiction', 1),
+            ('history', 2),
+            ('scifi', 2)])
+        self.assertNodes(CategoryClosure.ancestors(self.nodes['ancient']), [
+            ('books', 3),
+            ('fiction', 2),
+            ('history', 1)])
+
+        # The incremental changes match a full rebuild.
+        moved = self.closure_rows()
+        CategoryClosure.rebuild()
+        self.assertEqual(self.closure_rows(), moved)
+
+        # Move the subtree to another tree, then make it a root.
+        CategoryClosure.move_node(history, self.nodes['music'])
+        self.assertNodes(CategoryClosure.ancestors(self.nodes['ancient']), [
+            ('history', 1),
+            ('music', 2)])
+        CategoryClosure.move_node(history, None)
+        self.assertIsNone(history.parent)
+        self.assertNodes(CategoryClosure.ancestors(self.nodes['ancient']), [
+            ('history', 1)])
+        moved = self.closure_rows()
+        CategoryClosure.rebuild()
+        self.assertEqual(self.closure_rows(), moved)
+
+        self.assertRaises(
+            ValueError,
+            CategoryClosure.move_node,
+            history,
+            self.nodes['ancient'])
+
+    def test_delete_node(self):
+        CategoryClosure.delete_node(self.nodes['history'])
+        self.assertNodes(CategoryClosure.descendants(self.nodes['books']), [
+            ('fiction', 1),
+            ('scifi', 2)])
+        self.assertEqual(len(self.closure_rows()), 7)
+
+
+class TestClosureTableSignals(ModelTestCase):
+    requires = [Tag, TagClosure]
+
+    def setUp(self):
+        super(TestClosureTableSignals, self).setUp()
+        TagClosure.connect_signals()
+
+    def tearDown(self):
+        TagClosure.disconnect_signals()
+        super(TestClosureTableSignals, self).tearDown()
+
+    def assertDescendants(self, node, expected):
+        self.assertEqual(
+            sorted((tag.name, tag.depth)
+                   for tag in TagClosure.descendants(node)),
+            sorted(expected))
+
+    def assertMatchesRebuild(self):
+        def rows():
+            query = (TagClosure
+                     .select(TagClosure.root,
+                             TagClosure.node,
+                             TagClosure.depth)
+                     .tuples())
+            return sorted(query)
+        current = rows()
+        TagClosure.rebuild()
+        self.assertEqual(rows(), current)
+
+    def test_signals(self):
+        python = Tag.create(name='python')
+        web = Tag.create(name='web', parent=python)
+        flask = Tag.create(name='flask', parent=web)
+        js = Tag.create(name='js')
+        self.assertDescendants(python, [('flask', 2), ('web', 1)])
+        self.assertMatchesRebuild()
+
+        # Saving without changing the parent leaves the table alone.
+        web.name = 'www'
+        with self.assertQueryCount(2):
+            web.save()
+
+        # Changing the parent moves the subtree.
+        web.parent = js
+        web.save()
+        self.assertDescendants(python, [])
+        self.assertDescendants(js, [('flask', 2), ('www', 1)])
+        self.assertMatchesRebuild()
+
+        web.parent = None
+        web.save()
+        self.assertDescendants(js, [])
+        self.assertMatchesRebuild()
+
+        # A node saved with an explicit primary key is added too.
+        Tag(id=100, name='node', parent=js).save(force_insert=True)
+        self.assertDescendants(js, [('node', 1)])
+
+        flask.delete_instance()
+        self.assertDescendants(web, [])
+        self.assertMatchesRebuild()
+
+    def test_requires_signals_model(self):
+        self.assertRaises(ValueError, CategoryClosure.connect_signals)
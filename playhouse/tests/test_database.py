@@ -1,5 +1,6 @@
 # encoding=utf-8
 
+import datetime
 import sys
 import threading
 try:
@@ -381,3 +382,137 @@ class TestConnectionInitialization(PeeweeTestCase):
         db.close()
         db.connect()
         self.assertEqual(state['initialized'], 2)
+
+
+class TestCompiledSQLCache(PeeweeTestCase):
+    def setUp(self):
+        super(TestCompiledSQLCache, self).setUp()
+        self.db = SqliteDatabase(':memory:', sql_cache_size=16)
+
+        class BaseModel(Model):
+            class Meta:
+                database = self.db
+
+        class Author(BaseModel):
+            name = CharField()
+            created = DateTimeField(default=datetime.datetime.now)
+
+        class Book(BaseModel):
+            author = ForeignKeyField(Author, related_name='books')
+            title = CharField()
+
+        self.Author = Author
+        self.Book = Book
+        self.db.create_tables([Author, Book])
+        self.db.clear_sql_cache()
+
+    def compile(self, query):
+        return query.sql()
+
+    def test_disabled_by_default(self):
+        db = SqliteDatabase(':memory:')
+        self.assertIsNone(db.sql_cache_info())
+        self.assertIsNone(db.compiler().sql_cache)
+
+    def test_cache_hits(self):
+        Author = self.Author
+        sql1, params1 = self.compile(Author.select().where(Author.id == 1))
+        sql2, params2 = self.compile(Author.select().where(Author.id == 2))
+        self.assertEqual(sql1, sql2)
+        self.assertEqual(params1, [1])
+        self.assertEqual(params2, [2])
+
+        info = self.db.sql_cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.size, 1)
+
+        # A different query shape is a miss.
+        self.compile(Author.select().where(Author.name == 'a'))
+        info = self.db.sql_cache_info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 2, 2))
+
+        self.db.clear_sql_cache()
+        info = self.db.sql_cache_info()
+        self.assertEqual((info.hits, info.misses, info.size), (0, 0, 0))
+
+    def test_lru_eviction(self):
+        db = SqliteDatabase(':memory:', sql_cache_size=2)
+        Author = self.Author
+        with Using(db, [Author]):
+            Author.select().where(Author.id == 1).sql()
+            Author.select().where(Author.name == 'a').sql()
+            Author.select().where(Author.id == 2).sql()
+            Author.select().where(Author.id > 2).sql()
+            info = db.sql_cache_info()
+            self.assertEqual((info.hits, info.misses, info.size), (1, 3, 2))
+
+            # The name query was least-recently used.
+            Author.select().where(Author.name == 'b').sql()
+            self.assertEqual(db.sql_cache_info().misses, 4)
+
+    def test_in_lists(self):
+        Author = self.Author
+        for values in ([1, 2], [3, 4], [], [5]):
+            query = Author.select().where(Author.id << values)
+            sql, params = self.compile(query)
+            self.assertEqual(params, values)
+            if values:
+                self.assertTrue(sql.endswith(
+                    'IN (%s))' % ', '.join('?' * len(values))))
+            else:
+                self.assertTrue(sql.endswith('(0 = 1)'))
+        info = self.db.sql_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 3))
+
+    def test_subquery_and_join(self):
+        Author, Book = self.Author, self.Book
+        a1 = Author.create(name='a1')
+        a2 = Author.create(name='a2')
+        Book.create(author=a1, title='b1')
+        Book.create(author=a2, title='b2')
+
+        def books_for(name):
+            subq = Author.select(Author.id).where(Author.name == name)
+            return [b.title for b in Book.select().where(Book.author << subq)]
+
+        self.assertEqual(books_for('a1'), ['b1'])
+        self.assertEqual(books_for('a2'), ['b2'])
+
+        def joined(name):
+            return [b.title for b in (Book
+                                      .select()
+                                      .join(Author)
+                                      .where(Author.name == name))]
+
+        self.assertEqual(joined('a1'), ['b1'])
+        self.assertEqual(joined('a2'), ['b2'])
+        self.assertTrue(self.db.sql_cache_info().hits >= 2)
+
+    def test_write_queries(self):
+        Author = self.Author
+        a1 = Author.create(name='a1')
+        a2 = Author.create(name='a2')
+        self.assertNotEqual(a1.created, None)
+        self.assertEqual(
+            [a.name for a in Author.select().order_by(Author.id)],
+            ['a1', 'a2'])
+
+        Author.update(name='x').where(Author.id == a1.id).execute()
+        Author.update(name='y').where(Author.id == a2.id).execute()
+        self.assertEqual(
+            [a.name for a in Author.select().order_by(Author.id)],
+            ['x', 'y'])
+
+        Author.delete().where(Author.id == a1.id).execute()
+        Author.delete().where(Author.id == a2.id).execute()
+        self.assertEqual(Author.select().count(), 0)
+
+    def test_uncacheable(self):
+        Author = self.Author
+        query = (Author.select().where(Author.id == 1) |
+                 Author.select().where(Author.id == 2))
+        sql, params = self.compile(query)
+        self.assertEqual(params, [1, 2])
+        self.compile(query)
+        self.assertEqual(self.db.sql_cache_info().size, 0)
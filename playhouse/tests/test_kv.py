@@ -1,3 +1,4 @@
+import atexit
 import threading
 
 from peewee import *
@@ -144,6 +145,123 @@ class TestKeyStore(PeeweeTestCase):
 
         self.assertEqual(list(self.ordered_kv.keys()), [])
 
+    def test_non_native_upsert(self):
+        self.kv._native_upsert = False
+        self.kv['a'] = 'A'
+        with self.kv._database.atomic():
+            self.kv['a'] = 'B'
+            self.kv['b'] = 'C'
+        self.assertEqual(self.kv.get_many(['a', 'b']), {'a': 'B', 'b': 'C'})
+
+        self.kv.set_many({'b': 'D', 'c': 'E'})
+        self.assertEqual(list(self.ordered_kv.items()), [
+            ('a', 'B'),
+            ('b', 'D'),
+            ('c', 'E')])
+
+    def test_bulk_methods(self):
+        with self.assertQueryCount(1, ignore_txn=True):
+            self.kv.set_many({'a': 'A', 'b': 'B', 'c': 'C'})
+
+        with self.assertQueryCount(1):
+            self.assertEqual(self.kv.get_many(['a', 'c', 'x']), {
+                'a': 'A',
+                'c': 'C'})
+
+        self.kv.set_many([('a', 'A2'), ('d', 'D')])
+        self.assertEqual(self.kv.get_many(['a', 'b', 'd']), {
+            'a': 'A2',
+            'b': 'B',
+            'd': 'D'})
+
+        with self.assertQueryCount(1, ignore_txn=True):
+            self.kv.delete_many(['a', 'b', 'x'])
+        self.assertEqual(sorted(self.kv.keys()), ['c', 'd'])
+
+    def test_read_cache(self):
+        kv = KeyStore(CharField(), cache_size=2)
+        kv.clear()
+        kv['a'] = 1
+        kv['b'] = 'B'
+
+        with self.assertQueryCount(0):
+            self.assertEqual(kv['a'], '1')
+            self.assertEqual(kv.get_many(['a', 'b']), {'a': '1', 'b': 'B'})
+
+        # Misses are cached too, evicting the least-recently used key.
+        self.assertRaises(KeyError, lambda: kv['x'])
+        with self.assertQueryCount(0):
+            self.assertFalse('x' in kv)
+        with self.assertQueryCount(1):
+            self.assertEqual(kv['a'], '1')
+
+        # Expression-based writes invalidate the cache.
+        kv[kv.key << ['a', 'b']] = 'X'
+        self.assertEqual(kv.get_many(['a', 'b']), {'a': 'X', 'b': 'X'})
+
+        kv_ttl = KeyStore(CharField(), cache_size=10, cache_ttl=-1)
+        self.assertEqual(kv_ttl['a'], 'X')
+        with self.assertQueryCount(1):
+            self.assertEqual(kv_ttl['a'], 'X')
+
+    def test_write_behind(self):
+        kv = KeyStore(CharField(), flush_size=3)
+        kv.clear()
+        with self.assertQueryCount(0):
+            kv['a'] = 'A'
+            kv['b'] = 'B'
+            kv['a'] = 'A2'
+            del kv['b']
+            self.assertEqual(kv['a'], 'A2')
+            self.assertRaises(KeyError, lambda: kv['b'])
+
+        # The coalesced changes are applied in a single transaction once the
+        # buffer holds three keys.
+        with self.log_queries() as query_log:
+            kv['c'] = 'C'
+        self.assertEqual(query_log.queries[1:], [
+            ('DELETE FROM kvmodel WHERE ("key" IN (?))', ['b']),
+            ('INSERT OR REPLACE INTO kvmodel ("key", "value") '
+             'VALUES (?, ?), (?, ?)', ['a', 'A2', 'c', 'C'])])
+        self.assertEqual(list(self.ordered_kv.items()), [
+            ('a', 'A2'),
+            ('c', 'C')])
+
+        kv['d'] = 'D'
+        self.assertEqual(len(self.kv), 2)
+        kv.flush()
+        self.assertEqual(self.kv['d'], 'D')
+
+        kv = KeyStore(CharField(), flush_interval=0)
+        kv['e'] = 'E'
+        self.assertEqual(self.kv['e'], 'E')
+
+    def test_close(self):
+        kv = KeyStore(CharField(), flush_size=10)
+        kv['a'] = 'A'
+        self.assertEqual(len(self.kv), 0)
+        kv.close()
+        self.assertEqual(self.kv['a'], 'A')
+
+        with KeyStore(CharField(), flush_interval=60) as kv:
+            kv['b'] = 'B'
+            self.assertEqual(len(self.kv), 1)
+        self.assertEqual(self.kv['b'], 'B')
+
+        # Buffered changes are flushed when the interpreter exits.
+        exit_funcs = []
+        register = atexit.register
+        atexit.register = lambda func, *args: exit_funcs.append((func, args))
+        try:
+            kv = KeyStore(CharField(), flush_size=10)
+        finally:
+            atexit.register = register
+        kv['c'] = 'C'
+        self.assertEqual(len(self.kv), 2)
+        for func, args in exit_funcs:
+            func(*args)
+        self.assertEqual(self.kv['c'], 'C')
+
 try:
     import psycopg2
 except ImportError:
@@ -159,10 +277,45 @@ class TestPostgresqlKeyStore(PeeweeTestCase):
     def tearDown(self):
         self.db.close()
 
+    def test_native_upsert(self):
+        if self.db.server_version < 90500:
+            return
+
+        self.assertTrue(self.kv._native_upsert)
+        self.kv['a'] = 'A'
+        self.kv['b'] = 'B'
+        self.assertEqual(self.kv['a'], 'A')
+
+        # Overwriting a key does not abort the surrounding transaction.
+        with self.db.atomic():
+            self.kv['a'] = 'C'
+            self.kv['c'] = 'D'
+        self.assertEqual(self.kv['a'], 'C')
+        self.assertEqual(self.kv['c'], 'D')
+
+        self.kv.set_many({'a': 'E', 'd': 'F'})
+        self.assertEqual(list(self.kv.items()), [
+            ('a', 'E'),
+            ('b', 'B'),
+            ('c', 'D'),
+            ('d', 'F')])
+
     def test_non_native_upsert(self):
+        # Servers older than 9.5 update the row, then insert it if missing.
+        self.kv._native_upsert = False
         self.kv['a'] = 'A'
         self.kv['b'] = 'B'
         self.assertEqual(self.kv['a'], 'A')
 
-        self.kv['a'] = 'C'
+        with self.db.atomic():
+            self.kv['a'] = 'C'
+            self.kv['c'] = 'D'
         self.assertEqual(self.kv['a'], 'C')
+        self.assertEqual(self.kv['c'], 'D')
+
+        self.kv.set_many({'a': 'E', 'd': 'F'})
+        self.assertEqual(list(self.kv.items()), [
+            ('a', 'E'),
+            ('b', 'B'),
+            ('c', 'D'),
+            ('d', 'F')])
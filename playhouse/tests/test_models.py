@@ -1,5 +1,6 @@
 # encoding=utf-8
 
+import datetime
 import sys
 from functools import partial
 
@@ -252,7 +253,7 @@ class TestQueryingModels(ModelTestCase):
         # Simulate database not supporting multiple insert (older versions of
         # sqlite).
         test_db.insert_many = False
-        with self.assertQueryCount(4):
+        with self.assertQueryCount(2, ignore_txn=True):
             iq = User.insert_many([
                 {'username': 'u1'},
                 {'username': 'u2'},
@@ -262,12 +263,200 @@ class TestQueryingModels(ModelTestCase):
 
         self.assertEqual(User.select().count(), 4)
 
+    def test_insert_many_fallback_executemany(self):
+        test_db.insert_many = False
+        u0 = User.create(username='u0')
+        dt = datetime.datetime(2016, 1, 2)
+        rows = [
+            {'user': u0, 'title': 'b1', 'pub_date': dt},
+            {'user': u0.id, 'title': 'b2', 'pub_date': dt},
+            {'user': u0, 'title': 'b3', 'pub_date': SQL('NULL')},
+            {'user': u0, 'title': 'b4'},
+            {'user': u0, 'title': 'b5', 'pub_date': dt}]
+
+        # Rows with the same columns as the first row are inserted using
+        # executemany(), the rest are inserted individually.
+        with self.assertQueryCount(4, ignore_txn=True):
+            last_id = Blog.insert_many(rows).execute()
+
+        self.assertEqual(last_id, Blog.get(Blog.title == 'b5').pk)
+        query = Blog.select().order_by(Blog.pk)
+        self.assertEqual([(b.title, b.user_id, b.pub_date) for b in query], [
+            ('b1', u0.id, dt),
+            ('b2', u0.id, dt),
+            ('b3', u0.id, None),
+            ('b4', u0.id, None),
+            ('b5', u0.id, dt)])
+
+    def test_insert_many_fallback_expression_rows(self):
+        test_db.insert_many = False
+        rows = [
+            {'username': SQL("'u1'")},
+            {'username': 'u2'},
+            {'username': fn.LOWER('U3')},
+            {'username': 'U4'},
+            {'username': 'u5'}]
+
+        # The statement used by executemany() is compiled from the first row
+        # without expressions, and expression rows are inserted on their own.
+        with self.assertQueryCount(5, ignore_txn=True):
+            last_id = User.insert_many(rows).execute()
+
+        self.assertEqual(last_id, User.get(User.username == 'u5').id)
+        query = User.select().order_by(User.id)
+        self.assertEqual([user.username for user in query],
+                         ['u1', 'u2', 'u3', 'U4', 'u5'])
+
+    def test_insert_many_batched(self):
+        if not test_db.insert_many:
+            return
+
+        def generate_rows(n):
+            for i in range(n):
+                yield {'username': 'u%03d' % i}
+
+        qc = len(self.queries())
+        iq = User.insert_many(generate_rows(10), batch_size=3)
+        self.assertTrue(iq.execute())
+        self.assertEqual(len([
+            sql for sql, _ in self.queries()[qc:]
+            if sql.startswith('INSERT')]), 4)
+
+        usernames = [u.username for u in User.select().order_by(User.id)]
+        self.assertEqual(usernames, ['u%03d' % i for i in range(10)])
+
+        # Rows fitting in a single batch are inserted with one query.
+        with self.assertQueryCount(1):
+            User.insert_many(generate_rows(3), batch_size=3).execute()
+        self.assertEqual(User.select().count(), 13)
+
+    def test_insert_many_batch_size_from_max_params(self):
+        if not test_db.insert_many:
+            return
+
+        orig_max_params = test_db.max_params
+        test_db.max_params = 4
+        try:
+            iq = User.insert_many(
+                ({'username': 'u%s' % i} for i in range(9)))
+            self.assertEqual(iq._get_batch_size({'username': 'u0'}), 4)
+            qc = len(self.queries())
+            self.assertTrue(iq.execute())
+        finally:
+            test_db.max_params = orig_max_params
+
+        self.assertEqual(len([
+            sql for sql, _ in self.queries()[qc:]
+            if sql.startswith('INSERT')]), 3)
+        self.assertEqual(User.select().count(), 9)
+
+    def test_insert_many_batch_size_per_batch(self):
+        if not test_db.insert_many:
+            return
+
+        # Later rows have more columns than the first one, so each batch is
+        # sized from the row that starts it.
+        u1 = User.create(username='u1')
+        dt = datetime.datetime(2016, 1, 2)
+        rows = [{'user': u1, 'title': 'b%s' % i} for i in range(2)]
+        rows.extend({'user': u1, 'title': 'b%s' % i, 'pub_date': dt}
+                    for i in range(2, 5))
+
+        orig_max_params = test_db.max_params
+        test_db.max_params = 6
+        try:
+            with self.log_queries() as query_logger:
+                Blog.insert_many(iter(rows)).execute()
+        finally:
+            test_db.max_params = orig_max_params
+
+        inserts = [params for sql, params in query_logger.queries
+                   if sql.startswith('INSERT')]
+        self.assertEqual([len(params) for params in inserts], [6, 4, 4, 4])
+        self.assertEqual(
+            [(b.title, b.pub_date) for b in Blog.select().order_by(Blog.pk)],
+            [('b0', None), ('b1', None), ('b2', dt), ('b3', dt), ('b4', dt)])
+
+    def test_insert_many_batched_rollback(self):
+        if not test_db.insert_many:
+            return
+
+        rows = [{'username': 'u%s' % i} for i in range(4)]
+        rows.append({'username': None})
+        self.assertRaises(
+            IntegrityError,
+            User.insert_many(rows, batch_size=2).execute)
+        self.assertEqual(User.select().count(), 0)
+
     def test_insert_many_validates_fields_by_default(self):
         self.assertTrue(User.insert_many([])._validate_fields)
 
     def test_insert_many_without_field_validation(self):
         self.assertFalse(User.insert_many([], validate_fields=False)._validate_fields)
 
+    def test_bulk_update(self):
+        u1, u2 = User.create(username='u1'), User.create(username='u2')
+        dt = datetime.datetime(2016, 1, 2, 3, 4, 5)
+        blogs = [Blog.create(user=u1, title='b%s' % i) for i in range(5)]
+        for i, blog in enumerate(blogs):
+            blog.title = 'b%s-x' % i
+            blog.user = u2 if i % 2 else u1
+            blog.pub_date = dt if i < 2 else None
+            blog.content = 'c%s' % i
+
+        qc = len(self.queries())
+        nrows = Blog.bulk_update(
+            blogs,
+            [Blog.title, Blog.user, 'pub_date'],
+            batch_size=2)
+        self.assertEqual(nrows, 5)
+        self.assertEqual(len([
+            sql for sql, _ in self.queries()[qc:]
+            if sql.startswith('UPDATE')]), 3)
+
+        # Only the updated fields are saved and no longer dirty.
+        for blog in blogs:
+            self.assertEqual(blog.dirty_fields, [Blog.content])
+
+        query = Blog.select().order_by(Blog.pk)
+        self.assertEqual(
+            [(b.title, b.user_id, b.pub_date, b.content) for b in query],
+            [('b0-x', u1.id, dt, ''),
+             ('b1-x', u2.id, dt, ''),
+             ('b2-x', u1.id, None, ''),
+             ('b3-x', u2.id, None, ''),
+             ('b4-x', u1.id, None, '')])
+
+        # All instances fit in a single query by default.
+        for blog in blogs:
+            blog.title = blog.title.upper()
+        with self.assertQueryCount(1, ignore_txn=True):
+            self.assertEqual(Blog.bulk_update(blogs, ['title']), 5)
+        self.assertEqual(
+            [b.title for b in Blog.select().order_by(Blog.pk)],
+            ['B0-X', 'B1-X', 'B2-X', 'B3-X', 'B4-X'])
+
+        self.assertRaises(ValueError, Blog.bulk_update, blogs, [])
+        self.assertRaises(
+            ValueError, Blog.bulk_update, [Blog(title='new')], ['title'])
+
+    def test_bulk_update_batch_size_from_max_params(self):
+        users = [User.create(username='u%s' % i) for i in range(7)]
+        for user in users:
+            user.username += '-x'
+
+        orig_max_params = test_db.max_params
+        test_db.max_params = 9
+        try:
+            with self.assertQueryCount(3, ignore_txn=True):
+                self.assertEqual(User.bulk_update(users, ['username']), 7)
+        finally:
+            test_db.max_params = orig_max_params
+
+        self.assertEqual(
+            [u.username for u in User.select().order_by(User.id)],
+            ['u%s-x' % i for i in range(7)])
+
     def test_delete(self):
         User.create_users(5)
         dq = User.delete().where(User.username << ['u1', 'u2', 'u3'])
@@ -754,6 +943,91 @@ class TestModelAPIs(ModelTestCase):
             User._meta.only_save_dirty = False
             Blog._meta.only_save_dirty = False
 
+    def test_save_track_changes(self):
+        Blog._meta.track_changes = True
+        try:
+            u1 = User.create(username='u1')
+            u2 = User.create(username='u2')
+            b = Blog.create(title='b1', user=u1, content='c1')
+            self.assertEqual(b.changed_fields, [])
+
+            # Setting a field to its current value is not a change.
+            b_db = Blog.get(Blog.pk == b.pk)
+            b_db.title = 'b1'
+            b_db.user = u1
+            self.assertTrue(b_db.is_dirty())
+            self.assertEqual(b_db.changed_fields, [])
+            with self.assertQueryCount(0):
+                self.assertTrue(b_db.save() is False)
+            self.assertFalse(b_db.is_dirty())
+
+            b_db.title = 'b1-x'
+            b_db.user = u2
+            b_db.content = 'c1'
+            self.assertEqual(b_db.changed_fields, [Blog.user, Blog.title])
+            self.assertEqual(b_db.get_changes(), {
+                'title': ('b1', 'b1-x'),
+                'user': (u1.id, u2.id)})
+
+            with self.log_queries() as query_logger:
+                self.assertEqual(b_db.save(), 1)
+            sql, params = query_logger.queries[0]
+            self.assertTrue(sql.startswith('UPDATE'))
+            self.assertEqual(params, [u2.id, 'b1-x', b.pk])
+            self.assertEqual(b_db.get_changes(), {})
+
+            # Reverting a change leaves nothing to save.
+            b_db.content = 'c2'
+            b_db.content = 'c1'
+            with self.assertQueryCount(0):
+                self.assertTrue(b_db.save() is False)
+
+            saved = Blog.get(Blog.pk == b.pk)
+            self.assertEqual(
+                (saved.title, saved.user_id, saved.content),
+                ('b1-x', u2.id, 'c1'))
+
+            # Instances that were not loaded or saved report dirty fields.
+            blog = Blog(title='b2')
+            self.assertEqual(blog.changed_fields, blog.dirty_fields)
+            self.assertEqual(blog.get_changes()['title'], (None, 'b2'))
+        finally:
+            Blog._meta.track_changes = False
+
+        # Without change tracking every field is saved.
+        b_db = Blog.get(Blog.pk == b.pk)
+        self.assertTrue(b_db._snapshot is None)
+        with self.log_queries() as query_logger:
+            self.assertEqual(b_db.save(), 1)
+        self.assertEqual(len(query_logger.queries[0][1]), 5)
+
+    def test_bulk_update_track_changes(self):
+        Blog._meta.track_changes = True
+        try:
+            u1 = User.create(username='u1')
+            for i in range(3):
+                Blog.create(title='b%s' % i, user=u1, content='c%s' % i)
+            blogs = list(Blog.select().order_by(Blog.pk))
+            for blog in blogs:
+                blog.title += '-x'
+                blog.content += '-x'
+
+            Blog.bulk_update(blogs, [Blog.title])
+
+            # The bulk-updated fields are no longer reported as changed, so
+            # saving only writes the remaining change.
+            for blog in blogs:
+                self.assertEqual(blog.changed_fields, [Blog.content])
+            with self.log_queries() as query_logger:
+                self.assertEqual(blogs[0].save(), 1)
+            self.assertEqual(query_logger.queries[0][1],
+                             ['c0-x', blogs[0].pk])
+            self.assertEqual(blogs[0].get_changes(), {})
+            with self.assertQueryCount(0):
+                self.assertTrue(blogs[0].save() is False)
+        finally:
+            Blog._meta.track_changes = False
+
     def test_zero_id(self):
         if isinstance(test_db, MySQLDatabase):
             # Need to explicitly tell MySQL it's OK to use zero.
@@ -2284,19 +2558,56 @@ class TestDefaultDirtyBehavior(PeeweeTestCase):
         # No changes.
         self.assertFalse(dm_db.save())
 
+        # Defaults are not evaluated for fields fetched from the DB.
         dm2 = DM.create()
-        self.assertEqual(dm2.field, 3)  # One extra when fetched from DB.
+        self.assertEqual(dm2.field, 2)
         self.assertEqual(dm2.control, 1)
 
         dm._meta.only_save_dirty = False
 
         dm3 = DM()
-        self.assertEqual(dm3.field, 4)
+        self.assertEqual(dm3.field, 3)
         self.assertEqual(dm3.control, 1)
         dm3.save()
 
         dm3_db = DM.get(DM.id == dm3.id)
-        self.assertEqual(dm3_db.field, 4)
+        self.assertEqual(dm3_db.field, 3)
+
+    def test_fetch_partial_defaults(self):
+        DM = DefaultsModel
+        dm = DM.create(field=10, control=20)
+        counter = DM()._data['field']
+
+        # Only the defaults of fields missing from the row are evaluated.
+        dm_db = DM.select(DM.id, DM.control).get()
+        self.assertEqual(dm_db._data, {
+            'id': dm.id,
+            'field': counter + 1,
+            'control': 20})
+        self.assertEqual(dm_db._dirty, set())
+
+        dm_db = (DM
+                 .select(DM.id, (DM.field * 2).alias('double'))
+                 .get())
+        self.assertEqual(dm_db._data, {
+            'id': dm.id,
+            'field': counter + 2,
+            'control': 1})
+        self.assertEqual(dm_db.double, 20)
+        self.assertEqual(DM()._data['field'], counter + 3)
+
+    def test_fetch_custom_init(self):
+        class InitModel(DefaultsModel):
+            def __init__(self, *args, **kwargs):
+                super(InitModel, self).__init__(*args, **kwargs)
+                self.initialized = True
+
+        InitModel.create_table(True)
+        InitModel.create(field=10)
+        im_db = InitModel.get()
+        self.assertTrue(im_db.initialized)
+        self.assertEqual(im_db.field, 10)
+        self.assertEqual(im_db._dirty, set())
 
 
 class TestFunctionCoerceRegression(PeeweeTestCase):
@@ -112,6 +112,192 @@ class TestPooledDatabase(PeeweeTestCase):
             self.assertEqual(self.db.get_conn(), i + 1)
         self.assertRaises(ValueError, self.db.connect)
 
+    def test_max_conns_timeout(self):
+        db = TestDB('testing', max_connections=1, timeout=.01)
+        self.assertEqual(db.get_conn(), 1)
+
+        errors = []
+        def connect():
+            try:
+                db.connect()
+            except MaxConnectionsExceeded as exc:
+                errors.append(exc)
+
+        t = threading.Thread(target=connect)
+        t.start()
+        t.join()
+
+        # The request was unable to get a connection within the timeout.
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0], ValueError))
+        stats = db.stats()
+        self.assertEqual(stats['saturated'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['waiting'], 0)
+        self.assertTrue(stats['max_wait_time'] >= .01)
+
+    def test_blocking_checkout(self):
+        db = TestDB('testing', max_connections=2, timeout=0)
+        self.assertEqual(db.get_conn(), 1)
+        with db.execution_context(with_transaction=False):
+            self.assertEqual(db.get_conn(), 2)
+
+            results = []
+            def checkout(i):
+                db.connect()
+                results.append((i, db.get_conn()))
+                db.close()
+
+            # Both threads must wait for a connection to be returned.
+            threads = []
+            for i in range(2):
+                t = threading.Thread(target=checkout, args=(i,))
+                t.start()
+                threads.append(t)
+                while len(db._waiters) < i + 1:
+                    time.sleep(.001)
+
+            self.assertEqual(results, [])
+
+        # Closing the execution context returns conn 2, which will be used by
+        # the threads in the order in which they asked for a connection.
+        [t.join() for t in threads]
+        self.assertEqual(results, [(0, 2), (1, 2)])
+        self.assertEqual(db.counter, 2)
+
+        stats = db.stats()
+        self.assertEqual(stats['checkouts'], 4)
+        self.assertEqual(stats['saturated'], 2)
+        self.assertEqual(stats['timeouts'], 0)
+        self.assertEqual(stats['max_in_use'], 2)
+        self.assertEqual(stats['in_use'], 1)
+
+    def test_stats_and_hooks(self):
+        db = TestDB('testing', max_connections=2, stale_timeout=10)
+        events = []
+        def hook(database, event, conn):
+            self.assertTrue(database is db)
+            events.append((event, conn))
+        for event in db.events:
+            db.add_hook(event, hook)
+        self.assertRaises(ValueError, db.add_hook, 'unknown', hook)
+
+        self.assertEqual(db.get_conn(), 1)
+        with db.execution_context(with_transaction=False):
+            self.assertEqual(db.get_conn(), 2)
+            self.assertRaises(MaxConnectionsExceeded, db._connect, 'testing')
+        db.close()
+
+        # Make conn 2 stale, it will be closed when checked out.
+        db._connections = [(time.time() - 20, 2), (time.time(), 1)]
+        db.connect()
+        self.assertEqual(db.get_conn(), 1)
+        db.manual_close()
+
+        self.assertEqual(events, [
+            ('created', 1), ('checkout', 1),
+            ('created', 2), ('checkout', 2),
+            ('rejected', None),
+            ('recycled', 2),
+            ('recycled', 1),
+            ('stale', 2), ('closed', 2),
+            ('checkout', 1),
+            ('recycled', 1),
+            ('closed', 1)])
+
+        stats = db.stats()
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['closed'], 2)
+        self.assertEqual(stats['recycled'], 3)
+        self.assertEqual(stats['stale'], 1)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['checkouts'], 3)
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['max_in_use'], 2)
+        self.assertEqual(sum(n for _, n in stats['checkout_latency']), 3)
+        self.assertEqual(stats['checkout_latency'][-1][0], None)
+
+        db.remove_hook('checkout', hook)
+        db.reset_stats()
+        db.connect()
+        self.assertEqual(events[-1], ('created', 3))
+        self.assertEqual(db.stats()['checkouts'], 1)
+
+    def test_prewarm(self):
+        db = TestDB('testing', max_connections=4, min_connections=3)
+        self.assertEqual(db.prewarm(), 3)
+        self.assertEqual(sorted(conn for _, conn in db._connections),
+                         [1, 2, 3])
+
+        # Checking out a connection does not need to open a new one.
+        self.assertEqual(db.get_conn(), 1)
+        self.assertEqual(db.counter, 3)
+
+        # Only one more connection may be opened.
+        self.assertEqual(db.prewarm(), 1)
+        self.assertEqual(db.prewarm(), 0)
+        self.assertEqual(db.counter, 4)
+        self.assertEqual(len(db._connections), 3)
+
+    def test_prewarm_on_connect(self):
+        db = TestDB('testing', max_connections=4, min_connections=3)
+        self.assertEqual(db._connections, [])
+
+        # The first connection request fills the pool, then checks out one
+        # of the new connections.
+        self.assertEqual(db.get_conn(), 1)
+        self.assertEqual(db.counter, 3)
+        self.assertEqual(sorted(conn for _, conn in db._connections), [2, 3])
+
+        # Later requests do not pre-warm again.
+        db.close()
+        db._connections = []
+        self.assertEqual(db.get_conn(), 4)
+        self.assertEqual(db._connections, [])
+
+    def test_reap(self):
+        now = time.time()
+        db = TestDB('testing', stale_timeout=10)
+        unhealthy = set([3])
+        db._is_ok = lambda conn: conn not in unhealthy
+        for ts_conn in [(now - 15, 1), (now - 5, 2), (now - 3, 3),
+                        (now, 4)]:
+            heapq.heappush(db._connections, ts_conn)
+        db._closed.add(4)
+
+        # Conn 1 is stale, 3 is unhealthy and 4 was closed.
+        self.assertEqual(db.reap(), 3)
+        self.assertEqual(db._connections, [(now - 5, 2)])
+        self.assertEqual(db.closed_counter, 2)
+        self.assertEqual(db._closed, set())
+        self.assertEqual(db.get_conn(), 2)
+
+    def test_reaper_thread(self):
+        db = TestDB('testing', min_connections=2, stale_timeout=.05,
+                    reap_interval=.01)
+        try:
+            # The pool is pre-warmed when the reaper starts.
+            self.assertEqual(sorted(c for _, c in db._connections), [1, 2])
+
+            # Wait for the connections to go stale and be replaced.
+            while db.counter < 4:
+                time.sleep(.01)
+            self.assertTrue(db.closed_counter >= 2)
+        finally:
+            self.assertTrue(db.stop_reaper())
+        self.assertFalse(db.stop_reaper())
+
+    def test_reaper_thread_deferred(self):
+        db = TestDB(None, reap_interval=.01)
+        self.assertIsNone(db._reaper)
+        db.init('testing')
+        try:
+            self.assertIsNotNone(db._reaper)
+            self.assertTrue(db._reaper.is_alive())
+        finally:
+            self.assertTrue(db.stop_reaper())
+
     def test_stale_timeout(self):
         # Create a test database with a very short stale timeout.
         db = TestDB('testing', stale_timeout=.01)
@@ -572,6 +572,38 @@ class SSCursorTestCase(PeeweeTestCase):
         # The cursor is open.
         self.assertFalse(query._qr.cursor.closed)
 
+    def test_stream(self):
+        query = NormalModel.select().order_by(NormalModel.data)
+        with self.assertQueryCount(1, ignore_txn=True):
+            self.assertList(query.stream(itersize=2))
+
+        # Results are not cached on the query.
+        self.assertTrue(query._qr is None)
+        self.assertEqual(test_db.transaction_depth(), 0)
+
+        with self.assertQueryCount(1, ignore_txn=True):
+            data = [row for row in query.tuples().stream(itersize=1)]
+        self.assertEqual(data, [(1, '1'), (2, '2'), (3, '3')])
+
+        # Closing the generator early releases the cursor and transaction.
+        stream = query.stream(itersize=1)
+        self.assertEqual(next(stream).data, '1')
+        self.assertEqual(test_db.transaction_depth(), 1)
+        stream.close()
+        self.assertEqual(test_db.transaction_depth(), 0)
+
+        # The table is no longer referenced by an open cursor.
+        test_db.execute_sql(
+            'truncate table %s;' % NormalModel._meta.db_table)
+        self.assertEqual(NormalModel.select().count(), 0)
+
+        # Streaming inside a transaction uses a savepoint.
+        self.create()
+        with test_db.atomic():
+            data = [obj.data for obj in query.stream()]
+            self.assertEqual(test_db.transaction_depth(), 1)
+        self.assertEqual(data, ['4'])
+
     def test_ss_cursor(self):
         tbl = SSCursorModel._meta.db_table
         name = str(uuid.uuid1())
@@ -1196,9 +1196,49 @@ class TestInsertQuery(PeeweeTestCase):
         query = TestUser.insert(username='zaizee', id=3).upsert()
         sql, params = query.sql()
         self.assertEqual(sql, (
-            'REPLACE INTO testuser (id, username) VALUES (%s, %s)'))
+            'INSERT INTO testuser (id, username) VALUES (%s, %s) '
+            'ON DUPLICATE KEY UPDATE username = VALUES(username)'))
         self.assertEqual(params, [3, 'zaizee'])
 
+        sql, params = TestUser.insert(id=3).upsert().sql()
+        self.assertEqual(sql, (
+            'INSERT INTO testuser (id) VALUES (%s) '
+            'ON DUPLICATE KEY UPDATE id = VALUES(id)'))
+
+    def test_upsert_postgresql(self):
+        pg_db = PostgresqlDatabase('peewee_test')
+
+        class TestUser(User):
+            class Meta:
+                database = pg_db
+
+        # ON CONFLICT is only used with PostgreSQL 9.5 or newer.
+        pg_db._server_version = 90400
+        self.assertFalse(pg_db.upsert_update)
+        pg_db._server_version = 90500
+        self.assertTrue(pg_db.upsert_update)
+
+        query = TestUser.insert(username='zaizee', id=3).upsert()
+        sql, params = query.sql()
+        self.assertEqual(sql, (
+            'INSERT INTO testuser (id, username) VALUES (%s, %s) '
+            'ON CONFLICT (id) DO UPDATE SET username = excluded.username '
+            'RETURNING id'))
+        self.assertEqual(params, [3, 'zaizee'])
+
+        query = TestUser.insert_many([
+            {'id': 1, 'username': 'huey'},
+            {'id': 2, 'username': 'mickey'}]).upsert()
+        sql, params = query.sql()
+        self.assertEqual(sql, (
+            'INSERT INTO testuser (id, username) VALUES (%s, %s), (%s, %s) '
+            'ON CONFLICT (id) DO UPDATE SET username = excluded.username'))
+
+        sql, params = TestUser.insert(id=3).upsert().sql()
+        self.assertEqual(sql, (
+            'INSERT INTO testuser (id) VALUES (%s) '
+            'ON CONFLICT (id) DO NOTHING RETURNING id'))
+
     def test_returning(self):
         iq = User.insert(username='huey')
         test_db.returning_clause = False
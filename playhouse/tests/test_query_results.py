@@ -1,8 +1,13 @@
+import array
+import decimal
 import itertools
+import pickle
 import sys
 
+from peewee import ColumnarQueryResultWrapper
 from peewee import ModelQueryResultWrapper
 from peewee import NaiveQueryResultWrapper
+from peewee import PrefetchResult
 from playhouse.tests.base import ModelTestCase
 from playhouse.tests.base import skip_test_if
 from playhouse.tests.base import test_db
@@ -207,6 +212,49 @@ class TestQueryResultWrapper(ModelTestCase):
 
             self.assertRaises(StopIteration, next, qr)
 
+    def test_fetch_size(self):
+        User.create_users(10)
+        expected = ['u%d' % i for i in range(1, 11)]
+
+        for fetch_size in (1, 3, 10, 100):
+            query = User.select().order_by(User.id).fetch_size(fetch_size)
+            with self.assertQueryCount(1):
+                qr = query.execute()
+                self.assertEqual(qr.fetch_size, fetch_size)
+
+                # Interleave two iterators and a partial fill of the cache.
+                i1, i2 = iter(qr), iter(qr)
+                self.assertEqual(next(i1).username, 'u1')
+                qr.fill_cache(5)
+                self.assertEqual(len(qr._result_cache),
+                                 min(10, max(5, fetch_size)))
+                self.assertEqual([next(i2).username for _ in range(10)],
+                                 expected)
+                self.assertEqual([next(i1).username for _ in range(9)],
+                                 expected[1:])
+                self.assertRaises(StopIteration, next, i1)
+                self.assertTrue(qr._populated)
+
+        self.assertEqual(User.select().fetch_size(3).tuples().count(), 10)
+        self.assertEqual(
+            list(User.select(User.username).order_by(User.id).fetch_size(3)
+                 .tuples()),
+            [(username,) for username in expected])
+
+    def test_stream(self):
+        User.create_users(5)
+        query = User.select().order_by(User.id)
+        with self.assertQueryCount(1):
+            usernames = [user.username for user in query.stream(itersize=2)]
+        self.assertEqual(usernames, ['u1', 'u2', 'u3', 'u4', 'u5'])
+
+        # Results are not cached on the query.
+        self.assertTrue(query._qr is None)
+
+        with self.assertQueryCount(1):
+            rows = list(query.select(User.username).tuples().stream())
+        self.assertEqual(rows, [('u%d' % i,) for i in range(1, 6)])
+
     def test_select_related(self):
         u1 = User.create(username='u1')
         u2 = User.create(username='u2')
@@ -318,6 +366,45 @@ class TestQueryResultWrapper(ModelTestCase):
             {'id': u2.id, 'username': 'u2', 'pk': b2.pk, 'user': u2.id, 'title': 'b2', 'content': '', 'pub_date': None},
         ])
 
+    def test_namedtuples(self):
+        u1 = User.create(username='u1')
+        u2 = User.create(username='u2')
+        pub_date = datetime.datetime(2016, 1, 2, 3, 4, 5)
+        b1 = Blog.create(user=u1, title='b1', pub_date=pub_date)
+        b2 = Blog.create(user=u2, title='b2')
+
+        users = list(User.select().order_by(User.id).namedtuples())
+        self.assertEqual(users, [(u1.id, 'u1'), (u2.id, 'u2')])
+        self.assertEqual(users[0].id, u1.id)
+        self.assertEqual(users[1].username, 'u2')
+        self.assertEqual(users[0]._fields, ('id', 'username'))
+        self.assertEqual(type(users[0]).__slots__, ())
+        self.assertRaises(AttributeError, setattr, users[0], 'username', 'x')
+
+        # The row class is shared by queries with the same columns.
+        users2 = list(User.select().namedtuples())
+        self.assertTrue(type(users2[0]) is type(users[0]))
+
+        query = (Blog
+                 .select(Blog.title, Blog.pub_date, User.username)
+                 .join(User)
+                 .order_by(Blog.title)
+                 .namedtuples())
+        b1_row, b2_row = list(query)
+        self.assertEqual(b1_row._fields, ('title', 'pub_date', 'username'))
+        self.assertEqual(b1_row.pub_date, pub_date)
+        self.assertEqual(b1_row.username, 'u1')
+        self.assertEqual(b2_row, ('b2', None, 'u2'))
+
+        query = User.select(
+            User.username, fn.Lower(User.username).alias('username'))
+        row = query.where(User.id == u1.id).namedtuples().get()
+        self.assertEqual(row, ('u1', 'u1'))
+        self.assertEqual(row._fields, ('username', '_1'))
+
+        query = User.raw('select * from users order by id').namedtuples()
+        self.assertEqual([user.username for user in query], ['u1', 'u2'])
+
     def test_slicing_dicing(self):
         def assertUsernames(users, nums):
             self.assertEqual([u.username for u in users], ['u%d' % i for i in nums])
@@ -727,6 +814,108 @@ class TestQueryResultTypeConversion(ModelTestCase):
             fn.SubStr(fn.Lower(UpperUser.username), 1, 3).alias('foo'))
         self.assertNames(query, ['u0', 'u1', 'u2'], 'foo')
 
+class TestColumnarResults(ModelTestCase):
+    requires = [User, NullModel]
+
+    def setUp(self):
+        super(TestColumnarResults, self).setUp()
+        for i in range(5):
+            NullModel.create(
+                char_field='c%s' % i,
+                int_field=i,
+                float_field=i / 2.,
+                bigint_field=2 ** 40 + i,
+                boolean_field=bool(i % 2),
+                decimal_field2=decimal.Decimal('%s.25' % i))
+
+    def test_columnar(self):
+        query = (NullModel
+                 .select(NullModel.char_field, NullModel.int_field,
+                         NullModel.float_field, NullModel.bigint_field,
+                         NullModel.boolean_field, NullModel.decimal_field2)
+                 .order_by(NullModel.id))
+        columns = query.columnar(chunk_size=2)
+        self.assertEqual(list(columns), [
+            'char_field', 'int_field', 'float_field', 'bigint_field',
+            'boolean_field', 'decimal_field2'])
+
+        self.assertEqual(columns['char_field'], ['c0', 'c1', 'c2', 'c3', 'c4'])
+        self.assertTrue(isinstance(columns['int_field'], array.array))
+        self.assertEqual(list(columns['int_field']), [0, 1, 2, 3, 4])
+        self.assertEqual(columns['float_field'].typecode, 'd')
+        self.assertEqual(list(columns['float_field']), [0, .5, 1, 1.5, 2])
+        self.assertEqual(list(columns['bigint_field']),
+                         [2 ** 40 + i for i in range(5)])
+
+        # Non-numeric Python types are converted and stored in lists.
+        self.assertEqual(columns['boolean_field'],
+                         [False, True, False, True, False])
+        self.assertEqual(columns['decimal_field2'], [
+            decimal.Decimal('%s.25' % i) for i in range(5)])
+
+    def test_columnar_nulls_and_functions(self):
+        NullModel.create(char_field='c5')
+        query = (NullModel
+                 .select(NullModel.int_field,
+                         (NullModel.id * 2).alias('double_id'),
+                         fn.Upper(NullModel.char_field).alias('upper'))
+                 .order_by(NullModel.id))
+        columns = query.columnar(chunk_size=4)
+
+        # The NULL in the second chunk falls back to a list.
+        self.assertEqual(columns['int_field'], [0, 1, 2, 3, 4, None])
+        self.assertTrue(isinstance(columns['double_id'], array.array))
+        self.assertEqual(list(columns['double_id']),
+                         [2 * i for i in range(1, 7)])
+        self.assertEqual(columns['upper'], ['C%s' % i for i in range(6)])
+
+    def test_columnar_without_fetchmany(self):
+        class Cursor(object):
+            # Like an apsw cursor, which has no fetchmany().
+            def __init__(self, cursor):
+                self.cursor = cursor
+                self.description = cursor.description
+
+            def fetchone(self):
+                return self.cursor.fetchone()
+
+            def close(self):
+                self.cursor.close()
+
+        query = (NullModel
+                 .select(NullModel.char_field, NullModel.int_field)
+                 .order_by(NullModel.id))
+        wrapper = ColumnarQueryResultWrapper(
+            NullModel,
+            Cursor(query._execute()),
+            query.get_query_meta())
+        columns = wrapper.read_columns(chunk_size=2)
+        self.assertEqual(columns['char_field'], ['c0', 'c1', 'c2', 'c3', 'c4'])
+        self.assertEqual(list(columns['int_field']), [0, 1, 2, 3, 4])
+
+    def test_columnar_empty(self):
+        query = NullModel.select(NullModel.int_field).where(
+            NullModel.id == 0)
+        self.assertEqual(dict(query.columnar()), {'int_field': []})
+
+    def test_columnar_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.assertRaises(
+                ImproperlyConfigured,
+                NullModel.select().columnar,
+                use_numpy=True)
+            return
+
+        columns = (NullModel
+                   .select(NullModel.int_field, NullModel.char_field)
+                   .order_by(NullModel.id)
+                   .columnar(use_numpy=True))
+        self.assertEqual(columns['int_field'].tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(columns['char_field'].tolist(),
+                         ['c0', 'c1', 'c2', 'c3', 'c4'])
+
 class TestModelQueryResultWrapper(ModelTestCase):
     requires = [TestModelA, TestModelB, TestModelC, User, Blog]
 
@@ -915,6 +1104,71 @@ class TestSelectRelatedForeignKeyToNonPrimaryKey(ModelTestCase):
             self.assertEqual([i.package.id for i in items], [p1.id, p1.id])
 
 
+class TestBatchRelations(ModelTestCase):
+    requires = [User, Blog, Comment, Package, PackageItem]
+
+    def create_data(self):
+        for username in ('u1', 'u2', 'u3'):
+            user = User.create(username=username)
+            for i in range(2):
+                blog = Blog.create(user=user, title='%s-b%s' % (username, i))
+                Comment.create(blog=blog, comment='%s-c' % blog.title)
+
+    def test_batch_relations(self):
+        self.create_data()
+        query = Blog.select().order_by(Blog.pk).batch_relations()
+        with self.assertQueryCount(2):
+            usernames = [blog.user.username for blog in query]
+        self.assertEqual(usernames, ['u1', 'u1', 'u2', 'u2', 'u3', 'u3'])
+
+        sql, params = self.queries()[-1]
+        self.assertEqual(sorted(params), [user.id for user in
+                                          User.select().order_by(User.id)])
+
+        # Without batching, each blog issues its own query.
+        with self.assertQueryCount(7):
+            usernames = [blog.user.username
+                         for blog in Blog.select().order_by(Blog.pk)]
+
+    def test_batch_relations_chained(self):
+        self.create_data()
+        query = Comment.select().order_by(Comment.id).batch_relations()
+        with self.assertQueryCount(3):
+            usernames = [comment.blog.user.username for comment in query]
+        self.assertEqual(usernames, ['u1', 'u1', 'u2', 'u2', 'u3', 'u3'])
+
+    def test_batch_relations_missing(self):
+        self.create_data()
+        blogs = list(Blog.select().order_by(Blog.pk).batch_relations())
+        User.delete().where(User.username == 'u2').execute()
+
+        with self.assertQueryCount(1):
+            self.assertEqual(blogs[0].user.username, 'u1')
+            self.assertEqual(blogs[5].user.username, 'u3')
+
+        # Rows that could not be loaded in the batch are looked up singly.
+        with self.assertQueryCount(1):
+            self.assertRaises(User.DoesNotExist, getattr, blogs[2], 'user')
+
+    def test_batch_relations_non_pk(self):
+        Package.create(barcode='101')
+        Package.create(barcode='102')
+        for barcode in ('101', '102', '101'):
+            PackageItem.create(title='i%s' % barcode, package=barcode)
+
+        query = PackageItem.select().order_by(PackageItem.id).batch_relations()
+        with self.assertQueryCount(2):
+            barcodes = [item.package.barcode for item in query]
+        self.assertEqual(barcodes, ['101', '102', '101'])
+
+    def test_batch_relations_pickle(self):
+        self.create_data()
+        blog = list(Blog.select().order_by(Blog.pk).batch_relations())[0]
+        self.assertTrue(blog._related_loader is not None)
+        unpickled = pickle.loads(pickle.dumps(blog))
+        self.assertEqual(unpickled.title, blog.title)
+        self.assertTrue(unpickled._related_loader is None)
+
 class BaseTestPrefetch(ModelTestCase):
     requires = [
         User,
@@ -1209,6 +1463,140 @@ class TestPrefetch(BaseTestPrefetch):
             ('u5', [], []),
         ])
 
+    def _multi_depth_results(self, prefetch_sq):
+        results = []
+        for parent in prefetch_sq:
+            results.append(parent.data)
+            for child in parent.child_set_prefetch:
+                results.append(child.data)
+                for pet in child.childpet_set_prefetch:
+                    results.append(pet.data)
+            for orphan in parent.orphan_set_prefetch:
+                results.append(orphan.data)
+                for pet in orphan.orphanpet_set_prefetch:
+                    results.append(pet.data)
+        return results
+
+    def test_prefetch_batched(self):
+        sq = User.select().where(User.username != 'u3')
+        sq2 = Blog.select().where(Blog.title != 'b2')
+        sq3 = Comment.select()
+
+        with self.assertQueryCount(3):
+            prefetch_sq = prefetch(sq, sq2, sq3, batched=True)
+            results = []
+            for user in prefetch_sq:
+                results.append(user.username)
+                for blog in user.blog_set_prefetch:
+                    results.append(blog.title)
+                    for comment in blog.comments_prefetch:
+                        results.append(comment.comment)
+
+        self.assertEqual(results, [
+            'u1', 'b1', 'b1-c1', 'b1-c2',
+            'u2',
+            'u4', 'b5', 'b5-c1', 'b5-c2', 'b6', 'b6-c1',
+        ])
+
+        # The related queries use literal lists of keys, not subqueries.
+        for sql, params in self.queries()[-2:]:
+            self.assertEqual(sql.count('SELECT'), 1)
+        sql, params = self.queries()[-1]
+        self.assertEqual(sorted(params), sorted(
+            blog.pk for user in prefetch_sq
+            for blog in user.blog_set_prefetch))
+
+    def test_prefetch_batched_chunks(self):
+        def build():
+            return (Parent.select().order_by(Parent.id),
+                    Child.select().order_by(Child.id),
+                    Orphan.select().order_by(Orphan.id),
+                    ChildPet.select().order_by(ChildPet.id),
+                    OrphanPet.select().order_by(OrphanPet.id))
+
+        expected = self._multi_depth_results(prefetch(*build()))
+
+        with self.assertQueryCount(5):
+            results = self._multi_depth_results(
+                prefetch(*build(), batched=True))
+        self.assertEqual(results, expected)
+
+        # 3 parents, 6 children, 6 orphans -> 2 + 2 + 3 + 3 queries.
+        with self.assertQueryCount(11):
+            results = self._multi_depth_results(
+                prefetch(*build(), batched=True, batch_size=2))
+        self.assertEqual(results, expected)
+
+    def test_prefetch_batched_chunks_ordering(self):
+        def build():
+            return (Parent.select().order_by(Parent.id),
+                    Child.select().order_by(Child.data.desc(), Child.id),
+                    Orphan.select().order_by(Orphan.id.desc()),
+                    ChildPet.select().order_by(ChildPet.data.desc()),
+                    OrphanPet.select().order_by(OrphanPet.id))
+
+        expected = self._multi_depth_results(prefetch(*build()))
+        results = self._multi_depth_results(
+            prefetch(*build(), batched=True, batch_size=2))
+        self.assertEqual(results, expected)
+
+        # The merged chunks follow the subquery's ORDER BY.
+        parents = list(Parent.select())
+        children = Child.select().order_by(Child.data.desc())
+        prefetch_result = PrefetchResult(children, [Child.parent], False)
+        self.assertEqual(
+            [child.data for child in
+             prefetch_result.batched_query(parents, batch_size=2)],
+            [child.data for child in children])
+
+        # Orderings that cannot be merged in Python use a single query.
+        children = Child.select().order_by(fn.LOWER(Child.data))
+        prefetch_result = PrefetchResult(children, [Child.parent], False)
+        with self.assertQueryCount(1):
+            results = prefetch_result.batched_query(parents, batch_size=2)
+        self.assertEqual(
+            [child.data for child in results],
+            [child.data for child in children.clone()])
+
+    def test_prefetch_batched_chunks_limit(self):
+        parents = list(Parent.select())
+        children = Child.select().order_by(Child.id.desc()).limit(4)
+        prefetch_result = PrefetchResult(children, [Child.parent], False)
+
+        # A LIMIT applies to the whole result, so the keys are not chunked.
+        with self.assertQueryCount(1):
+            results = prefetch_result.batched_query(parents, batch_size=2)
+        self.assertEqual(
+            [child.id for child in results],
+            [child.id for child in children.clone()])
+
+    def test_prefetch_batched_reverse(self):
+        sq = User.select()
+        sq2 = Blog.select().where(Blog.title != 'b2').order_by(Blog.pk)
+
+        with self.assertQueryCount(2):
+            prefetch_sq = prefetch(sq2, sq, batched=True)
+            results = []
+            for blog in prefetch_sq:
+                results.append(blog.title)
+                results.append(blog.user.username)
+
+        self.assertEqual(results, [
+            'b1', 'u1',
+            'b3', 'u3',
+            'b4', 'u3',
+            'b5', 'u4',
+            'b6', 'u4'])
+
+    def test_prefetch_batched_empty(self):
+        sq = User.select().where(User.username == 'missing')
+        with self.assertQueryCount(1):
+            prefetch_sq = prefetch(sq, Blog, Comment, batched=True)
+            self.assertEqual(list(prefetch_sq), [])
+
+    def test_prefetch_invalid_argument(self):
+        self.assertRaises(ValueError, prefetch, User.select(), Blog, foo=1)
+
 
 class TestPrefetchMultipleFKs(ModelTestCase):
     requires = [
@@ -1284,6 +1672,31 @@ class TestPrefetchMultipleFKs(ModelTestCase):
                 self.assertEqual(relationship.from_user.username, from_user)
                 self.assertEqual(relationship.to_user.username, to_user)
 
+    def test_multiple_fks_batched(self):
+        charlie, huey, zaizee = self.create_users()
+        r1, r2, r3, r4 = self.create_relationships(charlie, huey, zaizee)
+
+        def related(query):
+            return [(user.username,
+                     [r.id for r in user.relationships_prefetch],
+                     [r.id for r in user.related_to_prefetch])
+                    for user in query]
+
+        users = User.select().order_by(User.id)
+        relationships = Relationship.select().order_by(Relationship.id)
+        expected = related(prefetch(users, relationships))
+        self.assertEqual(expected, [
+            ('charlie', [r1.id, r2.id], [r3.id, r4.id]),
+            ('huey', [r3.id], [r1.id]),
+            ('zaizee', [r4.id], [r2.id])])
+
+        # Relationships matching users in different chunks are only loaded
+        # once.
+        with self.assertQueryCount(4):
+            query = prefetch(users.clone(), relationships, batched=True,
+                             batch_size=1)
+            self.assertEqual(related(query), expected)
+
 
 class TestPrefetchThroughM2M(ModelTestCase):
     requires = [User, Note, Flag, NoteFlag]
@@ -1394,6 +1807,52 @@ class TestAggregateRows(BaseTestPrefetch):
                 ('b6', ['b6-c1'])]),
         ])
 
+    def test_aggregate_users_unordered(self):
+        expected = [
+            ('u1', [('b1', ['b1-c1', 'b1-c2']), ('b2', ['b2-c1'])]),
+            ('u2', []),
+            ('u3', [('b3', ['b3-c1', 'b3-c2']), ('b4', [])]),
+            ('u4', [('b5', ['b5-c1', 'b5-c2']), ('b6', ['b6-c1'])]),
+        ]
+
+        def assertResults(users):
+            results = []
+            for user in users:
+                results.append((
+                    user.username,
+                    sorted((blog.title,
+                            sorted(c.comment for c in blog.comments))
+                           for blog in user.blog_set)))
+            self.assertEqual(sorted(results), expected)
+
+        query = (User
+                 .select(User, Blog, Comment)
+                 .join(Blog, JOIN.LEFT_OUTER)
+                 .join(Comment, JOIN.LEFT_OUTER))
+
+        # Only the rows of each user need to be adjacent.
+        with self.assertQueryCount(1):
+            assertResults(query
+                          .order_by(User.username, Comment.id.desc())
+                          .aggregate_rows())
+
+        # Rows are grouped by primary key in any order.
+        unordered = query.order_by(Comment.id.desc()).aggregate_rows(
+            ordered=False)
+        with self.assertQueryCount(1):
+            users = list(unordered)
+            assertResults(users)
+            self.assertEqual(len(users), 4)
+
+        with self.assertQueryCount(1):
+            assertResults(unordered.clone().iterator())
+
+        with self.assertQueryCount(1):
+            qr = unordered.clone().execute()
+            qr.fill_cache(2)
+            self.assertEqual(len(qr._result_cache), 2)
+            assertResults(qr)
+
     def test_aggregate_blogs(self):
         with self.assertQueryCount(1):
             query = (Blog
@@ -17,6 +17,16 @@ class Note(BaseModel):
     content = TextField()
     timestamp = DateTimeField(default=datetime.datetime.now)
 
+default_calls = []
+
+def counted_default():
+    default_calls.append(1)
+    return len(default_calls)
+
+class DefaultNote(BaseModel):
+    content = TextField()
+    counter = IntegerField(default=counted_default)
+
 
 class TestResultWrappers(ModelTestCase):
     requires = [Note]
@@ -93,6 +103,25 @@ class TestResultWrappers(ModelTestCase):
         self.assertEqual(last.id, 10)
         self.assertEqual(last.content, 'note-9')
 
+    def test_model_defaults(self):
+        DefaultNote.create_table(True)
+        try:
+            DefaultNote.create(content='huey', counter=0)
+            ncalls = len(default_calls)
+
+            # As with the pure-Python wrapper, defaults are only evaluated
+            # for fields missing from the row.
+            note = DefaultNote.get()
+            self.assertEqual((note.content, note.counter), ('huey', 0))
+            self.assertFalse(note.is_dirty())
+            self.assertEqual(len(default_calls), ncalls)
+
+            note = DefaultNote.select(DefaultNote.content).get()
+            self.assertEqual(note.counter, ncalls + 1)
+            self.assertEqual(len(default_calls), ncalls + 1)
+        finally:
+            DefaultNote.drop_table()
+
     def test_aliases(self):
         query = (Note
                  .select(
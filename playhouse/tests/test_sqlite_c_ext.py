@@ -4,6 +4,8 @@ import unittest
 from peewee import *
 from playhouse.sqlite_ext import *
 from playhouse.sqlite_ext import _VirtualFieldMixin
+from playhouse.sqlite_ext import FTS_MATCHINFO_FORMAT
+from playhouse.sqlite_ext import lucene
 from playhouse.tests.base import database_initializer
 from playhouse.tests.base import ModelTestCase
 from playhouse.tests.libs import mock
@@ -99,8 +101,23 @@ class TestRank(BaseTestCase):
         query = NoteIndex.search_lucene('faithful thing', [1.0], with_score=True)
         results = [(item[0], round(item[1], 2)) for item in query.tuples()]
         self.assertEqual(results, [
-            (self.test_content[4], 0.08),
-            (self.test_content[2], 0.1)])
+            (self.test_content[4], -0.12),
+            (self.test_content[2], -0.09)])
+
+        # The pure-Python implementation gives the same scores.
+        db.register_function(lucene, 'py_lucene', -1)
+        try:
+            match_info = fn.matchinfo(
+                NoteIndex.as_entity(), FTS_MATCHINFO_FORMAT)
+            query = (NoteIndex
+                     .select(NoteIndex.content, fn.py_lucene(match_info, 1.0))
+                     .where(NoteIndex.match('faithful thing'))
+                     .order_by(NoteIndex.docid.desc()))
+            self.assertEqual(
+                [(item[0], round(item[1], 2)) for item in query.tuples()],
+                results)
+        finally:
+            db.unregister_function('py_lucene')
 
     def test_scoring(self):
         query = NoteIndex.search('things', with_score=True).tuples()
@@ -551,6 +551,79 @@ class TestFTSModel(ModelTestCase):
             (1, -0.3),
         ])
 
+    def test_bm25_multiple_terms(self):
+        self._create_multi_column()
+
+        # Each term is scored using its own statistics for each column.
+        query = MultiColumn.search_bm25(
+            'bbbbb ccccc', [1.0, 0.5, 0, 0], True)
+        self.assertEqual([(mc.c4, round(mc.score, 2)) for mc in query], [
+            (2, -0.42),
+            (1, -0.0),
+        ])
+
+        query = MultiColumn.search_bm25('bbbbb ccccc', with_score=True)
+        self.assertEqual([(mc.c4, round(mc.score, 2)) for mc in query], [
+            (2, -0.85),
+            (1, -0.0),
+        ])
+
+    def test_lucene(self):
+        self._create_multi_column()
+        query = MultiColumn.search_lucene(
+            'bbbbb ccccc', [1.0, 0.5, 0, 0], True)
+        self.assertEqual([(mc.c4, round(mc.score, 2)) for mc in query], [
+            (2, -0.49),
+            (1, -0.14),
+        ])
+
+    def test_search_top(self):
+        self._create_multi_column()
+        MultiColumn.create(c1='aaaaa fffff', c4=5)
+
+        query = MultiColumn.search_top('fffff', 1, ranking='bm25')
+        self.assertEqual([(mc.c4, round(mc.score, 2)) for mc in query], [
+            (5, -0.39)])
+
+        query = MultiColumn.search_top('ccccc', 2, offset=1)
+        expected = [(mc.c4, round(mc.score, 2)) for mc in
+                    MultiColumn.search('ccccc', with_score=True)]
+        self.assertEqual(
+            [(mc.c4, round(mc.score, 2)) for mc in query],
+            expected[1:3])
+        self.assertEqual([mc.docid for mc in query], [mc.c4 for mc in query])
+
+        # Weights are supported, and the scores match the full search.
+        weights = {MultiColumn.c2: 2.0}
+        self.assertEqual(
+            [(mc.c4, mc.score) for mc in
+             MultiColumn.search_top('ccccc', 10, weights=weights)],
+            [(mc.c4, mc.score) for mc in
+             MultiColumn.search('ccccc', weights, with_score=True)])
+
+    def test_snippet_highlight(self):
+        for message in self.messages:
+            FTSDoc.create(message=message)
+
+        query = (FTSDoc
+                 .select(FTSDoc.snippet(tokens=5).alias('snippet'))
+                 .where(FTSDoc.match('believe'))
+                 .order_by(FTSDoc.docid))
+        self.assertEqual([doc.snippet for doc in query], [
+            '...him who <b>believes</b> in nothing.',
+            '...consists in <b>believing</b> when it...'])
+
+        query = (FTSDoc
+                 .select(FTSDoc.highlight(FTSDoc.message, '[', ']')
+                         .alias('hl'))
+                 .where(FTSDoc.match('faith things'))
+                 .order_by(FTSDoc.docid))
+        self.assertEqual([doc.hl for doc in query], [
+            ('Be [faithful] in small [things] because it is in them that '
+             'your strength lies.'),
+            ('[Faith] has to do with [things] that are not seen and hope '
+             'with [things] that are not at hand.')])
+
     def test_bm25_alt_corpus(self):
         for message in self.messages:
             FTSDoc.create(message=message)
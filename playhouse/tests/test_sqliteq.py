@@ -5,6 +5,10 @@ import threading
 import time
 import unittest
 
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
 try:
     import gevent
 except ImportError:
@@ -130,6 +134,82 @@ class TestThreadedDatabaseThreads(BaseTestQueueDatabase, PeeweeTestCase):
         t.daemon = True
         return t
 
+    def test_reader_connections(self):
+        self.db.start()
+        User.create(name='huey')
+
+        def execute(sql, require_commit=False):
+            return self.db.execute_sql(sql, require_commit=require_commit)
+
+        # Readers use their own, read-only, connection.
+        self.assertEqual(execute('PRAGMA query_only').fetchone(), (1,))
+        self.assertEqual(execute('PRAGMA query_only', True).fetchone(), (0,))
+        self.assertEqual(
+            execute('SELECT name FROM threaded_db_test_user').fetchall(),
+            [('huey',)])
+        self.assertRaises(
+            OperationalError,
+            execute("INSERT INTO threaded_db_test_user (name) VALUES ('x')")
+            .fetchall)
+        self.db.stop()
+
+    def test_asyncio(self):
+        if asyncio is None:
+            return
+
+        loop = asyncio.new_event_loop()
+        self.db.start()
+        try:
+            cursor = self.db.execute_sql_async(
+                'INSERT INTO threaded_db_test_user (name) VALUES (?)',
+                ('huey',),
+                loop=loop)
+            self.assertTrue(loop.run_until_complete(cursor) is cursor)
+            self.assertTrue(cursor.lastrowid is not None)
+
+            User.create(name='mickey')
+            query = User.select(User.name).order_by(User.name)
+            cursor = self.db.execute_async(query, loop=loop)
+            self.assertEqual(loop.run_until_complete(cursor.__anext__()),
+                             ('huey',))
+            self.assertEqual(loop.run_until_complete(cursor.__anext__()),
+                             ('mickey',))
+            self.assertRaises(StopAsyncIteration, loop.run_until_complete,
+                              cursor.__anext__())
+
+            # Errors are raised when the cursor is awaited.
+            cursor = self.db.execute_sql_async(
+                'INSERT INTO threaded_db_test_user (name) VALUES (?)',
+                ('huey',),
+                loop=loop)
+            self.assertRaises(IntegrityError, loop.run_until_complete, cursor)
+        finally:
+            self.db.stop()
+            loop.close()
+
+    def test_asyncio_closed_loop(self):
+        if asyncio is None:
+            return
+
+        # Queue a query for a loop that is closed before the query runs.
+        loop = asyncio.new_event_loop()
+        cursor = self.db.execute_sql_async(
+            'INSERT INTO threaded_db_test_user (name) VALUES (?)',
+            ('huey',),
+            loop=loop)
+        loop.close()
+
+        # The writer is unaffected and carries on executing queries.
+        self.db.start()
+        try:
+            self.assertTrue(cursor.lastrowid is not None)
+            User.create(name='mickey')
+            self.assertEqual(
+                [user.name for user in User.select().order_by(User.name)],
+                ['huey', 'mickey'])
+        finally:
+            self.db.stop()
+
     def test_timeout(self):
         @self.db.func()
         def slow(n):
@@ -147,6 +227,42 @@ class TestThreadedDatabaseThreads(BaseTestQueueDatabase, PeeweeTestCase):
         self.db.stop()
 
 
+class TestGroupCommit(TestThreadedDatabaseThreads):
+    database_config = {
+        'use_gevent': False,
+        'group_commit': 10,
+        'group_commit_wait': .01}
+
+    def test_group_commit(self):
+        # Queue up writes before starting, so they're committed together.
+        cursors = [
+            self.db.execute_sql(
+                'INSERT INTO threaded_db_test_user (name) VALUES (?)', (name,))
+            for name in ('huey', 'mickey', 'huey', 'zaizee')]
+        self.assertEqual(self.db.queue_size(), (4, 0))
+
+        # Each call commits one transaction, so record the batches.
+        batches = []
+        process_group_commit = self.db._process_group_commit
+        def record_batch(batch):
+            batches.append(len(batch))
+            return process_group_commit(batch)
+        self.db._process_group_commit = record_batch
+        self.db.start()
+
+        self.assertTrue(cursors[0].lastrowid is not None)
+        self.assertTrue(cursors[1].lastrowid is not None)
+        self.assertTrue(cursors[3].lastrowid is not None)
+
+        # The duplicate was rolled back without affecting the other writes.
+        self.assertRaises(IntegrityError, lambda: cursors[2].lastrowid)
+        self.assertEqual(batches, [4])
+
+        names = [user.name for user in User.select().order_by(User.id)]
+        self.assertEqual(names, ['huey', 'mickey', 'zaizee'])
+        self.db.stop()
+
+
 @skip_if(lambda: gevent is None)
 class TestThreadedDatabaseGreenlets(BaseTestQueueDatabase, PeeweeTestCase):
     database_config = {'use_gevent': True}
@@ -323,6 +323,132 @@ class TestExecutionContext(ModelTestCase):
         self.assertRaises(MagicException, generate_exc)
 
 
+class TestIdentityMap(ModelTestCase):
+    requires = [User, Blog]
+
+    def test_get(self):
+        huey = User.create(username='huey')
+        with test_db.identity_map() as identity_map:
+            self.assertTrue(test_db.get_identity_map() is identity_map)
+            with self.assertQueryCount(1):
+                u1 = User.get(User.id == huey.id)
+                u2 = User.get(User.id == huey.id)
+                u3 = User.get(id=huey.id)
+            self.assertTrue(u1 is u2)
+            self.assertTrue(u1 is u3)
+            self.assertEqual(identity_map.info(), (2, 1, 2. / 3, 1))
+
+            # Non-primary-key lookups still query, but return the same
+            # instance.
+            with self.assertQueryCount(1):
+                self.assertTrue(User.get(User.username == 'huey') is u1)
+
+        self.assertTrue(test_db.get_identity_map() is None)
+        with self.assertQueryCount(1):
+            self.assertFalse(User.get(User.id == huey.id) is u1)
+
+    def test_get_partial(self):
+        huey = User.create(username='huey')
+        with test_db.identity_map() as identity_map:
+            partial = (User
+                       .select(User.id)
+                       .where(User.id == huey.id)
+                       .get())
+            self.assertIsNone(partial.username)
+
+            # The partially loaded instance is not returned as-is; the row
+            # is fetched and merged into it.
+            with self.assertQueryCount(1):
+                user = User.get(User.id == huey.id)
+            self.assertTrue(user is partial)
+            self.assertEqual(user.username, 'huey')
+
+            with self.assertQueryCount(0):
+                self.assertTrue(User.get(User.id == huey.id) is partial)
+            self.assertEqual(identity_map.info()[:2], (1, 1))
+
+    def test_save_and_delete(self):
+        with test_db.identity_map() as identity_map:
+            huey = User.create(username='huey')
+            with self.assertQueryCount(0):
+                self.assertTrue(User.get(User.id == huey.id) is huey)
+            huey.delete_instance()
+            self.assertEqual(len(identity_map), 0)
+            self.assertRaises(User.DoesNotExist, User.get, User.id == huey.id)
+
+    def test_result_wrappers(self):
+        users = [User.create(username='u%s' % i) for i in range(3)]
+        for user in users:
+            Blog.create(user=user, title='b-%s' % user.username)
+
+        with test_db.identity_map() as identity_map:
+            users = list(User.select().order_by(User.id))
+            with self.assertQueryCount(1):
+                blogs = list(Blog.select().order_by(Blog.pk))
+                self.assertEqual([blog.user for blog in blogs], users)
+                for blog, user in zip(blogs, users):
+                    self.assertTrue(blog.user is user)
+            self.assertEqual(identity_map.hits, 3)
+
+            # Joined instances are resolved to the mapped instances.
+            query = (Blog
+                     .select(Blog, User)
+                     .join(User)
+                     .order_by(Blog.pk))
+            with self.assertQueryCount(1):
+                joined = list(query)
+                for blog, orig, user in zip(joined, blogs, users):
+                    self.assertTrue(blog is orig)
+                    self.assertTrue(blog.user is user)
+
+    def test_merge_keeps_changes(self):
+        huey = User.create(username='huey')
+        with test_db.identity_map():
+            user = User.get(User.username == 'huey')
+            user.username = 'huey-x'
+            user.extra = 'extra'
+
+            query = (User
+                     .select(User, fn.Count(Blog.pk).alias('ct'))
+                     .join(Blog, JOIN.LEFT_OUTER)
+                     .group_by(User))
+            fetched, = list(query)
+            self.assertTrue(fetched is user)
+            self.assertEqual(fetched.username, 'huey-x')
+            self.assertEqual(fetched.ct, 0)
+            self.assertEqual(fetched.extra, 'extra')
+            self.assertTrue(fetched.is_dirty())
+
+    def test_scoped_to_context(self):
+        huey = User.create(username='huey')
+        with test_db.execution_context(identity_map=True) as ctx:
+            self.assertTrue(test_db.get_identity_map() is ctx.identity_map)
+            u1 = User.get(User.id == huey.id)
+            with self.assertQueryCount(0):
+                self.assertTrue(User.get(User.id == huey.id) is u1)
+        self.assertTrue(test_db.get_identity_map() is None)
+
+        with test_db.transaction(identity_map=True) as txn:
+            self.assertTrue(test_db.get_identity_map() is txn.identity_map)
+            with test_db.identity_map() as inner:
+                self.assertTrue(test_db.get_identity_map() is inner)
+            self.assertTrue(test_db.get_identity_map() is txn.identity_map)
+        self.assertTrue(test_db.get_identity_map() is None)
+
+        with test_db.transaction() as txn:
+            self.assertTrue(txn.identity_map is None)
+            self.assertTrue(test_db.get_identity_map() is None)
+
+    def test_thread_local(self):
+        identity_maps = []
+        with test_db.identity_map():
+            thread = threading.Thread(
+                target=lambda: identity_maps.append(
+                    test_db.get_identity_map()))
+            thread.start()
+            thread.join()
+        self.assertEqual(identity_maps, [None])
+
 class TestAutoRollback(ModelTestCase):
     requires = [User, Blog]
 
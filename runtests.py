@@ -32,6 +32,7 @@ def get_option_parser():
     cases = optparse.OptionGroup(parser, 'Individual test module options')
     cases.add_option('--apsw', dest='apsw', default=False, action='store_true', help='apsw tests (requires apsw)')
     cases.add_option('--berkeleydb', dest='berkeleydb', default=False, action='store_true', help='berkeleydb tests (requires pysqlite compiled against berkeleydb)')
+    cases.add_option('--closure', dest='closure', default=False, action='store_true', help='closure table tests')
     cases.add_option('--csv', dest='csv', default=False, action='store_true', help='csv tests')
     cases.add_option('--dataset', dest='dataset', default=False, action='store_true', help='dataset tests')
     cases.add_option('--db-url', dest='db_url', default=False, action='store_true', help='db url tests')
@@ -78,6 +79,9 @@ def collect_modules(options):
             modules.append(test_berkeleydb)
         except ImportError:
             print_('Unable to import berkeleydb tests, skipping')
+    if xtra(options.closure):
+        from playhouse.tests import test_closure
+        modules.append(test_closure)
     if xtra(options.csv):
         from playhouse.tests import test_csv_utils
         modules.append(test_csv_utils)